@@ -1,11 +1,15 @@
 """Paquete principal para la app interna de gestión Kimce Studio."""
 
 from .models import (
+    AbsencePayload,
+    ActivityPayload,
     ActivityType,
     CalendarEvent,
     Collaborator,
     CollaboratorHistory,
     Holiday,
+    HoursPayload,
+    InvalidPayloadError,
     Role,
     Request,
     RequestStatus,
@@ -18,6 +22,8 @@ from .calendar import CalendarBoard
 from .analytics import AnalyticsPanel
 
 __all__ = [
+    "AbsencePayload",
+    "ActivityPayload",
     "ActivityType",
     "CalendarEvent",
     "Collaborator",
@@ -27,6 +33,8 @@ __all__ = [
     "CalendarBoard",
     "AnalyticsPanel",
     "Holiday",
+    "HoursPayload",
+    "InvalidPayloadError",
     "Role",
     "Request",
     "RequestStatus",
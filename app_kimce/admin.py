@@ -1,33 +1,111 @@
 """Operaciones de Portal Admin."""
 from __future__ import annotations
 
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
-from typing import Dict, Iterable, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
 
+from .exporter import entry_row
 from .models import (
+    ABSENCE_TYPES,
+    AccessRequest,
     Announcement,
     CalendarEvent,
     Collaborator,
     Holiday,
+    InvalidPayloadError,
     Notification,
     NotificationCategory,
     Request,
     RequestStatus,
     RequestType,
+    Role,
     TimeEntry,
 )
+from .notifications import NotificationCenter
+from .projects import ProjectHoursLedger
+from .punctuality import punctuality_ranking
+
+if TYPE_CHECKING:
+    from .events import EventBus
+    from .storage import BatchStore
+
+
+MonthKey = Tuple[int, int]
+REVIEW_ACTIONS = ("approve", "reject", "correction")
+
+
+@dataclass
+class ReviewResult:
+    """Resultado de una decisión de ``AdminPortal.review_requests``."""
+
+    request_id: str
+    action: str
+    status: Optional[RequestStatus] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _payload_error(request: Request) -> Optional[str]:
+    """Mensaje de ``InvalidPayloadError`` si el payload de la solicitud no se puede aprobar."""
+
+    try:
+        request.validate()
+    except InvalidPayloadError as exc:
+        return str(exc)
+    return None
+
+
+@dataclass
+class _MonthCalendar:
+    """Vista mensual memorizada junto a la huella de versiones que la generó."""
+
+    stamp: Tuple[int, Tuple[int, ...]]
+    events: List[CalendarEvent]
+    by_collaborator: Dict[Optional[str], List[CalendarEvent]]
+    scoped: Dict[str, List[CalendarEvent]] = field(default_factory=dict)
 
 
 class AdminPortal:
     """API administrativa para gestionar el equipo."""
 
-    def __init__(self, collaborators: Iterable[Collaborator]):
+    def __init__(
+        self, collaborators: Iterable[Collaborator], store: Optional[BatchStore] = None, bus: Optional[EventBus] = None
+    ):
         self.collaborators = {c.collaborator_id: c for c in collaborators}
+        self.store = store
+        self.bus = bus
         self.holidays: List[Holiday] = []
-        self.requests: List[Request] = []
+        self._requests_by_id: Dict[str, Request] = {}
+        self._pending: Dict[str, Request] = {}
         self.calendar_events: List[CalendarEvent] = []
-        self.notifications: List[Notification] = []
+        self._events_by_month: Dict[MonthKey, List[CalendarEvent]] = defaultdict(list)
+        self._holidays_by_month: Dict[MonthKey, List[Holiday]] = defaultdict(list)
+        self._month_versions: Dict[MonthKey, int] = defaultdict(int)
+        self._calendar_cache: Dict[MonthKey, _MonthCalendar] = {}
+        # Eventos "Jornada" por colaborador y mes, con la versión del mes que los generó.
+        self._workday_events: Dict[Tuple[str, MonthKey], Tuple[int, List[CalendarEvent]]] = {}
+        self.project_hours = ProjectHoursLedger.from_collaborators(self.collaborators.values())
+        self._watch_requests()
+        self.notification_center = NotificationCenter()
         self.announcements: List[Announcement] = []
+        # Solicitudes de acceso por correo (en minúsculas).
+        self.access_requests: Dict[str, AccessRequest] = {}
+        # Contador de cambios del equipo (feriados, eventos, bandeja, anuncios); ver ``touch``.
+        self.version = 0
+
+    def touch(self, collaborator_id: Optional[str] = None) -> None:
+        """Marca un cambio del equipo y, si se indica, del colaborador (ETags de la API)."""
+
+        self.version += 1
+        collaborator = self.collaborators.get(collaborator_id) if collaborator_id else None
+        if collaborator is not None:
+            collaborator.version += 1
 
     # --- Gestión de feriados ---------------------------------------------
     def create_holiday(
@@ -40,78 +118,319 @@ class AdminPortal:
         collaborators: Optional[List[str]] = None,
     ) -> Holiday:
         holiday = Holiday(name=name, day=day, paid=paid, compensable=compensable, collaborators=collaborators)
-        self.holidays.append(holiday)
+        self._add_holiday(holiday)
+        if self.store:
+            self.store.save_holiday(holiday)
         return holiday
 
     def remove_holiday(self, name: str, day: date) -> None:
+        self._drop_holiday(name, day)
+        if self.store:
+            self.store.delete_holiday(name, day)
+
+    def _add_holiday(self, holiday: Holiday) -> None:
+        self.holidays.append(holiday)
+        key = (holiday.day.year, holiday.day.month)
+        self._holidays_by_month[key].append(holiday)
+        self._month_versions[key] += 1
+        self.touch()
+
+    def _drop_holiday(self, name: str, day: date) -> None:
         self.holidays = [h for h in self.holidays if not (h.name == name and h.day == day)]
+        key = (day.year, day.month)
+        self._holidays_by_month[key] = [
+            h for h in self._holidays_by_month[key] if not (h.name == name and h.day == day)
+        ]
+        self._month_versions[key] += 1
+        self.touch()
 
     def list_holidays(self) -> List[Holiday]:
         return sorted(self.holidays, key=lambda h: h.day)
 
+    # --- Accesos por correo ----------------------------------------------
+    def request_access(self, access: AccessRequest) -> AccessRequest:
+        self.access_requests[access.email] = access
+        self.touch(access.collaborator_id)
+        if self.store:
+            self.store.save_access_request(access)
+        return access
+
+    def review_access(
+        self, email: str, action: str, reviewer: str, position: Optional[str] = None, role: Optional[Role] = None
+    ) -> Optional[AccessRequest]:
+        """Aprueba (``approve``) o deniega (``deny``) un acceso y actualiza puesto y rol del colaborador."""
+
+        access = self.access_requests.get(email)
+        if access is None:
+            return None
+        if action not in ("approve", "deny"):
+            raise ValueError("Acción inválida")
+        access.position = position or access.position
+        if role is not None:
+            access.desired_role = role
+        if action == "approve":
+            access.approve(reviewer)
+        else:
+            access.deny(reviewer)
+        self._apply_access(access)
+        self.touch(access.collaborator_id)
+        if self.store:
+            self.store.save_access_request(access)
+        return access
+
+    def _apply_access(self, access: AccessRequest) -> None:
+        collaborator = self.collaborators.get(access.collaborator_id)
+        if collaborator is not None:
+            collaborator.position = access.position or collaborator.position
+            collaborator.role = access.desired_role
+
     # --- Solicitudes -----------------------------------------------------
+    def _watch_requests(self) -> None:
+        """Indexa las solicitudes existentes y se suscribe a las nuevas de cada historial."""
+
+        existing: List[Request] = []
+        for collaborator in self.collaborators.values():
+            self._watch(collaborator)
+            existing.extend(collaborator.history.requests)
+        for request in sorted(existing, key=lambda r: r.created_at):
+            self._track_request(request)
+
+    def _watch(self, collaborator: Collaborator) -> None:
+        if self._track_request not in collaborator.history.request_listeners:
+            collaborator.history.request_listeners.append(self._track_request)
+
+    def add_collaborator(self, collaborator: Collaborator) -> None:
+        """Suma un colaborador al equipo después de crear el portal.
+
+        Se suscribe a sus solicitudes nuevas e indexa las que ya tiene en la
+        bandeja y en las horas por proyecto.
+        """
+
+        self.collaborators[collaborator.collaborator_id] = collaborator
+        self._watch(collaborator)
+        for request in sorted(collaborator.history.requests, key=lambda r: r.created_at):
+            self._track_request(request)
+            self.project_hours.record(request)
+        self.touch(collaborator.collaborator_id)
+
+    def _track_request(self, request: Request) -> None:
+        """Agrega una solicitud recién registrada al índice y, si está pendiente, a la bandeja."""
+
+        self._requests_by_id[request.request_id] = request
+        if request.status != RequestStatus.PENDING:
+            return
+        newest = next(reversed(self._pending.values()), None)
+        self._pending[request.request_id] = request
+        if newest is not None and request.created_at < newest.created_at:
+            self._pending = dict(sorted(self._pending.items(), key=lambda item: item[1].created_at))
+
     def ingest_requests(self) -> None:
-        """Carga todas las solicitudes pendientes de los colaboradores."""
-        self.requests = [
-            request
-            for collaborator in self.collaborators.values()
-            for request in collaborator.history.requests
-            if request.status == RequestStatus.PENDING
-        ]
+        """Incorpora solicitudes agregadas a ``history.requests`` sin pasar por ``add_request``.
+
+        Las que entran por ``add_request`` llegan solas a la bandeja (ver
+        ``_track_request``); esto solo hace falta si se editó la lista a mano.
+        """
+
+        for collaborator in self.collaborators.values():
+            for request in collaborator.history.requests:
+                if request.request_id not in self._requests_by_id:
+                    self._track_request(request)
+
+    @property
+    def requests(self) -> List[Request]:
+        """Solicitudes pendientes, de la más antigua a la más reciente."""
+
+        return list(self._pending.values())
+
+    def find_request(self, request_id: str) -> Optional[Request]:
+        return self._requests_by_id.get(request_id)
 
     def review_request(self, request: Request, action: str, reviewer: str, comment: str | None = None) -> None:
+        if action == "approve":
+            request.validate()
+        was_pending = self._set_review_status(request, action, reviewer, comment)
+        if request.status == RequestStatus.APPROVED:
+            self._post_approval_effects([request])
+        self.touch(request.collaborator_id)
+        if self.store:
+            self.store.save_request(request)
+        self._publish_review(request, was_pending)
+
+    def review_requests(
+        self, decisions: Iterable[Tuple[str, str, Optional[str]]], reviewer: str
+    ) -> List[ReviewResult]:
+        """Revisa varias solicitudes pendientes de una vez.
+
+        ``decisions`` son tuplas ``(id, acción, comentario)``. Primero se
+        validan todas (que existan, sigan pendientes, no se repitan y la acción
+        tenga su comentario, y que el payload de las que se aprueban sea
+        válido); las inválidas quedan con ``error`` y no se tocan. Las válidas
+        cambian de estado y sus efectos se aplican juntos: un ajuste de saldo y
+        un refresco de rollups por colaborador, los eventos de calendario
+        indexados en bloque y todo guardado en un solo lote del store. Si los
+        efectos fallan, las solicitudes vuelven a su estado y a pendientes.
+        """
+
+        results: List[ReviewResult] = []
+        accepted: List[Tuple[ReviewResult, Request, Optional[str]]] = []
+        seen: Set[str] = set()
+        for request_id, action, comment in decisions:
+            result = ReviewResult(request_id, action)
+            results.append(result)
+            request = self._requests_by_id.get(request_id)
+            if request is None:
+                result.error = "Solicitud no encontrada"
+            elif request_id in seen:
+                result.error = "Solicitud repetida en el lote"
+            elif request.status != RequestStatus.PENDING:
+                result.error = f"La solicitud ya está en estado {request.status.value}"
+            elif action not in REVIEW_ACTIONS or (action != "approve" and not comment):
+                result.error = "Acción inválida o sin comentario requerido"
+            elif action == "approve" and (error := _payload_error(request)):
+                result.error = error
+            else:
+                accepted.append((result, request, comment))
+                seen.add(request_id)
+        if not accepted:
+            return results
+
+        reviewed = [request for _, request, _ in accepted]
+        before = [(request.status, request.reviewer, list(request.comments)) for request in reviewed]
+        was_pending: Dict[str, bool] = {}
+        for result, request, comment in accepted:
+            was_pending[request.request_id] = self._set_review_status(request, result.action, reviewer, comment)
+        approved = [request for request in reviewed if request.status == RequestStatus.APPROVED]
+        try:
+            if self.store:
+                with self.store.batch():
+                    self._post_approval_effects(approved)
+                    for request in reviewed:
+                        self.store.save_request(request)
+            else:
+                self._post_approval_effects(approved)
+        except BaseException:
+            for request, (status, previous_reviewer, comments) in zip(reviewed, before):
+                request.status, request.reviewer, request.comments = status, previous_reviewer, comments
+                if was_pending[request.request_id]:
+                    self._track_request(request)
+            raise
+        for result, request, _ in accepted:
+            result.status = request.status
+        for collaborator_id in {request.collaborator_id for request in reviewed}:
+            self.touch(collaborator_id)
+        for request in reviewed:
+            self._publish_review(request, was_pending[request.request_id])
+        return results
+
+    def _set_review_status(self, request: Request, action: str, reviewer: str, comment: str | None) -> bool:
+        """Cambia el estado según ``action`` y la saca de pendientes; dice si estaba pendiente."""
+
         if action == "approve":
             request.approve(reviewer)
-            self._post_approval_effect(request)
         elif action == "reject" and comment:
             request.reject(reviewer, comment)
         elif action == "correction" and comment:
             request.ask_correction(reviewer, comment)
         else:
             raise ValueError("Acción inválida o sin comentario requerido")
+        self._requests_by_id[request.request_id] = request
+        return self._pending.pop(request.request_id, None) is not None
 
-    def _post_approval_effect(self, request: Request) -> None:
-        collaborator = self.collaborators[request.collaborator_id]
-        payload = request.payload
-        if request.request_type == RequestType.OVERTIME:
-            hours = float(payload.get("horas", 0))
-            collaborator.history.hours_balance += timedelta(hours=hours)
-        elif request.request_type == RequestType.CREDIT_USAGE:
-            hours = float(payload.get("horas", 0))
-            collaborator.history.hours_balance -= timedelta(hours=hours)
-        elif request.request_type in {RequestType.VACATION, RequestType.COMP_DAY, RequestType.PERMIT}:
-            start = datetime.fromisoformat(payload["inicio"])
-            end = datetime.fromisoformat(payload["fin"])
-            self.calendar_events.append(
-                CalendarEvent(
-                    title=f"{request.request_type.value.title()} - {collaborator.full_name}",
-                    start=start,
-                    end=end,
-                    collaborator_id=collaborator.collaborator_id,
-                    metadata={"tipo": request.request_type.value},
-                )
+    def _publish_review(self, request: Request, was_pending: bool) -> None:
+        if self.bus:
+            self.bus.publish(
+                "revision",
+                id=request.request_id,
+                colaborador=request.collaborator_id,
+                tipo=request.request_type.value,
+                estado=request.status.value,
+                estaba_pendiente=was_pending,
             )
-        elif request.request_type == RequestType.SPECIAL_ACTIVITY:
-            start = datetime.fromisoformat(payload["inicio"])
-            end = datetime.fromisoformat(payload["fin"])
-            self.calendar_events.append(
-                CalendarEvent(
-                    title=f"Actividad {payload.get('actividad', 'especial')} - {collaborator.full_name}",
-                    start=start,
-                    end=end,
-                    collaborator_id=collaborator.collaborator_id,
-                    metadata=payload,
+
+    def _post_approval_effects(self, requests: List[Request]) -> None:
+        """Saldo, ausencias, calendario y horas por proyecto de solicitudes aprobadas.
+
+        Los cambios se agrupan por colaborador: el saldo se ajusta y guarda una
+        vez, los rollups se refrescan una vez sobre el rango que cubren sus
+        ausencias y los eventos de calendario se indexan juntos.
+        """
+
+        balance_deltas: Dict[str, timedelta] = defaultdict(timedelta)
+        absence_ranges: Dict[str, Tuple[date, date]] = {}
+        events: List[CalendarEvent] = []
+        for request in requests:
+            collaborator = self.collaborators[request.collaborator_id]
+            details = request.details
+            if request.request_type == RequestType.OVERTIME:
+                balance_deltas[collaborator.collaborator_id] += timedelta(hours=details.horas)
+            elif request.request_type == RequestType.CREDIT_USAGE:
+                balance_deltas[collaborator.collaborator_id] -= timedelta(hours=details.horas)
+            elif request.request_type in ABSENCE_TYPES:
+                collaborator.history.index_absence(request)
+                start, end = details.inicio.date(), details.fin.date()
+                known = absence_ranges.get(collaborator.collaborator_id)
+                absence_ranges[collaborator.collaborator_id] = (
+                    (start, end) if known is None else (min(known[0], start), max(known[1], end))
                 )
-            )
+                events.append(
+                    CalendarEvent(
+                        title=f"{request.request_type.value.title()} - {collaborator.full_name}",
+                        start=details.inicio,
+                        end=details.fin,
+                        collaborator_id=collaborator.collaborator_id,
+                        metadata={"tipo": request.request_type.value},
+                    )
+                )
+            elif request.request_type == RequestType.SPECIAL_ACTIVITY:
+                self.project_hours.record(request)
+                events.append(
+                    CalendarEvent(
+                        title=f"Actividad {details.actividad or 'especial'} - {collaborator.full_name}",
+                        start=details.inicio,
+                        end=details.fin,
+                        collaborator_id=collaborator.collaborator_id,
+                        metadata=request.payload,
+                    )
+                )
+        for collaborator_id, (start, end) in absence_ranges.items():
+            self.collaborators[collaborator_id].rollups.refresh(start, end)
+        for collaborator_id, delta in balance_deltas.items():
+            self.collaborators[collaborator_id].history.hours_balance += delta
+        self._add_calendar_events(events)
+        if self.store and balance_deltas:
+            with self.store.batch():
+                for collaborator_id in balance_deltas:
+                    self.store.save_balance(collaborator_id, self.collaborators[collaborator_id].history.hours_balance)
 
     # --- Ajustes manuales ------------------------------------------------
     def adjust_hours(self, collaborator_id: str, delta_hours: float) -> None:
         collaborator = self.collaborators[collaborator_id]
         collaborator.history.hours_balance += timedelta(hours=delta_hours)
+        self.touch(collaborator_id)
+        if self.store:
+            self.store.save_balance(collaborator_id, collaborator.history.hours_balance)
 
     def fix_time_entry(self, collaborator_id: str, entry: TimeEntry) -> None:
         collaborator = self.collaborators[collaborator_id]
         collaborator.history.add_entry(entry)
+        collaborator.rollups.refresh(entry.day, entry.day)
+        self.touch(collaborator_id)
+        if self.store:
+            self.store.save_entry(collaborator_id, entry)
+
+    def fix_time_entries(self, collaborator_id: str, entries: List[TimeEntry]) -> None:
+        """Versión masiva de ``fix_time_entry`` (importaciones): un solo lote hacia el store."""
+
+        if not entries:
+            return
+        collaborator = self.collaborators[collaborator_id]
+        collaborator.history.add_entries(entries)
+        collaborator.rollups.refresh(min(e.day for e in entries), max(e.day for e in entries))
+        self.touch(collaborator_id)
+        if self.store:
+            with self.store.batch():
+                for entry in entries:
+                    self.store.save_entry(collaborator_id, entry)
 
     def assign_vacation(self, collaborator_id: str, start: datetime, end: datetime, reviewer: str) -> Request:
         """Permite al admin registrar vacaciones aprobadas sin esperar solicitud."""
@@ -127,64 +446,205 @@ class AdminPortal:
         )
         collaborator = self.collaborators[collaborator_id]
         collaborator.history.add_request(request)
-        self._post_approval_effect(request)
+        self._post_approval_effects([request])
+        self.touch(collaborator_id)
+        if self.store:
+            self.store.save_request(request)
         return request
 
+    # --- Restauración ----------------------------------------------------
+    # Aplican estado leído desde persistencia (u otro proceso) sin efectos
+    # secundarios ni escritura de vuelta al store.
+    def restore_entry(self, collaborator_id: str, entry: TimeEntry) -> None:
+        collaborator = self.collaborators.get(collaborator_id)
+        if collaborator is None:
+            return
+        collaborator.history.add_entry(entry)
+        collaborator.rollups.refresh(entry.day, entry.day)
+        self.touch(collaborator_id)
+
+    def restore_balance(self, collaborator_id: str, balance: timedelta) -> None:
+        collaborator = self.collaborators.get(collaborator_id)
+        if collaborator is not None:
+            collaborator.history.hours_balance = balance
+            self.touch(collaborator_id)
+
+    def restore_request(self, request: Request) -> None:
+        """Agrega la solicitud o actualiza la conocida con el mismo id."""
+
+        collaborator = self.collaborators.get(request.collaborator_id)
+        if collaborator is None:
+            return
+        current = self.find_request(request.request_id)
+        stale_range = None
+        if current is None:
+            collaborator.history.add_request(request)
+            current = request
+        else:
+            if current.status == RequestStatus.APPROVED and current.request_type in ABSENCE_TYPES:
+                stale_range = (current.details.inicio.date(), current.details.fin.date())
+            if current.payload != request.payload:
+                current.payload = request.payload
+                current._details = None
+            current.status = request.status
+            current.reviewer = request.reviewer
+            current.comments = request.comments
+            collaborator.history.index_absence(current)
+        if current.status != RequestStatus.PENDING:
+            self._pending.pop(current.request_id, None)
+        if stale_range is not None:
+            collaborator.rollups.refresh(*stale_range)
+        if current.status == RequestStatus.APPROVED and current.request_type in ABSENCE_TYPES:
+            details = current.details
+            collaborator.rollups.refresh(details.inicio.date(), details.fin.date())
+        self.project_hours.record(current)
+        self.touch(current.collaborator_id)
+
+    def restore_event(self, event: CalendarEvent) -> None:
+        self._index_calendar_event(event)
+
+    def restore_holiday(self, holiday: Holiday) -> None:
+        self._drop_holiday(holiday.name, holiday.day)
+        self._add_holiday(holiday)
+
+    def restore_holiday_removal(self, name: str, day: date) -> None:
+        self._drop_holiday(name, day)
+
+    def restore_notification(self, notification: Notification) -> None:
+        self.notification_center.add(notification)
+        self.touch(notification.collaborator_id)
+
+    def restore_notification_read(self, collaborator_id: str, read_until: datetime) -> None:
+        self.notification_center.mark_read_until(collaborator_id, read_until)
+
+    def restore_announcement(self, announcement: Announcement) -> None:
+        self.announcements.append(announcement)
+        self.touch()
+
+    def restore_access_request(self, access: AccessRequest) -> None:
+        self.access_requests[access.email] = access
+        self._apply_access(access)
+        self.touch(access.collaborator_id)
+
     # --- Calendario ------------------------------------------------------
-    def build_calendar(self, month: int, year: int) -> List[CalendarEvent]:
-        events = [event for event in self.calendar_events if event.start.month == month and event.start.year == year]
-        for collaborator in self.collaborators.values():
-            for entry in collaborator.history.time_entries:
-                if entry.day.month == month and entry.day.year == year and entry.check_in and entry.check_out:
-                    events.append(
-                        CalendarEvent(
-                            title=f"Jornada {collaborator.full_name}",
-                            start=entry.check_in,
-                            end=entry.check_out,
-                            collaborator_id=collaborator.collaborator_id,
-                        )
-                    )
-        for holiday in self.holidays:
-            if holiday.day.month == month and holiday.day.year == year:
-                events.append(
-                    CalendarEvent(
-                        title=f"Feriado: {holiday.name}",
-                        start=datetime.combine(holiday.day, datetime.min.time()),
-                        end=datetime.combine(holiday.day, datetime.max.time()),
-                        metadata={"paid": str(holiday.paid), "compensable": str(holiday.compensable)},
-                    )
+    def _add_calendar_events(self, events: List[CalendarEvent]) -> None:
+        if not events:
+            return
+        self._index_calendar_events(events)
+        if self.store:
+            with self.store.batch():
+                for event in events:
+                    self.store.save_event(event)
+
+    def _index_calendar_event(self, event: CalendarEvent) -> None:
+        self._index_calendar_events([event])
+
+    def _index_calendar_events(self, events: List[CalendarEvent]) -> None:
+        """Indexa eventos subiendo una vez la versión de cada mes y de cada colaborador afectado."""
+
+        months = set()
+        owners = set()
+        for event in events:
+            self.calendar_events.append(event)
+            key = (event.start.year, event.start.month)
+            self._events_by_month[key].append(event)
+            months.add(key)
+            owners.add(event.collaborator_id)
+        for key in months:
+            self._month_versions[key] += 1
+        for collaborator_id in owners:
+            self.touch(collaborator_id)
+
+    def _month_calendar(self, month: int, year: int) -> _MonthCalendar:
+        """Devuelve la vista del mes, reconstruyéndola solo si algo del mes cambió."""
+
+        key = (year, month)
+        stamp = (
+            self._month_versions[key],
+            tuple(c.history.month_version(year, month) for c in self.collaborators.values()),
+        )
+        cached = self._calendar_cache.get(key)
+        if cached is not None and cached.stamp == stamp:
+            return cached
+
+        first_day = date(year, month, 1)
+        last_day = (date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)) - timedelta(days=1)
+        events = list(self._events_by_month.get(key, ()))
+        for collaborator, version in zip(self.collaborators.values(), stamp[1]):
+            events.extend(self._month_workdays(collaborator, key, version, first_day, last_day))
+        for holiday in self._holidays_by_month.get(key, ()):
+            events.append(
+                CalendarEvent(
+                    title=f"Feriado: {holiday.name}",
+                    start=datetime.combine(holiday.day, datetime.min.time()),
+                    end=datetime.combine(holiday.day, datetime.max.time()),
+                    metadata={"paid": str(holiday.paid), "compensable": str(holiday.compensable)},
                 )
-        return sorted(events, key=lambda e: e.start)
+            )
+        events.sort(key=lambda e: e.start)
+        by_collaborator: Dict[Optional[str], List[CalendarEvent]] = defaultdict(list)
+        for event in events:
+            by_collaborator[event.collaborator_id].append(event)
+        cached = self._calendar_cache[key] = _MonthCalendar(stamp, events, dict(by_collaborator))
+        return cached
+
+    def _month_workdays(
+        self, collaborator: Collaborator, key: MonthKey, version: int, first_day: date, last_day: date
+    ) -> List[CalendarEvent]:
+        """Jornadas cerradas del mes como eventos; solo se regeneran si cambió ese colaborador."""
+
+        cached = self._workday_events.get((collaborator.collaborator_id, key))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        events = [
+            CalendarEvent(
+                title=f"Jornada {collaborator.full_name}",
+                start=entry.check_in,
+                end=entry.check_out,
+                collaborator_id=collaborator.collaborator_id,
+            )
+            for entry in collaborator.history.closed_entries_between(first_day, last_day)
+            if entry.check_in
+        ]
+        self._workday_events[(collaborator.collaborator_id, key)] = (version, events)
+        return events
+
+    def build_calendar(self, month: int, year: int) -> List[CalendarEvent]:
+        return list(self._month_calendar(month, year).events)
 
     def calendar_for_collaborator(self, collaborator_id: str, month: int, year: int) -> List[CalendarEvent]:
         """Filtra el calendario para un colaborador y agrega feriados aplicables."""
 
-        scoped = [
-            event
-            for event in self.build_calendar(month, year)
-            if not event.collaborator_id or event.collaborator_id == collaborator_id
-        ]
-        return sorted(scoped, key=lambda e: e.start)
+        view = self._month_calendar(month, year)
+        scoped = view.scoped.get(collaborator_id)
+        if scoped is None:
+            scoped = view.scoped[collaborator_id] = list(
+                heapq.merge(
+                    view.by_collaborator.get(None, []),
+                    view.by_collaborator.get(collaborator_id, []),
+                    key=lambda e: e.start,
+                )
+            )
+        return list(scoped)
 
     # --- Reportes --------------------------------------------------------
     def pending_requests(self) -> List[Request]:
-        self.ingest_requests()
         return self.requests
 
     def punctuality_ranking(self) -> List[Dict[str, float]]:
-        ranking: List[Dict[str, float]] = []
-        for collaborator in self.collaborators.values():
-            entries = [entry for entry in collaborator.history.time_entries if entry.check_in]
-            if not entries:
-                continue
-            on_time = sum(1 for entry in entries if entry.check_in.time() <= datetime.combine(entry.day, datetime.min.time()).time())
-            ranking.append(
-                {
-                    "colaborador": collaborator.full_name,
-                    "porcentaje_puntualidad": round(on_time / len(entries) * 100, 2),
-                }
-            )
-        return sorted(ranking, key=lambda item: item["porcentaje_puntualidad"], reverse=True)
+        """Ranking según el horario de cada colaborador, con los totales que se mantienen al marcar."""
+
+        return punctuality_ranking(self.collaborators.values())
+
+    def rollup_differences(self) -> Dict[str, List[Dict[str, object]]]:
+        """Recalcula los resúmenes materializados y reporta los que no coinciden."""
+
+        report: Dict[str, List[Dict[str, object]]] = {}
+        for collaborator_id, collaborator in self.collaborators.items():
+            differences = collaborator.rollups.diff()
+            if differences:
+                report[collaborator_id] = differences
+        return report
 
     def hours_balance_summary(self) -> Dict[str, float]:
         total_balance = sum((c.history.hours_balance for c in self.collaborators.values()), timedelta())
@@ -203,27 +663,53 @@ class AdminPortal:
             created_at=datetime.utcnow(),
             collaborator_id=collaborator_id,
         )
-        self.notifications.append(notification)
+        self.notification_center.add(notification)
+        self.touch(collaborator_id)
+        if self.store:
+            self.store.save_notification(notification)
+        if self.bus:
+            self.bus.publish(
+                "notificacion", colaborador=collaborator_id, mensaje=message, categoria=category.value
+            )
         return notification
 
+    @property
+    def notifications(self) -> List[Notification]:
+        """Todos los avisos en orden de envío."""
+
+        return list(self.notification_center)
+
     def list_notifications(self, collaborator_id: str) -> List[Notification]:
-        return [n for n in self.notifications if n.collaborator_id in (None, collaborator_id)]
+        return self.notification_center.feed(collaborator_id)
+
+    def notification_page(
+        self, collaborator_id: str, before: Optional[int] = None, limit: int = 10
+    ) -> Tuple[List[Notification], Optional[int]]:
+        """Página de avisos más recientes primero y el cursor de la siguiente."""
+
+        return self.notification_center.page(collaborator_id, before, limit)
+
+    def unread_notifications(self, collaborator_id: str) -> int:
+        return self.notification_center.unread(collaborator_id)
+
+    def mark_notifications_read(self, collaborator_id: str) -> None:
+        center = self.notification_center
+        if not center.unread(collaborator_id):
+            return
+        center.mark_read(collaborator_id)
+        if self.store:
+            self.store.save_notification_read(collaborator_id, center.read_until(collaborator_id))
 
     def create_announcement(
         self, title: str, body: str, category: NotificationCategory = NotificationCategory.INFO
     ) -> Announcement:
         announcement = Announcement(title=title, body=body, created_at=datetime.utcnow(), category=category)
         self.announcements.append(announcement)
+        self.touch()
+        if self.store:
+            self.store.save_announcement(announcement)
         return announcement
 
     def export_history(self, collaborator_id: str) -> List[Dict[str, str]]:
         collaborator = self.collaborators[collaborator_id]
-        return [
-            {
-                "dia": entry.day.isoformat(),
-                "entrada": entry.check_in.isoformat() if entry.check_in else "",
-                "salida": entry.check_out.isoformat() if entry.check_out else "",
-                "horas": f"{entry.worked_timedelta().total_seconds() / 3600:.2f}",
-            }
-            for entry in collaborator.history.time_entries
-        ]
+        return [entry_row(entry) for entry in collaborator.history.time_entries]
@@ -1,18 +1,149 @@
 """Indicadores claves y reportes del panel de control."""
 from __future__ import annotations
 
-from collections import defaultdict
+from array import array
+from dataclasses import dataclass, field
 from datetime import date, timedelta
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from .columns import TeamColumns
 from .models import Collaborator
+from .projects import MonthKey, ProjectHoursLedger
+from .punctuality import PunctualityEngine
+
+
+class HoursMatrix:
+    """Matriz densa colaboradores × días con segundos trabajados y esperados.
+
+    Cada medida es un ``array`` en orden por filas: la fila ``i`` es el
+    colaborador ``i`` y la columna ``j`` el día ``start + j``. Totales por día,
+    mapas de calor personales y tarjetas del mes salen de reducir filas o
+    columnas de la misma matriz.
+    """
+
+    def __init__(self, collaborator_ids: List[str], start: date, days: int) -> None:
+        self.collaborator_ids = collaborator_ids
+        self.rows = {collaborator_id: index for index, collaborator_id in enumerate(collaborator_ids)}
+        self.start = start
+        self.days = days
+        size = len(collaborator_ids) * days
+        self.worked = array("d", bytes(8 * size))
+        self.expected = array("d", bytes(8 * size))
+
+    def day(self, column: int) -> date:
+        return self.start + timedelta(days=column)
+
+    def column(self, day: date) -> int:
+        return (day - self.start).days
+
+    def row(self, collaborator_id: str, measure: str = "worked") -> array:
+        offset = self.rows[collaborator_id] * self.days
+        return getattr(self, measure)[offset : offset + self.days]
+
+    def column_totals(self, measure: str = "worked") -> List[float]:
+        values = getattr(self, measure)
+        totals = [0.0] * self.days
+        for offset in range(0, len(values), self.days):
+            for column, value in enumerate(values[offset : offset + self.days]):
+                totals[column] += value
+        return totals
+
+    def row_totals(self, measure: str = "worked") -> Dict[str, float]:
+        values = getattr(self, measure)
+        return {
+            collaborator_id: sum(values[index * self.days : (index + 1) * self.days])
+            for collaborator_id, index in self.rows.items()
+        }
+
+
+Period = Tuple[date, date]
+MEASURES = ("horas_trabajadas", "horas_esperadas", "horas_extra", "horas_faltantes")
+
+
+def weekly_periods(first_week: date, weeks: int) -> List[Period]:
+    """Semanas consecutivas de lunes a domingo desde la que contiene ``first_week``."""
+
+    monday = first_week - timedelta(days=first_week.weekday())
+    return [(monday + timedelta(weeks=k), monday + timedelta(weeks=k, days=6)) for k in range(weeks)]
+
+
+def monthly_periods(first_month: date, months: int) -> List[Period]:
+    """Meses calendario consecutivos desde el que contiene ``first_month``."""
+
+    periods: List[Period] = []
+    year, month = first_month.year, first_month.month
+    for _ in range(months):
+        following = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        periods.append((date(year, month, 1), following - timedelta(days=1)))
+        year, month = following.year, following.month
+    return periods
+
+
+@dataclass
+class PeriodSeries:
+    """Series por período para los gráficos del panel.
+
+    ``team`` y cada entrada de ``by_collaborator`` mapean una medida de
+    ``MEASURES`` a una lista de horas alineada con ``labels`` (inicio ISO de
+    cada período). Las horas extra y faltantes salen de la diferencia neta del
+    período, igual que en ``team_weekly_stats``.
+    """
+
+    periods: List[Period]
+    labels: List[str]
+    team: Dict[str, List[float]] = field(default_factory=dict)
+    by_collaborator: Dict[str, Dict[str, List[float]]] = field(default_factory=dict)
+
+    def point(self, index: int, collaborator_id: Optional[str] = None) -> Dict[str, float]:
+        """Valores de un período para el equipo o un colaborador."""
+
+        values = self.team if collaborator_id is None else self.by_collaborator[collaborator_id]
+        return {measure: values[measure][index] for measure in MEASURES}
+
+    def as_dict(self) -> Dict[str, object]:
+        return {"etiquetas": self.labels, "equipo": self.team, "colaboradores": self.by_collaborator}
+
+
+def _measures(worked: List[float], expected: List[float]) -> Dict[str, List[float]]:
+    return {
+        "horas_trabajadas": [seconds / 3600 for seconds in worked],
+        "horas_esperadas": [seconds / 3600 for seconds in expected],
+        "horas_extra": [max(0.0, (w - e) / 3600) for w, e in zip(worked, expected)],
+        "horas_faltantes": [max(0.0, (e - w) / 3600) for w, e in zip(worked, expected)],
+    }
 
 
 class AnalyticsPanel:
     """Provee métricas agregadas del equipo."""
 
-    def __init__(self, collaborators: Iterable[Collaborator]):
+    def __init__(self, collaborators: Iterable[Collaborator], project_hours: Optional[ProjectHoursLedger] = None):
         self.collaborators = list(collaborators)
+        # Compartir ``AdminPortal.project_hours`` para ver las aprobaciones al instante.
+        self.project_hours = project_hours or ProjectHoursLedger.from_collaborators(self.collaborators)
+        self.columns = TeamColumns(self.collaborators)
+        self.punctuality = PunctualityEngine(self.collaborators, self.columns)
+
+    def hours_matrix(self, start: date, end: date, collaborator_ids: Optional[Iterable[str]] = None) -> HoursMatrix:
+        """Arma la matriz colaboradores × días del rango en una pasada por las jornadas."""
+
+        collaborators = self.collaborators
+        if collaborator_ids is not None:
+            wanted = set(collaborator_ids)
+            collaborators = [c for c in collaborators if c.collaborator_id in wanted]
+        days = max(0, (end - start).days + 1)
+        matrix = HoursMatrix([c.collaborator_id for c in collaborators], start, days)
+        if not days:
+            return matrix
+        start_ordinal = start.toordinal()
+        for row, collaborator in enumerate(collaborators):
+            offset = row * days
+            week = [collaborator.expected_hours_for_day(start + timedelta(days=k)).total_seconds() for k in range(7)]
+            for column in range(days):
+                matrix.expected[offset + column] = week[column % 7]
+            history = collaborator.history
+            for entry in (*history.closed_entries_between(start, end), *history.open_entries_between(start, end)):
+                matrix.worked[offset + entry.day.toordinal() - start_ordinal] = entry.worked_timedelta().total_seconds()
+        return matrix
 
     def debt_vs_credit(self) -> Dict[str, float]:
         total_balance = sum((c.history.hours_balance for c in self.collaborators), timedelta())
@@ -21,42 +152,71 @@ class AnalyticsPanel:
             "horas_deuda": max(0.0, -total_balance.total_seconds() / 3600),
         }
 
-    def hours_by_project(self) -> Dict[str, float]:
-        """Suma horas extra por actividad registrada en la carga de solicitudes."""
+    def hours_by_project(self, first: Optional[MonthKey] = None, last: Optional[MonthKey] = None) -> Dict[str, float]:
+        """Horas de actividades especiales aprobadas por proyecto, opcionalmente entre dos meses."""
+
+        return self.project_hours.hours_by_project(first, last)
 
-        project_hours: Dict[str, float] = defaultdict(float)
-        for collaborator in self.collaborators:
-            for request in collaborator.history.requests:
-                if request.request_type == request.request_type.SPECIAL_ACTIVITY and request.status == request.status.APPROVED:
-                    project = request.payload.get("proyecto", "sin_proyecto")
-                    hours = float(request.payload.get("horas", 0))
-                    project_hours[project] += hours
-        return dict(project_hours)
+    def top_projects(self, year: int, month: int, limit: int = 5) -> List[Tuple[str, float]]:
+        return self.project_hours.top_projects(year, month, limit)
 
     def team_weekly_stats(self, week_start: date) -> Dict[str, float]:
-        week_end = week_start + timedelta(days=6)
-        worked = sum(
-            (c.history.worked_hours_between(week_start, week_end) for c in self.collaborators),
-            timedelta(),
-        )
-        expected = sum(
-            (c.expected_hours_between(week_start, week_end) for c in self.collaborators),
-            timedelta(),
-        )
-        diff = worked - expected
-        return {
-            "horas_trabajadas": worked.total_seconds() / 3600,
-            "horas_esperadas": expected.total_seconds() / 3600,
-            "horas_extra": max(0.0, diff.total_seconds() / 3600),
-            "horas_faltantes": max(0.0, -diff.total_seconds() / 3600),
-        }
+        return self.period_series([(week_start, week_start + timedelta(days=6))]).point(0)
+
+    def period_series(
+        self, periods: Iterable[Period], collaborator_ids: Optional[Iterable[str]] = None
+    ) -> PeriodSeries:
+        """Horas trabajadas, esperadas, extra y faltantes de varios períodos a la vez.
+
+        Las jornadas de cada colaborador se recorren una sola vez (sumas
+        acumuladas del bloque columnar); luego cada período cuesta dos
+        búsquedas binarias, así que 52 semanas no son 52 barridos. Los
+        períodos pueden tener cualquier largo y solaparse.
+        """
+
+        periods = list(periods)
+        collaborators = self.collaborators
+        if collaborator_ids is not None:
+            wanted = set(collaborator_ids)
+            collaborators = [c for c in collaborators if c.collaborator_id in wanted]
+        series = PeriodSeries(periods, [start.isoformat() for start, _ in periods])
+        team_worked = [0.0] * len(periods)
+        team_expected = [0.0] * len(periods)
+        for collaborator in collaborators:
+            block = self.columns.block(collaborator)
+            worked = [block.worked_seconds(start, end) for start, end in periods]
+            expected = [collaborator.expected_hours_between(start, end).total_seconds() for start, end in periods]
+            for index in range(len(periods)):
+                team_worked[index] += worked[index]
+                team_expected[index] += expected[index]
+            series.by_collaborator[collaborator.collaborator_id] = _measures(worked, expected)
+        series.team = _measures(team_worked, team_expected)
+        return series
+
+    def weekly_series(
+        self, first_week: date, weeks: int, collaborator_ids: Optional[Iterable[str]] = None
+    ) -> PeriodSeries:
+        return self.period_series(weekly_periods(first_week, weeks), collaborator_ids)
+
+    def monthly_series(
+        self, first_month: date, months: int, collaborator_ids: Optional[Iterable[str]] = None
+    ) -> PeriodSeries:
+        return self.period_series(monthly_periods(first_month, months), collaborator_ids)
 
     def punctuality_trend(self) -> List[Dict[str, float]]:
         trend: List[Dict[str, float]] = []
-        for collaborator in self.collaborators:
-            entries = [entry for entry in collaborator.history.time_entries if entry.check_in]
-            if not entries:
+        for collaborator, block in self.columns.blocks():
+            avg_hour = block.average_check_in_hour()
+            if avg_hour is None:
                 continue
-            avg_hour = sum(entry.check_in.hour for entry in entries) / len(entries)
-            trend.append({"colaborador": collaborator.full_name, "hora_promedio_entrada": round(avg_hour, 2)})
+            profile = self.punctuality.profile(collaborator)
+            trend.append(
+                {
+                    "colaborador": collaborator.full_name,
+                    "hora_promedio_entrada": round(avg_hour, 2),
+                    "minutos_tarde_p50": profile.p50,
+                    "minutos_tarde_p90": profile.p90,
+                    "tendencia_4_semanas": profile.rolling_trend,
+                }
+            )
         return trend
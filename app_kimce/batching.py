@@ -0,0 +1,169 @@
+"""Confirmación en grupo de las escrituras concurrentes (group commit).
+
+En la hora punta de marcaciones muchas peticiones escriben casi a la vez.
+``GroupCommitStore`` las encola y un hilo escritor las confirma en lotes
+(una transacción / un ``fsync`` por lote). Cada llamada bloquea hasta que el
+lote que contiene su escritura quedó en disco, así que la respuesta al
+usuario sigue significando "guardado".
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Callable, Deque, List, Optional
+
+from .models import AccessRequest, Announcement, CalendarEvent, Holiday, Notification, Request, TimeEntry
+from .serialization import (
+    access_from_dict,
+    access_to_dict,
+    announcement_from_dict,
+    announcement_to_dict,
+    entry_from_dict,
+    entry_to_dict,
+    event_from_dict,
+    event_to_dict,
+    holiday_from_dict,
+    holiday_to_dict,
+    notification_from_dict,
+    notification_to_dict,
+    request_from_dict,
+    request_to_dict,
+)
+from .storage import BatchStore
+
+
+class _PendingWrite:
+    __slots__ = ("operation", "done", "error")
+
+    def __init__(self, operation: Callable[[], None]) -> None:
+        self.operation = operation
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class GroupCommitStore:
+    """Intermediario de ``storage.Store`` que agrupa escrituras antes de confirmarlas.
+
+    Si solo hay una escritura en cola se confirma sin esperar (por ejemplo,
+    con workers síncronos que atienden una petición a la vez). Con varias, el
+    lote se cierra al juntar ``max_batch`` escrituras o cuando pasan
+    ``max_delay`` segundos desde que llegó la primera. Si el lote falla, todas
+    sus llamadas reciben la excepción.
+    """
+
+    def __init__(self, backend: BatchStore, max_batch: int = 64, max_delay: float = 0.005) -> None:
+        self.backend = backend
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.writes = 0
+        self._closed = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._condition = threading.Condition()
+        self._queue: Deque[_PendingWrite] = deque()
+        self._writer: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+
+    def _submit(self, operation: Callable[[], None]) -> None:
+        pending = _PendingWrite(operation)
+        if self._pid != os.getpid():
+            self._reset()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("El buffer de escritura ya fue cerrado")
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="kimce-group-commit", daemon=True)
+                self._writer.start()
+            self._queue.append(pending)
+            self._condition.notify()
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+
+    def _next_batch(self) -> List[_PendingWrite]:
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            # Una escritura sola (sin otras en cola) se confirma de inmediato; la
+            # espera solo vale la pena cuando ya hay escrituras concurrentes, y
+            # las que lleguen durante el commit forman el lote siguiente.
+            deadline = time.monotonic() + self.max_delay
+            while 1 < len(self._queue) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch))]
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            error: Optional[BaseException] = None
+            try:
+                with self.backend.batch():
+                    for pending in batch:
+                        pending.operation()
+            except Exception as exc:  # se entrega a cada llamada del lote
+                error = exc
+            self.batches += 1
+            self.writes += len(batch)
+            for pending in batch:
+                pending.error = error
+                pending.done.set()
+
+    def close(self) -> None:
+        """Confirma lo que quede en cola y detiene el hilo escritor."""
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            writer = self._writer
+        if writer is not None and self._pid == os.getpid():
+            writer.join()
+
+    # --- storage.Store ---------------------------------------------------
+    # Los objetos se serializan en el hilo que llama: el escritor confirma una
+    # copia, aunque la petición siga modificando la jornada o la solicitud.
+    def save_entry(self, collaborator_id: str, entry: TimeEntry) -> None:
+        data = entry_to_dict(entry)
+        self._submit(lambda: self.backend.save_entry(collaborator_id, entry_from_dict(data)))
+
+    def save_request(self, request: Request) -> None:
+        data = request_to_dict(request)
+        self._submit(lambda: self.backend.save_request(request_from_dict(data)))
+
+    def save_balance(self, collaborator_id: str, balance: timedelta) -> None:
+        self._submit(lambda: self.backend.save_balance(collaborator_id, balance))
+
+    def save_event(self, event: CalendarEvent) -> None:
+        data = event_to_dict(event)
+        self._submit(lambda: self.backend.save_event(event_from_dict(data)))
+
+    def save_holiday(self, holiday: Holiday) -> None:
+        data = holiday_to_dict(holiday)
+        self._submit(lambda: self.backend.save_holiday(holiday_from_dict(data)))
+
+    def delete_holiday(self, name: str, day: date) -> None:
+        self._submit(lambda: self.backend.delete_holiday(name, day))
+
+    def save_notification(self, notification: Notification) -> None:
+        data = notification_to_dict(notification)
+        self._submit(lambda: self.backend.save_notification(notification_from_dict(data)))
+
+    def save_notification_read(self, collaborator_id: str, read_until: datetime) -> None:
+        self._submit(lambda: self.backend.save_notification_read(collaborator_id, read_until))
+
+    def save_announcement(self, announcement: Announcement) -> None:
+        data = announcement_to_dict(announcement)
+        self._submit(lambda: self.backend.save_announcement(announcement_from_dict(data)))
+
+    def save_access_request(self, access: AccessRequest) -> None:
+        data = access_to_dict(access)
+        self._submit(lambda: self.backend.save_access_request(access_from_dict(data)))
@@ -2,12 +2,16 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from datetime import date
-from typing import Dict, Iterable, List
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
 
 from .models import CalendarEvent, Collaborator, Holiday
 
 
+def _as_date(value: date) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
 class CalendarBoard:
     """Construye vistas del calendario mensual y semanal."""
 
@@ -15,6 +19,31 @@ class CalendarBoard:
         self.collaborators = list(collaborators)
         self.holidays = list(holidays)
         self.events = list(events)
+        self._workdays: Dict[Tuple[str, int, int], Tuple[int, List[CalendarEvent]]] = {}
+
+    @staticmethod
+    def spread_by_day(events: Iterable[CalendarEvent], first_day: date, last_day: date) -> Dict[date, List[CalendarEvent]]:
+        """Reparte eventos ordenados por inicio en cada día que abarcan.
+
+        Un solo barrido recorre días y eventos a la vez manteniendo la lista de
+        eventos activos, así que el costo es O(eventos + días) más el tamaño
+        del resultado. Los eventos de varios días aparecen en cada celda.
+        """
+
+        cells: Dict[date, List[CalendarEvent]] = {}
+        upcoming = iter(events)
+        next_event = next(upcoming, None)
+        active: List[CalendarEvent] = []
+        current = first_day
+        while current <= last_day:
+            while next_event is not None and _as_date(next_event.start) <= current:
+                active.append(next_event)
+                next_event = next(upcoming, None)
+            if active:
+                active = [event for event in active if _as_date(event.end) >= current]
+            cells[current] = list(active)
+            current += timedelta(days=1)
+        return cells
 
     def by_collaborator(self, collaborator_id: str) -> List[CalendarEvent]:
         return sorted(
@@ -28,16 +57,9 @@ class CalendarBoard:
             if event.start.month == month and event.start.year == year:
                 overview[event.collaborator_id or "general"].append(event)
         for collaborator in self.collaborators:
-            for entry in collaborator.history.time_entries:
-                if entry.day.month == month and entry.day.year == year and entry.check_in and entry.check_out:
-                    overview[collaborator.collaborator_id].append(
-                        CalendarEvent(
-                            title="Jornada",
-                            start=entry.check_in,
-                            end=entry.check_out,
-                            collaborator_id=collaborator.collaborator_id,
-                        )
-                    )
+            workdays = self._month_workdays(collaborator, month, year)
+            if workdays:
+                overview[collaborator.collaborator_id].extend(workdays)
         for holiday in self.holidays:
             if holiday.day.month == month and holiday.day.year == year:
                 overview["general"].append(
@@ -51,8 +73,32 @@ class CalendarBoard:
             events.sort(key=lambda event: event.start)
         return overview
 
+    def _month_workdays(self, collaborator: Collaborator, month: int, year: int) -> List[CalendarEvent]:
+        """Jornadas cerradas del mes como eventos, memorizadas por versión del mes del historial."""
+
+        history = collaborator.history
+        key = (collaborator.collaborator_id, year, month)
+        version = history.month_version(year, month)
+        cached = self._workdays.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        first_day = date(year, month, 1)
+        last_day = (date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)) - timedelta(days=1)
+        events = [
+            CalendarEvent(
+                title="Jornada",
+                start=entry.check_in,
+                end=entry.check_out,
+                collaborator_id=collaborator.collaborator_id,
+            )
+            for entry in history.closed_entries_between(first_day, last_day)
+            if entry.check_in and entry.check_out
+        ]
+        self._workdays[key] = (version, events)
+        return events
+
     def team_load_for_day(self, day: date) -> Dict[str, int]:
         load = defaultdict(int)
         for collaborator in self.collaborators:
-            load[collaborator.collaborator_id] += sum(1 for entry in collaborator.history.time_entries if entry.day == day)
+            load[collaborator.collaborator_id] += 1 if collaborator.history.entry_for(day) else 0
         return load
@@ -0,0 +1,168 @@
+"""Representación columnar de las jornadas para los cálculos del panel.
+
+En lugar de recorrer objetos ``TimeEntry`` se guardan arreglos paralelos
+(``array``) por colaborador: día, entrada/salida en segundos desde epoch,
+segundos de descanso, segundos trabajados y hora de entrada. Las métricas
+del equipo se reducen a ``sum``/``count`` sobre rebanadas de esos arreglos.
+Cada bloque se deriva del historial una vez; cuando cambia su versión de
+jornadas solo se vuelven a derivar los meses tocados.
+"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from calendar import monthrange
+from heapq import merge
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from .indexes import prefix_range_sum, rebuild_prefix
+
+if TYPE_CHECKING:
+    from .models import Collaborator, CollaboratorHistory, TimeEntry
+
+_EPOCH = datetime(1970, 1, 1)
+_MISSING = float("nan")
+
+
+def _epoch_seconds(value: Optional[datetime]) -> float:
+    return (value - _EPOCH).total_seconds() if value is not None else _MISSING
+
+
+class EntryColumns:
+    """Columnas de las jornadas de un colaborador, ordenadas por día."""
+
+    def __init__(self, history: CollaboratorHistory) -> None:
+        self.version = history.entries_version()
+        self._month_versions = history.month_versions()
+        self.day = array("l")
+        self.check_in = array("d")
+        self.check_out = array("d")
+        self.breaks = array("d")
+        self.worked = array("d")
+        self.check_in_hour = array("b")
+        # Jornadas cerradas con descanso abierto, por día ordinal: su tiempo trabajado depende de la hora actual.
+        self.ongoing: Dict[int, float] = {}
+        self._worked_prefix: Optional[array] = None
+        self._append(sorted(history.time_entries, key=lambda entry: entry.day))
+
+    def _append(self, entries: Iterable[TimeEntry]) -> None:
+        for entry in entries:
+            breaks = sum((end - start).total_seconds() for start, end in entry.iter_breaks())
+            self.day.append(entry.day.toordinal())
+            self.check_in.append(_epoch_seconds(entry.check_in))
+            self.check_out.append(_epoch_seconds(entry.check_out))
+            self.breaks.append(breaks)
+            self.check_in_hour.append(entry.check_in.hour if entry.check_in else -1)
+            if entry.check_in and entry.check_out:
+                self.worked.append((entry.check_out - entry.check_in).total_seconds() - breaks)
+                if entry.ongoing_break_start:
+                    self.ongoing[entry.day.toordinal()] = _epoch_seconds(entry.ongoing_break_start)
+            else:
+                self.worked.append(0.0)
+
+    def refresh(self, history: CollaboratorHistory) -> None:
+        """Vuelve a derivar solo los meses cuya versión cambió desde la última lectura.
+
+        Las filas de esos meses se sacan de las columnas y se vuelven a
+        agregar las del historial; si el cambio cae al final (lo habitual: la
+        jornada de hoy) es un simple agregado al bloque.
+        """
+
+        versions = history.month_versions()
+        changed = sorted(month for month, version in versions.items() if self._month_versions.get(month) != version)
+        self.version = history.entries_version()
+        self._month_versions = versions
+        if not changed:
+            return
+        first = date(*changed[0], 1).toordinal()
+        low = bisect_left(self.day, first)
+        # Filas posteriores al primer mes cambiado que no pertenecen a meses cambiados.
+        tail = [self._row(row) for row in range(low, len(self.day)) if self._month_of(row) not in changed]
+        for column in (self.day, self.check_in, self.check_out, self.breaks, self.worked, self.check_in_hour):
+            del column[low:]
+        for ordinal in [ordinal for ordinal in self.ongoing if ordinal >= first]:
+            if date.fromordinal(ordinal).timetuple()[:2] in changed:
+                del self.ongoing[ordinal]
+        fresh = [
+            entry
+            for year, month in changed
+            for entry in (history.entry_for(date(year, month, day)) for day in range(1, monthrange(year, month)[1] + 1))
+            if entry is not None
+        ]
+        rows = merge(
+            ((values[0], values) for values in tail),
+            ((entry.day.toordinal(), entry) for entry in fresh),
+            key=lambda item: item[0],
+        )
+        for _, row in rows:
+            if type(row) is tuple:
+                self._append_row(row)
+            else:
+                self._append((row,))
+        if self._worked_prefix is not None:
+            rebuild_prefix(self._worked_prefix, self.worked, low)
+
+    def _month_of(self, row: int) -> Tuple[int, int]:
+        return date.fromordinal(self.day[row]).timetuple()[:2]
+
+    def _row(self, row: int) -> tuple:
+        return (
+            self.day[row],
+            self.check_in[row],
+            self.check_out[row],
+            self.breaks[row],
+            self.worked[row],
+            self.check_in_hour[row],
+        )
+
+    def _append_row(self, values: tuple) -> None:
+        for column, value in zip((self.day, self.check_in, self.check_out, self.breaks, self.worked, self.check_in_hour), values):
+            column.append(value)
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    def worked_prefix(self) -> array:
+        """Sumas acumuladas de ``worked`` (ver ``indexes.rebuild_prefix``)."""
+
+        if self._worked_prefix is None:
+            self._worked_prefix = array("d", [0.0])
+            rebuild_prefix(self._worked_prefix, self.worked, 0)
+        return self._worked_prefix
+
+    def worked_seconds(self, start: date, end: date) -> float:
+        total = prefix_range_sum(self.day, self.worked_prefix(), start, end)
+        if self.ongoing:
+            now = _epoch_seconds(datetime.utcnow())
+            first, last = start.toordinal(), end.toordinal()
+            total -= sum(now - began for ordinal, began in self.ongoing.items() if first <= ordinal <= last)
+        return total
+
+    def average_check_in_hour(self) -> Optional[float]:
+        """Promedio de la hora (entera) de entrada de las jornadas con entrada."""
+
+        hours = [hour for hour in self.check_in_hour if hour >= 0]  # -1: sin entrada
+        if not hours:
+            return None
+        return sum(hours) / len(hours)
+
+
+class TeamColumns:
+    """Bloques columnares del equipo; el índice de colaborador es su posición en ``collaborators``."""
+
+    def __init__(self, collaborators: List[Collaborator]) -> None:
+        self.collaborators = collaborators
+        self._blocks: Dict[str, EntryColumns] = {}
+
+    def block(self, collaborator: Collaborator) -> EntryColumns:
+        history = collaborator.history
+        block = self._blocks.get(collaborator.collaborator_id)
+        if block is None:
+            block = self._blocks[collaborator.collaborator_id] = EntryColumns(history)
+        elif block.version != history.entries_version():
+            block.refresh(history)
+        return block
+
+    def blocks(self) -> List[Tuple[Collaborator, EntryColumns]]:
+        return [(collaborator, self.block(collaborator)) for collaborator in self.collaborators]
@@ -0,0 +1,117 @@
+"""Bus de eventos en proceso para mantener vivos los dashboards.
+
+Los portales publican cambios pequeños (marcaciones, solicitudes, revisiones,
+avisos) y cada conexión SSE abierta tiene su propia cola. Publicar cuesta
+O(suscriptores) y cada espectador recibe solo los eventos nuevos, en vez de
+recalcular la página completa en cada recarga.
+
+El bus vive en la memoria del proceso: con varios workers cada uno transmite
+los eventos que él mismo atendió.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, List, Optional
+
+
+@dataclass(frozen=True)
+class BusEvent:
+    event_id: int
+    kind: str
+    data: Dict[str, object]
+
+    def to_sse(self) -> str:
+        """Bloque en formato ``text/event-stream``."""
+
+        payload = json.dumps(self.data, ensure_ascii=False, default=str)
+        return f"id: {self.event_id}\nevent: {self.kind}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """Cola de un suscriptor; si se llena se descartan los eventos más antiguos."""
+
+    def __init__(self, bus: EventBus, max_pending: int) -> None:
+        self.bus = bus
+        self.dropped = 0
+        self._queue: Deque[BusEvent] = deque(maxlen=max_pending)
+        self._ready = threading.Condition()
+
+    def _push(self, event: BusEvent) -> None:
+        with self._ready:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(event)
+            self._ready.notify()
+
+    def get(self, timeout: Optional[float] = None) -> List[BusEvent]:
+        """Eventos pendientes; espera hasta ``timeout`` segundos si no hay ninguno."""
+
+        with self._ready:
+            if not self._queue:
+                self._ready.wait(timeout)
+            events = list(self._queue)
+            self._queue.clear()
+        return events
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """Publicación/suscripción en memoria con un historial corto para reconexiones."""
+
+    def __init__(self, history: int = 256, max_pending: int = 1000) -> None:
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._subscribers: List[Subscription] = []
+        self._recent: Deque[BusEvent] = deque(maxlen=history)
+        self._last_id = 0
+
+    def publish(self, kind: str, **data: object) -> BusEvent:
+        with self._lock:
+            self._last_id += 1
+            event = BusEvent(self._last_id, kind, data)
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription._push(event)
+        return event
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """Nueva suscripción; con ``last_event_id`` recibe primero lo que se perdió (si sigue en el historial)."""
+
+        subscription = Subscription(self, self.max_pending)
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._recent:
+                    if event.event_id > last_event_id:
+                        subscription._push(event)
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+
+def sse_stream(subscription: Subscription, keepalive: float = 15.0, retry_ms: int = 3000) -> Iterable[str]:
+    """Generador para una respuesta SSE; envía un comentario cada ``keepalive`` segundos sin eventos."""
+
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        while True:
+            events = subscription.get(timeout=keepalive)
+            if not events:
+                yield ": ping\n\n"
+            for event in events:
+                yield event.to_sse()
+    finally:
+        subscription.close()
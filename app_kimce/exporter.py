@@ -0,0 +1,94 @@
+"""Exportación en streaming del historial de marcaciones (CSV o NDJSON).
+
+Las filas se generan colaborador por colaborador y mes a mes, y se agrupan
+en bloques de texto listos para enviar, así que una exportación de varios
+años del equipo completo empieza a transmitirse de inmediato y usa memoria
+constante.
+"""
+from __future__ import annotations
+
+import csv
+import heapq
+import io
+import json
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+from .models import TimeEntry
+
+if TYPE_CHECKING:
+    from .admin import AdminPortal
+
+COLUMNS = ("colaborador", "dia", "entrada", "salida", "horas")
+
+
+def entry_row(entry: TimeEntry) -> Dict[str, str]:
+    """Fila de exportación de una jornada (mismo formato que ``AdminPortal.export_history``)."""
+
+    return {
+        "dia": entry.day.isoformat(),
+        "entrada": entry.check_in.isoformat() if entry.check_in else "",
+        "salida": entry.check_out.isoformat() if entry.check_out else "",
+        "horas": f"{entry.worked_timedelta().total_seconds() / 3600:.2f}",
+    }
+
+
+def _month_windows(start: date, end: date) -> Iterator[tuple[date, date]]:
+    current = start
+    while current <= end:
+        following = date(current.year + 1, 1, 1) if current.month == 12 else date(current.year, current.month + 1, 1)
+        yield current, min(end, following - timedelta(days=1))
+        current = following
+
+
+def iter_history(
+    admin: AdminPortal, start: date, end: date, collaborator_ids: Optional[Iterable[str]] = None
+) -> Iterator[Dict[str, str]]:
+    """Filas del rango para los colaboradores indicados (todos por defecto).
+
+    Se agrupan por colaborador, en el orden de ``collaborator_ids``, y dentro
+    de cada colaborador van ordenadas por día.
+    """
+
+    ids = list(collaborator_ids) if collaborator_ids is not None else list(admin.collaborators)
+    for collaborator_id in ids:
+        history = admin.collaborators[collaborator_id].history
+        for first, last in _month_windows(start, end):
+            entries = heapq.merge(
+                history.closed_entries_between(first, last),
+                sorted(history.open_entries_between(first, last), key=lambda entry: entry.day),
+                key=lambda entry: entry.day,
+            )
+            for entry in entries:
+                yield {"colaborador": collaborator_id, **entry_row(entry)}
+
+
+def stream_csv(rows: Iterable[Dict[str, str]], chunk_size: int = 500) -> Iterator[str]:
+    """CSV con encabezado, entregado en bloques de ``chunk_size`` filas."""
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def stream_ndjson(rows: Iterable[Dict[str, str]], chunk_size: int = 500) -> Iterator[str]:
+    """Un objeto JSON por línea, entregado en bloques de ``chunk_size`` filas."""
+
+    chunk: List[str] = []
+    for row in rows:
+        chunk.append(json.dumps(row, ensure_ascii=False))
+        if len(chunk) >= chunk_size:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
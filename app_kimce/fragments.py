@@ -0,0 +1,65 @@
+"""Caché LRU de fragmentos de página por colaborador y versión de datos.
+
+Las tarjetas de colaborador (resumen semanal, saldo, indicador) se repiten en
+varias vistas y en cada recarga. Cada fragmento se guarda bajo una clave
+(por ejemplo ``("fila-equipo", colaborador, semana)``) junto con la versión de
+los datos con que se generó; si la versión ya no coincide se vuelve a generar
+y reemplaza a la anterior. Las versiones suben con cada cambio hecho por
+``CollaboratorPortal`` o ``AdminPortal`` (``Collaborator.version``), así que una
+marcación o una aprobación invalida sus fragmentos sin pasos extra.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class FragmentCache:
+    """Fragmentos recientes con un límite de entradas y contadores de aciertos."""
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, Tuple[Hashable, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fetch(self, key: Hashable, version: Hashable, build: Callable[[], T]) -> T:
+        """Devuelve el fragmento de ``key`` si se generó con ``version``; si no, lo genera."""
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]  # type: ignore[return-value]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entradas": len(self._entries),
+            "aciertos": self.hits,
+            "fallos": self.misses,
+            "desalojos": self.evictions,
+            "tasa_aciertos": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,150 @@
+"""Importación masiva de marcaciones exportadas por relojes biométricos.
+
+El archivo se lee como un flujo (CSV o NDJSON) y cada fila se aplica sobre la
+jornada de su colaborador con las mismas reglas del portal
+(``portal.PUNCH_ACTIONS``). Las jornadas terminadas se escriben por lotes con
+``AdminPortal.fix_time_entries``; en memoria solo quedan la jornada abierta
+de cada colaborador y el lote en curso, sin importar el tamaño del archivo.
+
+Columnas esperadas: ``colaborador``, ``fecha_hora`` (ISO 8601), ``accion``
+(``entrada``, ``descanso_inicio``, ``descanso_fin`` o ``salida``) y
+opcionalmente ``nota``.
+"""
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import TimeEntry
+from .portal import PUNCH_ACTIONS, FlowError
+
+if TYPE_CHECKING:
+    from .admin import AdminPortal
+
+COLUMNS = ("colaborador", "fecha_hora", "accion", "nota")
+
+
+@dataclass
+class RowError:
+    """Fila rechazada: número de línea en el archivo y motivo."""
+
+    line: int
+    message: str
+    collaborator_id: Optional[str] = None
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    punches: int = 0
+    entries: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Recorre un CSV con encabezado y entrega ``(línea, fila)`` sin cargarlo completo."""
+
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    positions = {name.strip().lower(): index for index, name in enumerate(header)}
+    columns = [(name, positions[name]) for name in COLUMNS if name in positions]
+    for line, values in enumerate(reader, start=2):
+        if values:
+            yield line, {name: values[index] if index < len(values) else "" for name, index in columns}
+
+
+def read_ndjson(lines: Iterable[str]) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Recorre un archivo con un objeto JSON por línea; las líneas ilegibles quedan como fila vacía."""
+
+    for line, text in enumerate(lines, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+        yield line, row if isinstance(row, dict) else {}
+
+
+class PunchImporter:
+    """Aplica filas de marcación sobre los historiales del ``AdminPortal``."""
+
+    def __init__(self, admin: AdminPortal, batch_size: int = 2000) -> None:
+        self.admin = admin
+        self.batch_size = batch_size
+
+    def import_csv(self, lines: Iterable[str]) -> ImportReport:
+        return self.import_rows(read_csv(lines))
+
+    def import_ndjson(self, lines: Iterable[str]) -> ImportReport:
+        return self.import_rows(read_ndjson(lines))
+
+    def import_rows(self, rows: Iterable[Tuple[int, Dict[str, str]]]) -> ImportReport:
+        report = ImportReport()
+        collaborators = self.admin.collaborators
+        # Jornada en construcción por colaborador y jornadas listas para escribir.
+        open_entries: Dict[str, TimeEntry] = {}
+        ready: Dict[Tuple[str, date], TimeEntry] = {}
+        for line, row in rows:
+            report.rows += 1
+            collaborator_id = row.get("colaborador")
+            # En NDJSON los valores pueden venir como números, listas u objetos.
+            not_text = [name for name in COLUMNS if row.get(name) is not None and not isinstance(row[name], str)]
+            if not_text:
+                report.errors.append(
+                    RowError(
+                        line,
+                        f"Valores que no son texto en: {', '.join(not_text)}",
+                        collaborator_id if isinstance(collaborator_id, str) else None,
+                    )
+                )
+                continue
+            collaborator = collaborators.get(collaborator_id)
+            if collaborator is None:
+                report.errors.append(RowError(line, f"Colaborador desconocido: {collaborator_id or '(vacío)'}"))
+                continue
+            action = PUNCH_ACTIONS.get(row.get("accion"))
+            if action is None:
+                report.errors.append(RowError(line, f"Acción desconocida: {row.get('accion') or '(vacía)'}", collaborator_id))
+                continue
+            try:
+                ts = datetime.fromisoformat(row.get("fecha_hora") or "")
+            except ValueError:
+                report.errors.append(RowError(line, f"Fecha inválida: {row.get('fecha_hora') or '(vacía)'}", collaborator_id))
+                continue
+
+            day = ts.date()
+            entry = open_entries.get(collaborator_id)
+            if entry is None or entry.day != day:
+                if entry is not None:
+                    ready[(collaborator_id, entry.day)] = entry
+                entry = ready.pop((collaborator_id, day), None) or collaborator.history.entry_for(day) or TimeEntry(day=day)
+                open_entries[collaborator_id] = entry
+            try:
+                action(entry, ts, row.get("nota") or None)
+            except FlowError as exc:
+                report.errors.append(RowError(line, str(exc), collaborator_id))
+                if entry.check_in is None and collaborator.history.entry_for(day) is not entry:
+                    del open_entries[collaborator_id]  # no deja jornadas vacías por una fila rechazada
+                continue
+            report.punches += 1
+            if len(ready) >= self.batch_size:
+                report.entries += self._write(ready)
+                ready = {}
+        ready.update(((collaborator_id, entry.day), entry) for collaborator_id, entry in open_entries.items())
+        report.entries += self._write(ready)
+        return report
+
+    def _write(self, ready: Dict[Tuple[str, date], TimeEntry]) -> int:
+        by_collaborator: Dict[str, List[TimeEntry]] = {}
+        for (collaborator_id, _), entry in ready.items():
+            by_collaborator.setdefault(collaborator_id, []).append(entry)
+        for collaborator_id, entries in by_collaborator.items():
+            entries.sort(key=lambda entry: entry.day)
+            self.admin.fix_time_entries(collaborator_id, entries)
+        return len(ready)
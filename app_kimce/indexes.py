@@ -0,0 +1,219 @@
+"""Índices en memoria para consultar el historial sin recorrerlo completo."""
+from __future__ import annotations
+
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from itertools import accumulate, islice
+from typing import TYPE_CHECKING, Dict, Iterable, List, Set, Tuple
+
+if TYPE_CHECKING:
+    from .models import TimeEntry
+
+
+def _to_microseconds(value: timedelta) -> int:
+    return (value.days * 86400 + value.seconds) * 1_000_000 + value.microseconds
+
+
+def rebuild_prefix(prefix: array, values: array, start: int) -> None:
+    """Recalcula desde la fila ``start`` las sumas acumuladas de ``values``.
+
+    ``prefix[k]`` es el total de las primeras ``k`` filas, así que ``prefix``
+    tiene una posición más que ``values`` y ``prefix[0]`` es cero.
+    """
+
+    del prefix[start + 1 :]
+    prefix.extend(islice(accumulate(values[start:], initial=prefix[start]), 1, None))
+
+
+def prefix_range_sum(days: array, prefix: array, start: date, end: date):
+    """Suma de las filas cuyo día ordinal (``days``, ordenado) cae entre ``start`` y ``end``."""
+
+    low = bisect_left(days, start.toordinal())
+    high = bisect_right(days, end.toordinal())
+    return prefix[high] - prefix[low] if high > low else 0
+
+
+class WorkedHoursIndex:
+    """Horas trabajadas por día con sumas acumuladas para consultas por rango.
+
+    Las jornadas cerradas se guardan en arreglos ordenados por fecha junto a
+    sus sumas prefijas, de modo que un rango cuesta dos búsquedas binarias y
+    una resta. Las jornadas abiertas (sin salida o con descanso en curso)
+    quedan en una lista viva que se suma al momento de consultar.
+    """
+
+    def __init__(self) -> None:
+        self._days = array("l")
+        self._worked = array("q")
+        self._prefix = array("q", [0])
+        self._entries: List[TimeEntry] = []
+        self._open: Dict[date, TimeEntry] = {}
+
+    @staticmethod
+    def is_closed(entry: TimeEntry) -> bool:
+        return entry.check_out is not None and entry.ongoing_break_start is None
+
+    def update(self, entry: TimeEntry) -> None:
+        """Registra la jornada o la reclasifica si ya existía para ese día."""
+
+        self.discard(entry.day)
+        if self.is_closed(entry):
+            self._insert(entry)
+        else:
+            self._open[entry.day] = entry
+
+    def update_many(self, entries: Iterable[TimeEntry]) -> None:
+        """Versión masiva de ``update``: ordena una vez y recalcula las sumas prefijas una sola vez.
+
+        Si todas las jornadas cerradas nuevas van después de la última
+        indexada (el caso habitual al cargar en orden) solo se anexan.
+        """
+
+        latest: Dict[date, TimeEntry] = {}
+        for entry in entries:
+            latest[entry.day] = entry
+        if not latest:
+            return
+        ordinals = set()
+        closed = []
+        for day, entry in latest.items():
+            self._open.pop(day, None)
+            ordinals.add(day.toordinal())
+            if self.is_closed(entry):
+                closed.append((day.toordinal(), _to_microseconds(entry.worked_timedelta()), entry))
+            else:
+                self._open[day] = entry
+        closed.sort(key=lambda row: row[0])
+        start = bisect_left(self._days, min(ordinals))
+        kept = [
+            row
+            for row in zip(self._days[start:], self._worked[start:], self._entries[start:])
+            if row[0] not in ordinals
+        ]
+        del self._days[start:]
+        del self._worked[start:]
+        del self._entries[start:]
+        for ordinal, worked, entry in heapq.merge(kept, closed, key=lambda row: row[0]):
+            self._days.append(ordinal)
+            self._worked.append(worked)
+            self._entries.append(entry)
+        self._rebuild_prefix(start)
+
+    def discard(self, day: date) -> None:
+        if self._open.pop(day, None) is not None:
+            return
+        ordinal = day.toordinal()
+        position = bisect_left(self._days, ordinal)
+        if position < len(self._days) and self._days[position] == ordinal:
+            del self._days[position]
+            del self._worked[position]
+            del self._entries[position]
+            self._rebuild_prefix(position)
+
+    def worked_between(self, start: date, end: date) -> timedelta:
+        total = timedelta(microseconds=prefix_range_sum(self._days, self._prefix, start, end))
+        for day, entry in self._open.items():
+            if start <= day <= end:
+                total += entry.worked_timedelta()
+        return total
+
+    def closed_entries_between(self, start: date, end: date) -> List[TimeEntry]:
+        """Jornadas cerradas del rango, ordenadas por día."""
+
+        low = bisect_left(self._days, start.toordinal())
+        high = bisect_right(self._days, end.toordinal())
+        return self._entries[low:high]
+
+    def open_entries_between(self, start: date, end: date) -> List[TimeEntry]:
+        return [entry for day, entry in self._open.items() if start <= day <= end]
+
+    def _insert(self, entry: TimeEntry) -> None:
+        ordinal = entry.day.toordinal()
+        worked = _to_microseconds(entry.worked_timedelta())
+        position = bisect_left(self._days, ordinal)
+        if position == len(self._days):
+            self._days.append(ordinal)
+            self._worked.append(worked)
+            self._entries.append(entry)
+            self._prefix.append(self._prefix[-1] + worked)
+            return
+        self._days.insert(position, ordinal)
+        self._worked.insert(position, worked)
+        self._entries.insert(position, entry)
+        self._rebuild_prefix(position)
+
+    def _rebuild_prefix(self, start: int) -> None:
+        """Recalcula las sumas prefijas desde ``start`` tras una inserción o baja."""
+
+        rebuild_prefix(self._prefix, self._worked, start)
+
+
+class AbsenceIndex:
+    """Intervalos de ausencia aprobados, ordenados por fecha de inicio.
+
+    Junto a cada inicio se guarda el máximo acumulado de los finales. Como esa
+    columna es monótona, una búsqueda binaria descarta todos los intervalos
+    que terminan antes del rango consultado y la consulta cuesta
+    O(log n + k).
+    """
+
+    def __init__(self) -> None:
+        self._starts = array("l")
+        self._ends = array("l")
+        self._max_ends = array("l")
+        self._keys: List[str] = []
+        self._known: Set[str] = set()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._known
+
+    def add(self, key: str, start: date, end: date) -> None:
+        """Agrega el intervalo; si ``key`` ya estaba registrado no hace nada."""
+
+        if key in self._known:
+            return
+        self._known.add(key)
+        start_ordinal, end_ordinal = start.toordinal(), max(start, end).toordinal()
+        position = bisect_right(self._starts, start_ordinal)
+        self._starts.insert(position, start_ordinal)
+        self._ends.insert(position, end_ordinal)
+        self._keys.insert(position, key)
+        self._max_ends.insert(position, end_ordinal)
+        self._rebuild_max_ends(position)
+
+    def discard(self, key: str) -> None:
+        if key not in self._known:
+            return
+        self._known.discard(key)
+        position = self._keys.index(key)
+        del self._starts[position]
+        del self._ends[position]
+        del self._max_ends[position]
+        del self._keys[position]
+        self._rebuild_max_ends(position)
+
+    def ranges_between(self, start: date, end: date) -> List[Tuple[date, date]]:
+        """Devuelve los tramos ausentes dentro del rango, recortados y fusionados."""
+
+        start_ordinal, end_ordinal = start.toordinal(), end.toordinal()
+        low = bisect_left(self._max_ends, start_ordinal)
+        high = bisect_right(self._starts, end_ordinal)
+        merged: List[List[int]] = []
+        for position in range(low, high):
+            if self._ends[position] < start_ordinal:
+                continue
+            clipped_start = max(self._starts[position], start_ordinal)
+            clipped_end = min(self._ends[position], end_ordinal)
+            if merged and clipped_start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], clipped_end)
+            else:
+                merged.append([clipped_start, clipped_end])
+        return [(date.fromordinal(first), date.fromordinal(last)) for first, last in merged]
+
+    def _rebuild_max_ends(self, start: int) -> None:
+        running = self._max_ends[start - 1] if start > 0 else 0
+        for position in range(start, len(self._ends)):
+            running = max(running, self._ends[position])
+            self._max_ends[position] = running
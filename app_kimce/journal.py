@@ -0,0 +1,341 @@
+"""Bitácora de solo anexado con snapshots para reinicios rápidos.
+
+Cada operación que cambia el estado de los portales se agrega como una línea
+JSON al segmento vigente (``journal-000001.ndjson``, ...). Las líneas se
+escriben al sistema operativo en cuanto llegan y se sincronizan a disco
+(``fsync``) por grupos, o a más tardar ``group_interval`` segundos después
+de una escritura suelta. Cada cierto número de registros se escribe un
+snapshot completo, se abre un segmento nuevo y se borran los anteriores,
+así que al arrancar solo se lee el snapshot y la cola posterior.
+
+Los registros son "upserts" de estado (la jornada completa, la solicitud con
+su estado actual, el saldo resultante) con el mismo formato plano que las
+filas de ``storage``, así que se aplican con las mismas funciones.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+
+from .models import AccessRequest, Announcement, CalendarEvent, Holiday, Notification, Request, TimeEntry
+from .serialization import (
+    access_to_dict,
+    announcement_to_dict,
+    entry_to_dict,
+    event_to_dict,
+    holiday_to_dict,
+    notification_to_dict,
+    request_to_dict,
+)
+from .storage import APPLIERS
+
+if TYPE_CHECKING:
+    from .admin import AdminPortal
+
+Record = Dict[str, object]
+
+SNAPSHOT_NAME = "snapshot.ndjson"
+
+
+def _encode(record: Record) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class Journal:
+    """Persistencia en archivos para un único proceso; implementa ``storage.Store``.
+
+    ``recover`` debe llamarse una vez al arrancar: reconstruye el estado en
+    el ``AdminPortal`` y lo recuerda para los snapshots periódicos.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        group_size: int = 64,
+        group_interval: float = 0.05,
+        snapshot_every: int = 10_000,
+    ) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.snapshot_every = snapshot_every
+        self._lock = threading.RLock()
+        self._file: Optional[BinaryIO] = None
+        self._segment = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._since_snapshot = 0
+        self._batch_depth = 0
+        self._admin: Optional[AdminPortal] = None
+        self._claims: Set[str] = set()
+        self._flush_timer: Optional[threading.Timer] = None
+
+    # --- Archivos --------------------------------------------------------
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"journal-{segment:06d}.ndjson")
+
+    def _segments(self) -> List[int]:
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith("journal-") and name.endswith(".ndjson"):
+                found.append(int(name[len("journal-") : -len(".ndjson")]))
+        return sorted(found)
+
+    def _open_segment(self, segment: int) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._segment = segment
+        self._file = open(self._segment_path(segment), "ab")
+        self._fsync_directory()
+
+    def _fsync_directory(self) -> None:
+        if hasattr(os, "O_DIRECTORY"):
+            descriptor = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(descriptor)
+            finally:
+                os.close(descriptor)
+
+    def flush(self) -> None:
+        """Sincroniza a disco lo escrito desde el último ``fsync``."""
+
+        with self._lock:
+            if self._file is not None and self._unsynced:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def _schedule_flush(self) -> None:
+        """Garantiza un ``fsync`` a más tardar ``group_interval`` segundos después de una escritura suelta."""
+
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.group_interval, self._timed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _timed_flush(self) -> None:
+        with self._lock:
+            self._flush_timer = None
+            self.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self.flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def position(self) -> Tuple[int, int]:
+        """Segmento y desplazamiento del próximo registro; solo avanza, también entre reinicios."""
+
+        with self._lock:
+            return self._segment, self._file.tell() if self._file is not None else 0
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Escribe los registros del bloque y los sincroniza con un único ``fsync`` al salir."""
+
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.flush()
+                    self._maybe_snapshot()
+
+    def _append(self, record: Record) -> None:
+        line = _encode(record)
+        with self._lock:
+            if self._file is None:
+                segments = self._segments()
+                self._open_segment(segments[-1] if segments else 1)
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            self._since_snapshot += 1
+            if self._batch_depth:
+                return
+            if self._unsynced >= self.group_size or time.monotonic() - self._last_sync >= self.group_interval:
+                self.flush()
+            else:
+                self._schedule_flush()
+            self._maybe_snapshot()
+
+    def _maybe_snapshot(self) -> None:
+        # Nunca a mitad de un lote: el snapshot ya incluiría sus efectos y el
+        # resto del lote quedaría anexado después, aplicándose dos veces.
+        if self._admin is not None and self._since_snapshot >= self.snapshot_every:
+            self.snapshot(self._admin)
+
+    # --- Escrituras (storage.Store) --------------------------------------
+    def save_entry(self, collaborator_id: str, entry: TimeEntry) -> None:
+        self._append(_entry_record(collaborator_id, entry))
+
+    def save_request(self, request: Request) -> None:
+        self._append({"op": "requests", **request_to_dict(request)})
+
+    def save_balance(self, collaborator_id: str, balance: timedelta) -> None:
+        self._append(_balance_record(collaborator_id, balance))
+
+    def save_event(self, event: CalendarEvent) -> None:
+        self._append({"op": "calendar_events", **event_to_dict(event)})
+
+    def save_holiday(self, holiday: Holiday) -> None:
+        self._append({"op": "holidays", **holiday_to_dict(holiday), "removed": 0})
+
+    def delete_holiday(self, name: str, day: date) -> None:
+        self._append({"op": "holidays", "name": name, "day": day.isoformat(), "removed": 1})
+
+    def save_notification(self, notification: Notification) -> None:
+        self._append({"op": "notifications", **notification_to_dict(notification)})
+
+    def save_notification_read(self, collaborator_id: str, read_until: datetime) -> None:
+        self._append(_notification_read_record(collaborator_id, read_until))
+
+    def save_announcement(self, announcement: Announcement) -> None:
+        self._append({"op": "announcements", **announcement_to_dict(announcement)})
+
+    def save_access_request(self, access: AccessRequest) -> None:
+        self._append({"op": "access_requests", **access_to_dict(access)})
+
+    def claim(self, key: str) -> bool:
+        """Marca una tarea única (p. ej. cargar datos demo); ``True`` solo la primera vez."""
+
+        with self._lock:
+            if key in self._claims:
+                return False
+            self._claims.add(key)
+            self._append({"op": "claim", "key": key})
+            return True
+
+    # --- Snapshots y recuperación ----------------------------------------
+    def snapshot(self, admin: AdminPortal) -> None:
+        """Escribe el estado completo y descarta los segmentos que ya cubre.
+
+        El snapshot se escribe a un temporal y se renombra, de modo que una
+        caída a mitad deja intacto el anterior junto con sus segmentos.
+        """
+
+        with self._lock:
+            self.flush()
+            segment = self._segment + 1
+            self._open_segment(segment)
+            path = os.path.join(self.directory, SNAPSHOT_NAME)
+            with open(path + ".tmp", "wb") as handle:
+                handle.write(_encode({"segment": segment}))
+                for record in _state_records(admin, self._claims):
+                    handle.write(_encode(record))
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(path + ".tmp", path)
+            self._fsync_directory()
+            for old in self._segments():
+                if old < segment:
+                    os.remove(self._segment_path(old))
+            self._since_snapshot = 0
+
+    def recover(self, admin: AdminPortal) -> int:
+        """Carga el último snapshot y reaplica la cola de la bitácora; devuelve cuántos registros aplicó."""
+
+        with self._lock:
+            applied = 0
+            first_segment = 1
+            path = os.path.join(self.directory, SNAPSHOT_NAME)
+            if os.path.exists(path):
+                with open(path, "rb") as handle:
+                    first_segment = json.loads(handle.readline())["segment"]
+                    for line in handle:
+                        self._apply(admin, json.loads(line))
+                        applied += 1
+            segments = [segment for segment in self._segments() if segment >= first_segment]
+            tail = 0
+            for segment in segments:
+                tail += self._replay_segment(admin, segment)
+            for old in self._segments():
+                if old < first_segment:
+                    os.remove(self._segment_path(old))
+            self._open_segment(segments[-1] if segments else first_segment)
+            self._admin = admin
+            self._since_snapshot = tail
+            return applied + tail
+
+    def _replay_segment(self, admin: AdminPortal, segment: int) -> int:
+        """Reaplica un segmento; si la última línea quedó a medias por una caída, la recorta."""
+
+        applied = 0
+        valid = 0
+        path = self._segment_path(segment)
+        with open(path, "rb") as handle:
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(admin, record)
+                applied += 1
+                valid += len(line)
+        if valid != os.path.getsize(path):
+            with open(path, "r+b") as handle:
+                handle.truncate(valid)
+        return applied
+
+    def _apply(self, admin: AdminPortal, record: Record) -> None:
+        if record["op"] == "claim":
+            self._claims.add(record["key"])
+        else:
+            APPLIERS[record["op"]](admin, record)
+
+
+def _entry_record(collaborator_id: str, entry: TimeEntry) -> Record:
+    return {"op": "time_entries", "collaborator_id": collaborator_id, **entry_to_dict(entry)}
+
+
+def _balance_record(collaborator_id: str, balance: timedelta) -> Record:
+    return {"op": "balances", "collaborator_id": collaborator_id, "seconds": balance.total_seconds()}
+
+
+def _notification_read_record(collaborator_id: str, read_until: datetime) -> Record:
+    return {"op": "notification_reads", "collaborator_id": collaborator_id, "read_until": read_until.isoformat()}
+
+
+def _state_records(admin: AdminPortal, claims: Set[str]) -> Iterator[Record]:
+    """Estado completo del portal expresado como registros de la bitácora."""
+
+    for collaborator_id, collaborator in admin.collaborators.items():
+        history = collaborator.history
+        if history.hours_balance:
+            yield _balance_record(collaborator_id, history.hours_balance)
+        for entry in history.time_entries:
+            yield _entry_record(collaborator_id, entry)
+        for request in history.requests:
+            yield {"op": "requests", **request_to_dict(request)}
+    for holiday in admin.holidays:
+        yield {"op": "holidays", **holiday_to_dict(holiday), "removed": 0}
+    for event in admin.calendar_events:
+        yield {"op": "calendar_events", **event_to_dict(event)}
+    for notification in admin.notifications:
+        yield {"op": "notifications", **notification_to_dict(notification)}
+    for collaborator_id in admin.collaborators:
+        read_until = admin.notification_center.read_until(collaborator_id)
+        if read_until is not None:
+            yield _notification_read_record(collaborator_id, read_until)
+    for announcement in admin.announcements:
+        yield {"op": "announcements", **announcement_to_dict(announcement)}
+    for access in admin.access_requests.values():
+        yield {"op": "access_requests", **access_to_dict(access)}
+    for key in sorted(claims):
+        yield {"op": "claim", "key": key}
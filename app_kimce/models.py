@@ -4,9 +4,13 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import date, datetime, time, timedelta
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
 from uuid import uuid4
 
+from .indexes import AbsenceIndex, WorkedHoursIndex
+from .punctuality import PunctualityTally, default_schedule
+from .rollups import HoursRollup
+
 
 class RequestType(str, Enum):
     """Tipos de solicitudes que se pueden cursar."""
@@ -19,6 +23,9 @@ class RequestType(str, Enum):
     SPECIAL_ACTIVITY = "actividad_especial"
 
 
+ABSENCE_TYPES = frozenset({RequestType.VACATION, RequestType.COMP_DAY, RequestType.PERMIT})
+
+
 class RequestStatus(str, Enum):
     """Estado de una solicitud."""
 
@@ -52,16 +59,83 @@ class ActivityType(str, Enum):
     OTHER = "otra"
 
 
-@dataclass
 class TimeEntry:
-    """Representa un día laboral con sus hitos."""
-
-    day: date
-    check_in: Optional[datetime] = None
-    break_periods: List[tuple[datetime, datetime]] = field(default_factory=list)
-    ongoing_break_start: Optional[datetime] = None
-    check_out: Optional[datetime] = None
-    notes: List[str] = field(default_factory=list)
+    """Representa un día laboral con sus hitos.
+
+    Es la clase más numerosa del historial (una por colaborador y día), así
+    que usa ``__slots__`` y crea las listas de descansos y notas recién cuando
+    se accede a ellas: la mayoría de las jornadas no tiene notas.
+    """
+
+    __slots__ = ("day", "check_in", "_break_periods", "ongoing_break_start", "check_out", "_notes")
+
+    def __init__(
+        self,
+        day: date,
+        check_in: Optional[datetime] = None,
+        break_periods: Optional[List[tuple[datetime, datetime]]] = None,
+        ongoing_break_start: Optional[datetime] = None,
+        check_out: Optional[datetime] = None,
+        notes: Optional[List[str]] = None,
+    ) -> None:
+        self.day = day
+        self.check_in = check_in
+        self._break_periods = break_periods
+        self.ongoing_break_start = ongoing_break_start
+        self.check_out = check_out
+        self._notes = notes
+
+    @property
+    def break_periods(self) -> List[tuple[datetime, datetime]]:
+        if self._break_periods is None:
+            self._break_periods = []
+        return self._break_periods
+
+    @break_periods.setter
+    def break_periods(self, value: List[tuple[datetime, datetime]]) -> None:
+        self._break_periods = value
+
+    @property
+    def notes(self) -> List[str]:
+        if self._notes is None:
+            self._notes = []
+        return self._notes
+
+    @notes.setter
+    def notes(self, value: List[str]) -> None:
+        self._notes = value
+
+    def iter_breaks(self) -> Iterator[tuple[datetime, datetime]]:
+        """Recorre los descansos cerrados sin crear la lista si la jornada no tiene."""
+
+        return iter(self._break_periods or ())
+
+    def iter_notes(self) -> Iterator[str]:
+        return iter(self._notes or ())
+
+    def _fields(self) -> tuple:
+        return (
+            self.day,
+            self.check_in,
+            self._break_periods or [],
+            self.ongoing_break_start,
+            self.check_out,
+            self._notes or [],
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None  # mutable, igual que el dataclass que reemplaza
+
+    def __repr__(self) -> str:
+        day, check_in, break_periods, ongoing_break_start, check_out, notes = self._fields()
+        return (
+            f"TimeEntry(day={day!r}, check_in={check_in!r}, break_periods={break_periods!r}, "
+            f"ongoing_break_start={ongoing_break_start!r}, check_out={check_out!r}, notes={notes!r})"
+        )
 
     def add_note(self, note: str) -> None:
         self.notes.append(note)
@@ -73,14 +147,14 @@ class TimeEntry:
             return timedelta(0)
 
         total = self.check_out - self.check_in
-        for start, end in self.break_periods:
+        for start, end in self.iter_breaks():
             total -= end - start
         if self.ongoing_break_start:
             total -= datetime.utcnow() - self.ongoing_break_start
         return total
 
 
-@dataclass
+@dataclass(slots=True)
 class Holiday:
     """Feriado o día especial configurable."""
 
@@ -94,7 +168,7 @@ class Holiday:
         return not self.collaborators or collaborator_id in self.collaborators
 
 
-@dataclass
+@dataclass(slots=True)
 class CalendarEvent:
     """Evento consolidado para el calendario."""
 
@@ -148,7 +222,7 @@ class NotificationCategory(str, Enum):
     ALERT = "alert"
 
 
-@dataclass
+@dataclass(slots=True)
 class Notification:
     """Avisos internos dirigidos a un colaborador."""
 
@@ -169,7 +243,209 @@ class Announcement:
     category: NotificationCategory = NotificationCategory.INFO
 
 
+class AccessStatus(str, Enum):
+    """Estados posibles para un acceso basado en correo."""
+
+    PENDING = "pendiente"
+    APPROVED = "aprobado"
+    DENIED = "denegado"
+
+
 @dataclass
+class AccessRequest:
+    """Solicitud de acceso registrada por correo."""
+
+    email: str
+    collaborator_id: str
+    collaborator_name: str
+    created_at: datetime
+    position: Optional[str] = None
+    desired_role: Role = Role.COLLABORATOR
+    status: AccessStatus = AccessStatus.PENDING
+    reviewer: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+    def approve(self, reviewer: str) -> None:
+        self.status = AccessStatus.APPROVED
+        self.reviewer = reviewer
+        self.updated_at = datetime.now()
+
+    def deny(self, reviewer: str) -> None:
+        self.status = AccessStatus.DENIED
+        self.reviewer = reviewer
+        self.updated_at = datetime.now()
+
+
+class InvalidPayloadError(ValueError):
+    """Error cuando el payload de una solicitud no cumple el formato de su tipo."""
+
+
+def _parse_datetime(payload: Dict[str, str], key: str, required: bool) -> Optional[datetime]:
+    raw = payload.get(key)
+    if not raw:
+        if required:
+            raise InvalidPayloadError(f"El campo '{key}' es obligatorio")
+        return None
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError as exc:
+        raise InvalidPayloadError(f"Fecha inválida en '{key}': {raw}") from exc
+
+
+def _parse_hours(payload: Dict[str, str], required: bool) -> float:
+    raw = payload.get("horas")
+    if not raw:
+        if required:
+            raise InvalidPayloadError("El campo 'horas' es obligatorio")
+        return 0.0
+    try:
+        hours = float(raw)
+    except ValueError as exc:
+        raise InvalidPayloadError(f"Horas inválidas: {raw}") from exc
+    if not 0 <= hours < float("inf"):
+        raise InvalidPayloadError(f"Horas inválidas: {raw}")
+    return hours
+
+
+def _checked_range(start: Optional[datetime], end: Optional[datetime]) -> Optional[datetime]:
+    """Completa ``fin`` con ``inicio`` y valida que el rango no esté invertido."""
+
+    if end is None:
+        return start
+    if start is not None and end < start:
+        raise InvalidPayloadError("La fecha de fin es anterior a la de inicio")
+    return end
+
+
+def _extras(payload: Dict[str, str], known: frozenset[str]) -> Dict[str, str]:
+    return {key: value for key, value in payload.items() if key not in known}
+
+
+def _serialize(values: Dict[str, object], extras: Dict[str, str]) -> Dict[str, str]:
+    payload = dict(extras)
+    for key, value in values.items():
+        if value is None:
+            continue
+        if isinstance(value, datetime):
+            payload[key] = value.isoformat()
+        elif isinstance(value, float):
+            payload[key] = format(value, "g")
+        else:
+            payload[key] = str(value)
+    return payload
+
+
+@dataclass(frozen=True)
+class AbsencePayload:
+    """Vacaciones, día compensatorio o permiso."""
+
+    inicio: datetime
+    fin: datetime
+    notas: Optional[str] = None
+    extras: Dict[str, str] = field(default_factory=dict)
+
+    KNOWN_KEYS = frozenset({"inicio", "fin", "notas"})
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, str]) -> AbsencePayload:
+        start = _parse_datetime(payload, "inicio", required=True)
+        end = _checked_range(start, _parse_datetime(payload, "fin", required=False))
+        return cls(inicio=start, fin=end, notas=payload.get("notas"), extras=_extras(payload, cls.KNOWN_KEYS))
+
+    def to_payload(self) -> Dict[str, str]:
+        return _serialize({"inicio": self.inicio, "fin": self.fin, "notas": self.notas}, self.extras)
+
+
+@dataclass(frozen=True)
+class HoursPayload:
+    """Horas extra o uso de horas a favor."""
+
+    horas: float
+    inicio: Optional[datetime] = None
+    fin: Optional[datetime] = None
+    actividad: Optional[str] = None
+    notas: Optional[str] = None
+    extras: Dict[str, str] = field(default_factory=dict)
+
+    KNOWN_KEYS = frozenset({"horas", "inicio", "fin", "actividad", "notas"})
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, str]) -> HoursPayload:
+        start = _parse_datetime(payload, "inicio", required=False)
+        end = _checked_range(start, _parse_datetime(payload, "fin", required=False))
+        return cls(
+            horas=_parse_hours(payload, required=True),
+            inicio=start,
+            fin=end,
+            actividad=payload.get("actividad"),
+            notas=payload.get("notas"),
+            extras=_extras(payload, cls.KNOWN_KEYS),
+        )
+
+    def to_payload(self) -> Dict[str, str]:
+        values = {"inicio": self.inicio, "fin": self.fin, "horas": self.horas, "actividad": self.actividad, "notas": self.notas}
+        return _serialize(values, self.extras)
+
+
+@dataclass(frozen=True)
+class ActivityPayload:
+    """Actividad especial (activación, grabación, reunión, evento, capacitación)."""
+
+    inicio: datetime
+    fin: datetime
+    actividad: Optional[str] = None
+    proyecto: Optional[str] = None
+    horas: float = 0.0
+    notas: Optional[str] = None
+    extras: Dict[str, str] = field(default_factory=dict)
+
+    KNOWN_KEYS = frozenset({"inicio", "fin", "actividad", "proyecto", "horas", "notas"})
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, str]) -> ActivityPayload:
+        start = _parse_datetime(payload, "inicio", required=True)
+        end = _checked_range(start, _parse_datetime(payload, "fin", required=False))
+        return cls(
+            inicio=start,
+            fin=end,
+            actividad=payload.get("actividad"),
+            proyecto=payload.get("proyecto"),
+            horas=_parse_hours(payload, required=False),
+            notas=payload.get("notas"),
+            extras=_extras(payload, cls.KNOWN_KEYS),
+        )
+
+    def to_payload(self) -> Dict[str, str]:
+        values = {
+            "inicio": self.inicio,
+            "fin": self.fin,
+            "actividad": self.actividad,
+            "proyecto": self.proyecto,
+            "horas": self.horas if self.horas else None,
+            "notas": self.notas,
+        }
+        return _serialize(values, self.extras)
+
+
+RequestPayload = Union[AbsencePayload, HoursPayload, ActivityPayload]
+
+PAYLOAD_TYPES: Dict[RequestType, type] = {
+    RequestType.VACATION: AbsencePayload,
+    RequestType.COMP_DAY: AbsencePayload,
+    RequestType.PERMIT: AbsencePayload,
+    RequestType.OVERTIME: HoursPayload,
+    RequestType.CREDIT_USAGE: HoursPayload,
+    RequestType.SPECIAL_ACTIVITY: ActivityPayload,
+}
+
+
+def parse_payload(request_type: RequestType, payload: Dict[str, str]) -> RequestPayload:
+    """Valida y convierte el payload en texto a la vista tipada de su tipo."""
+
+    return PAYLOAD_TYPES[request_type].from_payload(payload)
+
+
+@dataclass(slots=True)
 class Request:
     """Solicitud emitida por un colaborador."""
 
@@ -181,6 +457,24 @@ class Request:
     status: RequestStatus = RequestStatus.PENDING
     reviewer: Optional[str] = None
     comments: List[str] = field(default_factory=list)
+    _details: Optional[RequestPayload] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def details(self) -> RequestPayload:
+        """Vista tipada del payload; se valida y parsea una sola vez."""
+
+        if self._details is None:
+            self._details = parse_payload(self.request_type, self.payload)
+        return self._details
+
+    def validate(self) -> RequestPayload:
+        """Parsea el payload actual, guarda la vista tipada y la devuelve.
+
+        Lanza ``InvalidPayloadError`` si el payload no es válido.
+        """
+
+        self._details = parse_payload(self.request_type, self.payload)
+        return self._details
 
     def approve(self, reviewer: str) -> None:
         self.status = RequestStatus.APPROVED
@@ -205,23 +499,116 @@ class CollaboratorHistory:
     time_entries: List[TimeEntry] = field(default_factory=list)
     requests: List[Request] = field(default_factory=list)
     hours_balance: timedelta = timedelta(0)
+    _positions: Dict[date, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _worked: WorkedHoursIndex = field(default_factory=WorkedHoursIndex, init=False, repr=False, compare=False)
+    _absences: AbsenceIndex = field(default_factory=AbsenceIndex, init=False, repr=False, compare=False)
+    _month_versions: Dict[tuple[int, int], int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    # Se llaman con cada jornada agregada o modificada (p. ej. los totales de puntualidad del colaborador).
+    entry_listeners: List[Callable[[TimeEntry], None]] = field(default_factory=list, init=False, repr=False, compare=False)
+    # Se llaman con cada solicitud agregada (p. ej. la bandeja de ``AdminPortal``).
+    request_listeners: List[Callable[[Request], None]] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self._positions = {entry.day: index for index, entry in enumerate(self.time_entries)}
+        self._worked.update_many(self.time_entries)
+        for request in self.requests:
+            self.index_absence(request)
+
+    def entry_for(self, day: date) -> Optional[TimeEntry]:
+        """Devuelve la marcación del día indicado sin recorrer el historial."""
+
+        position = self._positions.get(day)
+        return self.time_entries[position] if position is not None else None
 
     def add_entry(self, entry: TimeEntry) -> None:
-        existing = next((e for e in self.time_entries if e.day == entry.day), None)
-        if existing:
-            self.time_entries[self.time_entries.index(existing)] = entry
+        position = self._positions.get(entry.day)
+        if position is not None:
+            self.time_entries[position] = entry
         else:
+            self._positions[entry.day] = len(self.time_entries)
             self.time_entries.append(entry)
+        self.refresh_entry(entry)
+
+    def add_entries(self, entries: Iterable[TimeEntry]) -> None:
+        """Versión masiva de ``add_entry``: el índice de horas se ordena y acumula una sola vez
+        y cada mes tocado cambia de versión una sola vez."""
+
+        entries = list(entries)
+        months = set()
+        for entry in entries:
+            position = self._positions.get(entry.day)
+            if position is not None:
+                self.time_entries[position] = entry
+            else:
+                self._positions[entry.day] = len(self.time_entries)
+                self.time_entries.append(entry)
+            months.add((entry.day.year, entry.day.month))
+        self._worked.update_many(entries)
+        for listener in self.entry_listeners:
+            for entry in entries:
+                listener(entry)
+        for month in months:
+            self._month_versions[month] = self._month_versions.get(month, 0) + 1
+        self._version += 1
+
+    def refresh_entry(self, entry: TimeEntry) -> None:
+        """Reclasifica una jornada modificada en sitio (por ejemplo, al cerrarla)."""
+
+        self._worked.update(entry)
+        month = (entry.day.year, entry.day.month)
+        self._month_versions[month] = self._month_versions.get(month, 0) + 1
+        self._version += 1
+        for listener in self.entry_listeners:
+            listener(entry)
+
+    def entries_version(self) -> int:
+        """Contador que cambia con cualquier alta o modificación de jornadas."""
+
+        return self._version
+
+    def month_version(self, year: int, month: int) -> int:
+        """Contador que cambia cada vez que se agrega o cierra una jornada del mes."""
+
+        return self._month_versions.get((year, month), 0)
+
+    def month_versions(self) -> Dict[tuple[int, int], int]:
+        """Copia de los contadores por mes, para detectar qué meses cambiaron desde una lectura anterior."""
+
+        return dict(self._month_versions)
+
+    def closed_entries_between(self, start: date, end: date) -> List[TimeEntry]:
+        return self._worked.closed_entries_between(start, end)
+
+    def open_entries_between(self, start: date, end: date) -> List[TimeEntry]:
+        return self._worked.open_entries_between(start, end)
 
     def add_request(self, request: Request) -> None:
         self.requests.append(request)
+        self.index_absence(request)
+        for listener in self.request_listeners:
+            listener(request)
+
+    def index_absence(self, request: Request) -> None:
+        """Sincroniza el índice de ausencias con el estado y las fechas actuales de la solicitud.
+
+        Si la solicitud ya no es una ausencia aprobada se retira su tramo, y
+        si cambiaron sus fechas se reemplaza.
+        """
+
+        self._absences.discard(request.request_id)
+        if request.status != RequestStatus.APPROVED or request.request_type not in ABSENCE_TYPES:
+            return
+        details = request.details
+        self._absences.add(request.request_id, details.inicio.date(), details.fin.date())
+
+    def absence_ranges_between(self, start: date, end: date) -> List[tuple[date, date]]:
+        return self._absences.ranges_between(start, end)
 
     def worked_hours_between(self, start: date, end: date) -> timedelta:
-        total = timedelta(0)
-        for entry in self.time_entries:
-            if start <= entry.day <= end:
-                total += entry.worked_timedelta()
-        return total
+        return self._worked.worked_between(start, end)
 
 
 @dataclass
@@ -242,14 +629,30 @@ class Collaborator:
     documents: List[Document] = field(default_factory=list)
     evaluations: List[Evaluation] = field(default_factory=list)
     kpis: List[KPIRecord] = field(default_factory=list)
+    # Hora de entrada programada por día de la semana (0 = lunes); por defecto 09:00 en días laborables.
+    scheduled_start: Dict[int, time] = field(default_factory=dict)
     history: CollaboratorHistory = field(init=False)
+    rollups: HoursRollup = field(init=False, repr=False, compare=False)
+    punctuality: PunctualityTally = field(init=False, repr=False, compare=False)
+    # Se incrementa con cada cambio del colaborador hecho por los portales (ETags de la API).
+    version: int = field(default=0, init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         self.history = CollaboratorHistory(collaborator_id=self.collaborator_id)
+        self.rollups = HoursRollup(self)
+        self.punctuality = PunctualityTally(self)
+        self.history.entry_listeners.append(self.punctuality.record)
         if not self.weekday_hours:
             standard_week = {i: timedelta(hours=8) for i in range(5)}
             standard_week[5] = timedelta(hours=4)
             self.weekday_hours = standard_week
+        if not self.scheduled_start:
+            self.scheduled_start = default_schedule(self.weekday_hours)
+
+    def scheduled_start_for(self, day: date) -> Optional[time]:
+        """Hora de entrada programada del día, o ``None`` si ese día no se trabaja."""
+
+        return self.scheduled_start.get(day.weekday())
 
     def expected_hours_for_day(self, day: date) -> timedelta:
         """Devuelve la expectativa para un día concreto (HH:MM)."""
@@ -257,12 +660,30 @@ class Collaborator:
         return self.weekday_hours.get(day.weekday(), timedelta(0))
 
     def expected_hours_between(self, start: date, end: date) -> timedelta:
-        return sum((self.expected_hours_for_day(day) for day in self._iter_workdays(start, end)), timedelta())
-
-    @staticmethod
-    def _iter_workdays(start: date, end: date):
-        current = start
-        while current <= end:
-            if current.weekday() <= 5:  # Monday-Saturday
-                yield current
-            current += timedelta(days=1)
+        """Suma la expectativa del rango en O(1) a partir de semanas completas.
+
+        Los feriados no se descuentan, igual que en el cálculo día por día.
+        """
+
+        if end < start:
+            return timedelta(0)
+        week = self._workweek_hours()
+        full_weeks, leftover = divmod((end - start).days + 1, 7)
+        total = sum(week, timedelta()) * full_weeks
+        first_weekday = start.weekday()
+        for offset in range(leftover):
+            total += week[(first_weekday + offset) % 7]
+        return total
+
+    def absence_hours_between(self, start: date, end: date) -> timedelta:
+        """Horas esperadas cubiertas por vacaciones, compensatorios o permisos aprobados."""
+
+        return sum(
+            (self.expected_hours_between(first, last) for first, last in self.history.absence_ranges_between(start, end)),
+            timedelta(),
+        )
+
+    def _workweek_hours(self) -> List[timedelta]:
+        """Expectativa de lunes a domingo; el domingo no es laborable."""
+
+        return [self.weekday_hours.get(weekday, timedelta(0)) if weekday <= 5 else timedelta(0) for weekday in range(7)]
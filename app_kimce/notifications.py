@@ -0,0 +1,153 @@
+"""Bandejas de notificaciones con contador de no leídas y paginación por cursor.
+
+Los avisos generales van a un registro compartido y los dirigidos a la
+bandeja de su colaborador. Cada aviso recibe un número de secuencia
+creciente; el feed de un colaborador es la mezcla de su bandeja y el registro
+general en orden de secuencia. Con un cursor de lectura por colaborador el
+contador de no leídas es O(1) y cada página cuesta O(log n + tamaño), sin
+importar cuántos avisos se hayan enviado.
+
+La secuencia es propia de cada proceso; para persistir la lectura se usa la
+fecha de creación del aviso más reciente leído (``read_until`` /
+``mark_read_until``), que es la misma en todos.
+"""
+from __future__ import annotations
+
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .models import Notification
+
+
+class _Log:
+    """Avisos en orden de llegada con su secuencia en un arreglo paralelo."""
+
+    __slots__ = ("seqs", "items")
+
+    def __init__(self) -> None:
+        self.seqs = array("q")
+        self.items: List[Notification] = []
+
+    def append(self, seq: int, notification: Notification) -> None:
+        self.seqs.append(seq)
+        self.items.append(notification)
+
+    def count_upto(self, seq: int) -> int:
+        return bisect_right(self.seqs, seq)
+
+    def newest_before(self, seq: Optional[int]) -> Iterator[Tuple[int, Notification]]:
+        end = len(self.seqs) if seq is None else bisect_left(self.seqs, seq)
+        for position in range(end - 1, -1, -1):
+            yield self.seqs[position], self.items[position]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class NotificationCenter:
+    """Registro general más una bandeja por colaborador, con cursores de lectura."""
+
+    def __init__(self) -> None:
+        self.broadcast = _Log()
+        self.inboxes: Dict[str, _Log] = {}
+        self._seq = 0
+        # Secuencia hasta la que cada colaborador leyó y cuántos avisos cubre.
+        self._read_upto: Dict[str, int] = {}
+        self._read_count: Dict[str, int] = {}
+
+    def add(self, notification: Notification) -> int:
+        self._seq += 1
+        if notification.collaborator_id is None:
+            self.broadcast.append(self._seq, notification)
+        else:
+            self._inbox(notification.collaborator_id).append(self._seq, notification)
+        return self._seq
+
+    def _inbox(self, collaborator_id: str) -> _Log:
+        inbox = self.inboxes.get(collaborator_id)
+        if inbox is None:
+            inbox = self.inboxes[collaborator_id] = _Log()
+        return inbox
+
+    def __iter__(self) -> Iterator[Notification]:
+        """Todos los avisos en orden de llegada (para snapshots)."""
+
+        logs = [self.broadcast, *self.inboxes.values()]
+        for _, notification in heapq.merge(*(zip(log.seqs, log.items) for log in logs), key=lambda pair: pair[0]):
+            yield notification
+
+    def __len__(self) -> int:
+        return len(self.broadcast) + sum(len(inbox) for inbox in self.inboxes.values())
+
+    # --- Por colaborador -------------------------------------------------
+    def total(self, collaborator_id: str) -> int:
+        inbox = self.inboxes.get(collaborator_id)
+        return len(self.broadcast) + (len(inbox) if inbox is not None else 0)
+
+    def unread(self, collaborator_id: str) -> int:
+        return self.total(collaborator_id) - self._read_count.get(collaborator_id, 0)
+
+    def mark_read(self, collaborator_id: str, upto: Optional[int] = None) -> None:
+        """Marca como leído todo hasta la secuencia ``upto`` (por defecto, lo último recibido)."""
+
+        upto = self._seq if upto is None else upto
+        previous = self._read_upto.get(collaborator_id, 0)
+        if upto <= previous:
+            return
+        inbox = self.inboxes.get(collaborator_id)
+        read_direct = inbox.count_upto(upto) if inbox is not None else 0
+        self._read_upto[collaborator_id] = upto
+        self._read_count[collaborator_id] = self.broadcast.count_upto(upto) + read_direct
+        if inbox is not None:
+            for notification in islice(inbox.items, inbox.count_upto(previous), read_direct):
+                notification.read = True
+
+    def read_until(self, collaborator_id: str) -> Optional[datetime]:
+        """Fecha de creación del aviso más reciente que el colaborador ya leyó."""
+
+        upto = self._read_upto.get(collaborator_id)
+        if upto is None:
+            return None
+        newest = next(self._newest_first(collaborator_id, upto + 1), None)
+        return newest[1].created_at if newest is not None else None
+
+    def mark_read_until(self, collaborator_id: str, created_at: datetime) -> None:
+        """Marca como leído hasta el aviso más reciente creado en ``created_at`` o antes."""
+
+        for seq, notification in self._newest_first(collaborator_id, None):
+            if notification.created_at <= created_at:
+                self.mark_read(collaborator_id, seq)
+                return
+
+    def _newest_first(self, collaborator_id: str, before: Optional[int]) -> Iterator[Tuple[int, Notification]]:
+        sources = [self.broadcast.newest_before(before)]
+        inbox = self.inboxes.get(collaborator_id)
+        if inbox is not None:
+            sources.append(inbox.newest_before(before))
+        return heapq.merge(*sources, key=lambda pair: pair[0], reverse=True)
+
+    def page(
+        self, collaborator_id: str, before: Optional[int] = None, limit: int = 10
+    ) -> Tuple[List[Notification], Optional[int]]:
+        """Avisos más recientes con secuencia menor que ``before``.
+
+        Devuelve la página y el cursor para pedir la siguiente (``None`` si no
+        quedan más).
+        """
+
+        rows = list(islice(self._newest_first(collaborator_id, before), limit + 1))
+        cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return [notification for _, notification in rows[:limit]], cursor
+
+    def feed(self, collaborator_id: str) -> List[Notification]:
+        """Feed completo, del más antiguo al más reciente."""
+
+        sources = [zip(self.broadcast.seqs, self.broadcast.items)]
+        inbox = self.inboxes.get(collaborator_id)
+        if inbox is not None:
+            sources.append(zip(inbox.seqs, inbox.items))
+        return [notification for _, notification in heapq.merge(*sources, key=lambda pair: pair[0])]
@@ -1,101 +1,174 @@
 """Operaciones del Portal del Colaborador."""
 from __future__ import annotations
 
-from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Dict, Iterable, List, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
 
 from .models import Collaborator, Request, RequestStatus, RequestType, TimeEntry
 
+if TYPE_CHECKING:
+    from .events import EventBus
+    from .storage import Store
+
 
 class FlowError(RuntimeError):
     """Error cuando se intenta marcar fuera del flujo lógico."""
 
 
+# --- Reglas de marcación ---------------------------------------------------
+# Validan y aplican un hito sobre la jornada; las usan el portal y el
+# importador de relojes para que ambos sigan exactamente el mismo flujo.
+def check_in(entry: TimeEntry, ts: datetime, note: str | None = None) -> None:
+    if entry.check_in:
+        raise FlowError("Ya existe un registro de entrada para este día")
+    entry.check_in = ts
+    if note:
+        entry.add_note(note)
+
+
+def break_start(entry: TimeEntry, ts: datetime, note: str | None = None) -> None:
+    if not entry.check_in:
+        raise FlowError("No se puede iniciar descanso sin entrada")
+    if entry.ongoing_break_start:
+        raise FlowError("Ya hay un descanso en curso")
+    if entry.check_out:
+        raise FlowError("La jornada ya fue cerrada para este día")
+    entry.ongoing_break_start = ts
+    if note:
+        entry.add_note(note)
+
+
+def break_end(entry: TimeEntry, ts: datetime, note: str | None = None) -> None:
+    if not entry.ongoing_break_start:
+        raise FlowError("No se puede finalizar descanso sin inicio previo")
+    if entry.check_out:
+        raise FlowError("La jornada ya fue cerrada para este día")
+    entry.break_periods.append((entry.ongoing_break_start, ts))
+    entry.ongoing_break_start = None
+    if note:
+        entry.add_note(note)
+
+
+def check_out(entry: TimeEntry, ts: datetime, note: str | None = None) -> None:
+    if not entry.check_in:
+        raise FlowError("No se puede registrar salida sin entrada")
+    if entry.check_out:
+        raise FlowError("La salida ya fue registrada")
+    if entry.ongoing_break_start:
+        raise FlowError("Cierra primero el descanso en curso")
+    entry.check_out = ts
+    if note:
+        entry.add_note(note)
+
+
+# Acciones con los mismos nombres que los botones del portal.
+PUNCH_ACTIONS: Dict[str, Callable[[TimeEntry, datetime, Optional[str]], None]] = {
+    "entrada": check_in,
+    "descanso_inicio": break_start,
+    "descanso_fin": break_end,
+    "salida": check_out,
+}
+
+
 class CollaboratorPortal:
     """API de alto nivel para que un colaborador gestione su jornada."""
 
-    def __init__(self, collaborator: Collaborator) -> None:
+    def __init__(self, collaborator: Collaborator, store: Optional[Store] = None, bus: Optional[EventBus] = None) -> None:
         self.collaborator = collaborator
+        self.store = store
+        self.bus = bus
 
     # --- Marcaciones -----------------------------------------------------
     def _get_entry(self, day: date) -> TimeEntry:
-        entry = next((e for e in self.collaborator.history.time_entries if e.day == day), None)
+        entry = self.collaborator.history.entry_for(day)
         if not entry:
             entry = TimeEntry(day=day)
             self.collaborator.history.add_entry(entry)
         return entry
 
+    def _save_entry(self, entry: TimeEntry, action: Optional[str] = None) -> TimeEntry:
+        self.collaborator.version += 1
+        if self.store:
+            self.store.save_entry(self.collaborator.collaborator_id, entry)
+        if self.bus and action:
+            self.bus.publish(
+                "marcacion",
+                colaborador=self.collaborator.collaborator_id,
+                nombre=self.collaborator.full_name,
+                accion=action,
+                dia=entry.day.isoformat(),
+                activo=bool(entry.check_in and not entry.check_out),
+                horas=round(entry.worked_timedelta().total_seconds() / 3600, 2),
+            )
+        return entry
+
     def mark_check_in(self, ts: datetime, note: str | None = None) -> TimeEntry:
         entry = self._get_entry(ts.date())
-        if entry.check_in:
-            raise FlowError("Ya existe un registro de entrada para este día")
-        entry.check_in = ts
-        if note:
-            entry.add_note(note)
-        return entry
+        check_in(entry, ts, note)
+        self.collaborator.history.refresh_entry(entry)
+        return self._save_entry(entry, "entrada")
 
     def mark_break_start(self, ts: datetime, note: str | None = None) -> TimeEntry:
         entry = self._get_entry(ts.date())
-        if not entry.check_in:
-            raise FlowError("No se puede iniciar descanso sin entrada")
-        if entry.ongoing_break_start:
-            raise FlowError("Ya hay un descanso en curso")
-        if entry.check_out:
-            raise FlowError("La jornada ya fue cerrada para este día")
-        entry.ongoing_break_start = ts
-        if note:
-            entry.add_note(note)
-        return entry
+        break_start(entry, ts, note)
+        self.collaborator.history.refresh_entry(entry)
+        return self._save_entry(entry, "descanso_inicio")
 
     def mark_break_end(self, ts: datetime, note: str | None = None) -> TimeEntry:
         entry = self._get_entry(ts.date())
-        if not entry.ongoing_break_start:
-            raise FlowError("No se puede finalizar descanso sin inicio previo")
-        if entry.check_out:
-            raise FlowError("La jornada ya fue cerrada para este día")
-        entry.break_periods.append((entry.ongoing_break_start, ts))
-        entry.ongoing_break_start = None
-        if note:
-            entry.add_note(note)
-        return entry
+        break_end(entry, ts, note)
+        self.collaborator.history.refresh_entry(entry)
+        return self._save_entry(entry, "descanso_fin")
 
     def mark_check_out(self, ts: datetime, note: str | None = None) -> TimeEntry:
         entry = self._get_entry(ts.date())
-        if not entry.check_in:
-            raise FlowError("No se puede registrar salida sin entrada")
-        if entry.check_out:
-            raise FlowError("La salida ya fue registrada")
-        if entry.ongoing_break_start:
-            raise FlowError("Cierra primero el descanso en curso")
-        entry.check_out = ts
-        if note:
-            entry.add_note(note)
-        return entry
+        check_out(entry, ts, note)
+        self.collaborator.history.refresh_entry(entry)
+        self.collaborator.rollups.refresh(entry.day, entry.day)
+        return self._save_entry(entry, "salida")
 
     # --- Solicitudes -----------------------------------------------------
     def create_request(self, request_type: RequestType, payload: Dict[str, str]) -> Request:
+        """Registra una solicitud; lanza ``InvalidPayloadError`` si el payload no es válido."""
+
         request = Request(
             collaborator_id=self.collaborator.collaborator_id,
             request_type=request_type,
             payload=payload,
             created_at=datetime.utcnow(),
         )
+        request.validate()
         self.collaborator.history.add_request(request)
+        self.collaborator.version += 1
+        if self.store:
+            self.store.save_request(request)
+        if self.bus:
+            self.bus.publish(
+                "solicitud",
+                id=request.request_id,
+                colaborador=request.collaborator_id,
+                nombre=self.collaborator.full_name,
+                tipo=request.request_type.value,
+            )
         return request
 
     # --- Reportes --------------------------------------------------------
     def week_summary(self, week_start: date) -> Dict[str, float]:
-        week_end = week_start + timedelta(days=6)
-        worked = self.collaborator.history.worked_hours_between(week_start, week_end)
-        expected = self._expected_hours_adjusted(week_start, week_end)
-        difference = worked - expected
+        if week_start.weekday() == 0:
+            rollup = self.collaborator.rollups.week(week_start)
+            worked_hours = rollup["horas_trabajadas"]
+            expected_hours = rollup["horas_esperadas"]
+        else:
+            week_end = week_start + timedelta(days=6)
+            worked_hours = self.collaborator.history.worked_hours_between(week_start, week_end).total_seconds() / 3600
+            expected_hours = self._expected_hours_adjusted(week_start, week_end).total_seconds() / 3600
+        difference = worked_hours - expected_hours
         summary = {
-            "horas_trabajadas": worked.total_seconds() / 3600,
-            "horas_esperadas": expected.total_seconds() / 3600,
-            "horas_extra": max(0.0, difference.total_seconds() / 3600),
-            "horas_faltantes": max(0.0, -difference.total_seconds() / 3600),
-            "horas_a_favor": max(0.0, difference.total_seconds() / 3600),
+            "horas_trabajadas": worked_hours,
+            "horas_esperadas": expected_hours,
+            "horas_extra": max(0.0, difference),
+            "horas_faltantes": max(0.0, -difference),
+            "horas_a_favor": max(0.0, difference),
         }
         return summary
 
@@ -103,21 +176,7 @@ class CollaboratorPortal:
         """Resta de la expectativa los días aprobados como ausencia."""
 
         expected = self.collaborator.expected_hours_between(start, end)
-        absence_types = {RequestType.VACATION, RequestType.COMP_DAY, RequestType.PERMIT}
-        absence_days: set[date] = set()
-        for request in self.collaborator.history.requests:
-            if request.status != RequestStatus.APPROVED or request.request_type not in absence_types:
-                continue
-            payload_start = datetime.fromisoformat(request.payload.get("inicio")) if request.payload.get("inicio") else None
-            payload_end = datetime.fromisoformat(request.payload.get("fin")) if request.payload.get("fin") else payload_start
-            if not payload_start or not payload_end:
-                continue
-            current = payload_start.date()
-            while current <= payload_end.date():
-                if start <= current <= end and current.weekday() <= 5:
-                    absence_days.add(current)
-                current += timedelta(days=1)
-        deducted = sum((self.collaborator.expected_hours_for_day(day) for day in absence_days), timedelta())
+        deducted = self.collaborator.absence_hours_between(start, end)
         return max(timedelta(0), expected - deducted)
 
     def request_history(self) -> List[Tuple[RequestType, RequestStatus, Dict[str, str]]]:
@@ -136,13 +195,13 @@ class CollaboratorPortal:
     def annotate_entry(self, day: date, note: str) -> TimeEntry:
         entry = self._get_entry(day)
         entry.add_note(note)
-        return entry
+        return self._save_entry(entry)
 
     # --- Utilidades ------------------------------------------------------
     def action_availability(self, day: date) -> Dict[str, bool]:
         """Expone qué botones deben estar habilitados para un día dado."""
 
-        entry = next((e for e in self.collaborator.history.time_entries if e.day == day), None)
+        entry = self.collaborator.history.entry_for(day)
         if not entry:
             return {
                 "entrada": True,
@@ -166,11 +225,16 @@ class CollaboratorPortal:
         return "verde" if summary["horas_trabajadas"] >= summary["horas_esperadas"] else "rojo"
 
     def aggregated_history(self) -> Dict[str, Dict[str, float]]:
-        grouped: Dict[str, Dict[str, float]] = defaultdict(lambda: {"trabajadas": 0.0, "esperadas": 0.0})
+        """Horas por semana ISO: las trabajadas salen del rollup semanal y las
+        esperadas suman solo los días con marcación."""
+
+        grouped: Dict[str, Dict[str, float]] = {}
         for entry in self.collaborator.history.time_entries:
-            week_id = f"{entry.day.isocalendar().year}-W{entry.day.isocalendar().week:02d}"
-            grouped[week_id]["trabajadas"] += entry.worked_timedelta().total_seconds() / 3600
-            grouped[week_id]["esperadas"] += (
-                self.collaborator.expected_hours_for_day(entry.day).total_seconds() / 3600
-            )
+            iso = entry.day.isocalendar()
+            week_id = f"{iso.year}-W{iso.week:02d}"
+            week = grouped.get(week_id)
+            if week is None:
+                rollup = self.collaborator.rollups.week(date.fromisocalendar(iso.year, iso.week, 1))
+                week = grouped[week_id] = {"trabajadas": rollup["horas_trabajadas"], "esperadas": 0.0}
+            week["esperadas"] += self.collaborator.expected_hours_for_day(entry.day).total_seconds() / 3600
         return grouped
@@ -0,0 +1,99 @@
+"""Libro de horas por proyecto de las actividades especiales aprobadas."""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from .models import Request, RequestStatus, RequestType
+
+if TYPE_CHECKING:
+    from .models import Collaborator
+
+MonthKey = Tuple[int, int]
+NO_PROJECT = "sin_proyecto"
+
+
+class ProjectHoursLedger:
+    """Horas de actividades especiales aprobadas, agregadas al aprobar.
+
+    Cada solicitud aporta una línea (proyecto, colaborador, mes de inicio,
+    horas) identificada por su id, así que registrarla de nuevo no duplica y
+    un cambio de estado o de payload reemplaza su aporte. Los totales por
+    proyecto, por proyecto y mes, y por colaborador y mes se mantienen al día,
+    de modo que los reportes cuestan O(proyectos) y no O(solicitudes).
+    Un proyecto sigue en los totales mientras alguna solicitud aporte a él,
+    aunque sea con cero horas.
+    """
+
+    def __init__(self) -> None:
+        self._lines: Dict[str, Tuple[str, str, MonthKey, float]] = {}
+        self.totals: Dict[str, float] = defaultdict(float)
+        self.by_month: Dict[MonthKey, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.by_collaborator: Dict[str, Dict[MonthKey, Dict[str, float]]] = defaultdict(
+            lambda: defaultdict(lambda: defaultdict(float))
+        )
+        # Líneas que aportan a cada total: (colaborador, mes, proyecto), con ``None`` en lo que no aplica.
+        self._line_counts: Dict[Tuple[Optional[str], Optional[MonthKey], str], int] = defaultdict(int)
+
+    @classmethod
+    def from_collaborators(cls, collaborators: Iterable[Collaborator]) -> ProjectHoursLedger:
+        ledger = cls()
+        for collaborator in collaborators:
+            for request in collaborator.history.requests:
+                ledger.record(request)
+        return ledger
+
+    def record(self, request: Request) -> None:
+        """Incorpora (o retira) la solicitud según su estado actual."""
+
+        previous = self._lines.pop(request.request_id, None)
+        if previous is not None:
+            self._apply(*previous, sign=-1)
+        if request.request_type != RequestType.SPECIAL_ACTIVITY or request.status != RequestStatus.APPROVED:
+            return
+        details = request.details
+        line = (details.proyecto or NO_PROJECT, request.collaborator_id, (details.inicio.year, details.inicio.month), details.horas)
+        self._lines[request.request_id] = line
+        self._apply(*line, sign=1)
+
+    def _apply(self, project: str, collaborator_id: str, month: MonthKey, hours: float, sign: int) -> None:
+        scopes = (
+            ((None, None, project), self.totals),
+            ((None, month, project), self.by_month[month]),
+            ((collaborator_id, month, project), self.by_collaborator[collaborator_id][month]),
+        )
+        for key, totals in scopes:
+            self._line_counts[key] += sign
+            if self._line_counts[key]:
+                totals[project] += sign * hours
+            else:
+                del self._line_counts[key]
+                totals.pop(project, None)
+
+    # --- Reportes --------------------------------------------------------
+    def hours_by_project(self, first: Optional[MonthKey] = None, last: Optional[MonthKey] = None) -> Dict[str, float]:
+        """Horas por proyecto de los meses ``first``..``last`` (ambos incluidos); todo si no se indican."""
+
+        if first is None and last is None:
+            return dict(self.totals)
+        return self._sum_months(self.by_month, first, last)
+
+    def collaborator_hours(
+        self, collaborator_id: str, first: Optional[MonthKey] = None, last: Optional[MonthKey] = None
+    ) -> Dict[str, float]:
+        return self._sum_months(self.by_collaborator.get(collaborator_id, {}), first, last)
+
+    def top_projects(self, year: int, month: int, limit: int = 5) -> List[Tuple[str, float]]:
+        month_totals = self.by_month.get((year, month), {})
+        return sorted(month_totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    @staticmethod
+    def _sum_months(
+        months: Dict[MonthKey, Dict[str, float]], first: Optional[MonthKey], last: Optional[MonthKey]
+    ) -> Dict[str, float]:
+        totals: Dict[str, float] = defaultdict(float)
+        for key, projects in months.items():
+            if (first is None or key >= first) and (last is None or key <= last):
+                for project, hours in projects.items():
+                    totals[project] += hours
+        return dict(totals)
@@ -0,0 +1,211 @@
+"""Puntualidad según el horario de entrada de cada colaborador.
+
+Hay dos niveles:
+
+* ``PunctualityTally`` vive en cada ``Collaborator`` y mantiene totales
+  corrientes (marcaciones, llegadas a tiempo, minutos de atraso) que se
+  actualizan con cada entrada registrada, así que el ranking del equipo cuesta
+  O(colaboradores).
+* ``PunctualityEngine`` calcula los minutos de atraso de todas las jornadas en
+  una pasada sobre los bloques columnares (``columns.EntryColumns``) y de ahí
+  saca percentiles, histogramas y la tendencia móvil de 4 semanas. El
+  resultado se memoriza por versión del bloque y del horario.
+"""
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from .columns import TeamColumns
+
+if TYPE_CHECKING:
+    from .columns import EntryColumns
+    from .models import Collaborator, TimeEntry
+
+# Minutos de margen después de la hora programada que aún cuentan como puntual.
+TOLERANCE_MINUTES = 5.0
+# Límites superiores (en minutos de atraso) de cada barra del histograma; la
+# primera coincide con la tolerancia, así que "a_tiempo" suma lo mismo que ``on_time``.
+HISTOGRAM_EDGES = (TOLERANCE_MINUTES, 15.0, 30.0, 60.0)
+HISTOGRAM_LABELS = ("a_tiempo", "5-15", "15-30", "30-60", "60+")
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def default_schedule(weekday_hours: Dict[int, timedelta], start_hour: int = 9) -> Dict[int, time]:
+    """Entrada a ``start_hour`` en cada día con horas esperadas."""
+
+    return {weekday: time(start_hour) for weekday, hours in weekday_hours.items() if hours > timedelta(0)}
+
+
+def lateness_minutes(collaborator: Collaborator, entry: TimeEntry) -> Optional[float]:
+    """Minutos entre la hora programada y la entrada (negativo si llegó antes)."""
+
+    scheduled = collaborator.scheduled_start_for(entry.day)
+    if entry.check_in is None or scheduled is None:
+        return None
+    return (entry.check_in - datetime.combine(entry.day, scheduled)).total_seconds() / 60
+
+
+class PunctualityTally:
+    """Totales corrientes de puntualidad de un colaborador.
+
+    ``CollaboratorHistory`` avisa de cada jornada agregada o modificada (ver
+    ``record``); si cambia el horario hay que llamar a ``rebuild``.
+    """
+
+    def __init__(self, collaborator: Collaborator) -> None:
+        self.collaborator = collaborator
+        self.marked = 0
+        self.on_time = 0
+        self.total_minutes = 0.0
+        self._lateness: Dict[date, float] = {}
+
+    def record(self, entry: TimeEntry) -> None:
+        previous = self._lateness.pop(entry.day, None)
+        if previous is not None:
+            self._count(previous, -1)
+        current = lateness_minutes(self.collaborator, entry)
+        if current is not None:
+            self._lateness[entry.day] = current
+            self._count(current, 1)
+
+    def _count(self, minutes: float, sign: int) -> None:
+        self.marked += sign
+        self.on_time += sign if minutes <= TOLERANCE_MINUTES else 0
+        self.total_minutes += sign * minutes
+
+    def rebuild(self) -> None:
+        self.marked = self.on_time = 0
+        self.total_minutes = 0.0
+        self._lateness.clear()
+        for entry in self.collaborator.history.time_entries:
+            self.record(entry)
+
+    def percentage(self) -> Optional[float]:
+        return self.on_time / self.marked * 100 if self.marked else None
+
+    def average_minutes(self) -> Optional[float]:
+        return self.total_minutes / self.marked if self.marked else None
+
+
+def punctuality_ranking(collaborators: Iterable[Collaborator]) -> List[Dict[str, float]]:
+    """Porcentaje de llegadas dentro del margen, de mayor a menor, con los totales corrientes."""
+
+    ranking: List[Dict[str, float]] = []
+    for collaborator in collaborators:
+        tally = collaborator.punctuality
+        if not tally.marked:
+            continue
+        ranking.append(
+            {
+                "colaborador": collaborator.full_name,
+                "porcentaje_puntualidad": round(tally.percentage(), 2),
+                "minutos_tarde_promedio": round(tally.average_minutes(), 2),
+            }
+        )
+    return sorted(ranking, key=lambda item: item["porcentaje_puntualidad"], reverse=True)
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Percentil por rango más cercano sobre una lista ordenada no vacía."""
+
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+@dataclass
+class PunctualityProfile:
+    """Distribución de atrasos (en minutos) de un colaborador."""
+
+    collaborator_id: str
+    marked: int
+    on_time: int
+    p50: Optional[float]
+    p90: Optional[float]
+    histogram: Dict[str, int] = field(default_factory=dict)
+    # (lunes ISO de la semana, atraso promedio de las 4 semanas que terminan en ella)
+    rolling_trend: List[Tuple[str, float]] = field(default_factory=list)
+
+
+class PunctualityEngine:
+    """Percentiles, histogramas y tendencias de puntualidad del equipo."""
+
+    def __init__(self, collaborators: Iterable[Collaborator], columns: Optional[TeamColumns] = None) -> None:
+        self.collaborators = list(collaborators)
+        self.columns = columns or TeamColumns(self.collaborators)
+        self._profiles: Dict[str, Tuple[tuple, PunctualityProfile]] = {}
+
+    def ranking(self) -> List[Dict[str, float]]:
+        return punctuality_ranking(self.collaborators)
+
+    def profile(self, collaborator: Collaborator, trend_weeks: int = 12) -> PunctualityProfile:
+        block = self.columns.block(collaborator)
+        stamp = (block.version, trend_weeks, tuple(sorted(collaborator.scheduled_start.items())))
+        cached = self._profiles.get(collaborator.collaborator_id)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        profile = self._build_profile(collaborator, block, trend_weeks)
+        self._profiles[collaborator.collaborator_id] = (stamp, profile)
+        return profile
+
+    def profiles(self, trend_weeks: int = 12) -> List[PunctualityProfile]:
+        return [self.profile(collaborator, trend_weeks) for collaborator in self.collaborators]
+
+    @staticmethod
+    def lateness(collaborator: Collaborator, block: EntryColumns) -> List[Tuple[int, float]]:
+        """``(día ordinal, minutos de atraso)`` de cada jornada con entrada en un día programado."""
+
+        starts = [
+            None if scheduled is None else scheduled.hour * 3600 + scheduled.minute * 60 + scheduled.second
+            for scheduled in (collaborator.scheduled_start.get(weekday) for weekday in range(7))
+        ]
+        rows: List[Tuple[int, float]] = []
+        for ordinal, check_in in zip(block.day, block.check_in):
+            start = starts[(ordinal - 1) % 7]
+            if start is not None and check_in == check_in:  # NaN: sin entrada
+                rows.append((ordinal, (check_in - (ordinal - _EPOCH_ORDINAL) * 86400 - start) / 60))
+        return rows
+
+    def _build_profile(self, collaborator: Collaborator, block: EntryColumns, trend_weeks: int) -> PunctualityProfile:
+        rows = self.lateness(collaborator, block)
+        ordered = sorted(minutes for _, minutes in rows)
+        histogram = dict.fromkeys(HISTOGRAM_LABELS, 0)
+        for minutes in ordered:
+            histogram[HISTOGRAM_LABELS[bisect_left(HISTOGRAM_EDGES, minutes)]] += 1
+        return PunctualityProfile(
+            collaborator_id=collaborator.collaborator_id,
+            marked=len(ordered),
+            on_time=bisect_right(ordered, TOLERANCE_MINUTES),
+            p50=_percentile(ordered, 0.5) if ordered else None,
+            p90=_percentile(ordered, 0.9) if ordered else None,
+            histogram=histogram,
+            rolling_trend=self._rolling_trend(rows, trend_weeks),
+        )
+
+    @staticmethod
+    def _rolling_trend(rows: List[Tuple[int, float]], weeks: int, window: int = 4) -> List[Tuple[str, float]]:
+        if not rows:
+            return []
+        totals: Dict[int, List[float]] = {}
+        for ordinal, minutes in rows:
+            monday = ordinal - (ordinal - 1) % 7
+            bucket = totals.setdefault(monday, [0.0, 0])
+            bucket[0] += minutes
+            bucket[1] += 1
+        last_monday = max(totals)
+        trend: List[Tuple[str, float]] = []
+        for index in range(weeks - 1, -1, -1):
+            monday = last_monday - 7 * index
+            minutes = count = 0
+            for offset in range(window):
+                bucket = totals.get(monday - 7 * offset)
+                if bucket is not None:
+                    minutes += bucket[0]
+                    count += bucket[1]
+            if count:
+                trend.append((date.fromordinal(monday).isoformat(), round(minutes / count, 2)))
+        return trend
+
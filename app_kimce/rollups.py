@@ -0,0 +1,160 @@
+"""Resúmenes de horas materializados por semana ISO y por mes."""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Dict, Iterator, List, Set, Tuple
+
+if TYPE_CHECKING:
+    from .models import Collaborator
+
+PeriodKey = Tuple[int, int]
+
+
+def _week_bounds(key: PeriodKey) -> Tuple[date, date]:
+    start = date.fromisocalendar(key[0], key[1], 1)
+    return start, start + timedelta(days=6)
+
+
+def _month_bounds(key: PeriodKey) -> Tuple[date, date]:
+    start = date(key[0], key[1], 1)
+    following = date(key[0] + 1, 1, 1) if key[1] == 12 else date(key[0], key[1] + 1, 1)
+    return start, following - timedelta(days=1)
+
+
+def _week_keys(start: date, end: date) -> Iterator[PeriodKey]:
+    current = start - timedelta(days=start.weekday())
+    while current <= end:
+        iso = current.isocalendar()
+        yield iso.year, iso.week
+        current += timedelta(days=7)
+
+
+def _month_keys(start: date, end: date) -> Iterator[PeriodKey]:
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+class HoursRollup:
+    """Caché de resúmenes semanales y mensuales de un colaborador.
+
+    Cada periodo se calcula la primera vez que se consulta y luego se
+    recalcula solo cuando una marcación, corrección o aprobación toca alguno
+    de sus días (ver ``refresh``), por lo que las lecturas del dashboard son
+    búsquedas en diccionario.
+    """
+
+    def __init__(self, collaborator: Collaborator) -> None:
+        self.collaborator = collaborator
+        self.weeks: Dict[PeriodKey, Dict[str, float]] = {}
+        self.months: Dict[PeriodKey, Dict[str, float]] = {}
+
+    def week(self, week_start: date) -> Dict[str, float]:
+        iso = week_start.isocalendar()
+        key = (iso.year, iso.week)
+        summary = self.weeks.get(key)
+        if summary is None:
+            summary = self.weeks[key] = self.summarize(*_week_bounds(key))
+        return summary
+
+    def month(self, year: int, month: int) -> Dict[str, float]:
+        key = (year, month)
+        summary = self.months.get(key)
+        if summary is None:
+            summary = self.months[key] = self.summarize(*_month_bounds(key))
+        return summary
+
+    def refresh(self, start: date, end: date) -> None:
+        """Recalcula los periodos ya materializados que se cruzan con el rango."""
+
+        for key in _week_keys(start, end):
+            if key in self.weeks:
+                self.weeks[key] = self.summarize(*_week_bounds(key))
+        for key in _month_keys(start, end):
+            if key in self.months:
+                self.months[key] = self.summarize(*_month_bounds(key))
+
+    def summarize(self, start: date, end: date) -> Dict[str, float]:
+        collaborator = self.collaborator
+        worked = collaborator.history.worked_hours_between(start, end)
+        deducted = collaborator.absence_hours_between(start, end)
+        expected = max(timedelta(0), collaborator.expected_hours_between(start, end) - deducted)
+        difference = (worked - expected).total_seconds() / 3600
+        return {
+            "horas_trabajadas": worked.total_seconds() / 3600,
+            "horas_esperadas": expected.total_seconds() / 3600,
+            "horas_descontadas": deducted.total_seconds() / 3600,
+            "horas_extra": max(0.0, difference),
+            "horas_faltantes": max(0.0, -difference),
+        }
+
+    # --- Consistencia ----------------------------------------------------
+    def rebuild(self) -> Tuple[Dict[PeriodKey, Dict[str, float]], Dict[PeriodKey, Dict[str, float]]]:
+        """Recalcula desde cero cada periodo en caché o con marcaciones.
+
+        No pasa por los índices del historial: las horas trabajadas salen de
+        ``worked_timedelta`` de cada jornada y las ausencias de las fechas de
+        las solicitudes aprobadas, así que un error en ``WorkedHoursIndex`` o
+        ``AbsenceIndex`` aparece en ``diff``.
+        """
+
+        from .models import ABSENCE_TYPES, RequestStatus
+
+        history = self.collaborator.history
+        worked_by_day: Dict[date, timedelta] = {}
+        week_keys = set(self.weeks)
+        month_keys = set(self.months)
+        for entry in history.time_entries:
+            worked_by_day[entry.day] = entry.worked_timedelta()
+            iso = entry.day.isocalendar()
+            week_keys.add((iso.year, iso.week))
+            month_keys.add((entry.day.year, entry.day.month))
+        absent_days: Set[date] = set()
+        for request in history.requests:
+            if request.status != RequestStatus.APPROVED or request.request_type not in ABSENCE_TYPES:
+                continue
+            first, last = request.details.inicio.date(), request.details.fin.date()
+            absent_days.update(first + timedelta(days=offset) for offset in range(max(0, (last - first).days) + 1))
+        weeks = {key: self._recount(*_week_bounds(key), worked_by_day, absent_days) for key in week_keys}
+        months = {key: self._recount(*_month_bounds(key), worked_by_day, absent_days) for key in month_keys}
+        return weeks, months
+
+    def _recount(
+        self, start: date, end: date, worked_by_day: Dict[date, timedelta], absent_days: Set[date]
+    ) -> Dict[str, float]:
+        """``summarize`` día por día a partir de los datos crudos."""
+
+        worked = expected = deducted = timedelta(0)
+        day = start
+        while day <= end:
+            worked += worked_by_day.get(day, timedelta(0))
+            day_expected = self.collaborator.expected_hours_between(day, day)
+            expected += day_expected
+            if day in absent_days:
+                deducted += day_expected
+            day += timedelta(days=1)
+        expected = max(timedelta(0), expected - deducted)
+        difference = (worked - expected).total_seconds() / 3600
+        return {
+            "horas_trabajadas": worked.total_seconds() / 3600,
+            "horas_esperadas": expected.total_seconds() / 3600,
+            "horas_descontadas": deducted.total_seconds() / 3600,
+            "horas_extra": max(0.0, difference),
+            "horas_faltantes": max(0.0, -difference),
+        }
+
+    def diff(self) -> List[Dict[str, object]]:
+        """Compara la caché con un recálculo completo y lista las diferencias."""
+
+        fresh_weeks, fresh_months = self.rebuild()
+        differences: List[Dict[str, object]] = []
+        for kind, cached, fresh in (("semana", self.weeks, fresh_weeks), ("mes", self.months, fresh_months)):
+            for key, summary in cached.items():
+                for field_name, value in summary.items():
+                    expected = fresh[key][field_name]
+                    if abs(value - expected) > 1e-9:
+                        differences.append(
+                            {"periodo": kind, "clave": key, "campo": field_name, "cache": value, "recalculado": expected}
+                        )
+        return differences
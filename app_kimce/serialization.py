@@ -0,0 +1,183 @@
+"""Conversión de los modelos a diccionarios planos (JSON) y de vuelta."""
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from .models import (
+    AccessRequest,
+    AccessStatus,
+    Announcement,
+    CalendarEvent,
+    Holiday,
+    Notification,
+    NotificationCategory,
+    Request,
+    RequestStatus,
+    RequestType,
+    Role,
+    TimeEntry,
+)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _from_iso(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def entry_to_dict(entry: TimeEntry) -> Dict[str, object]:
+    # Lee las listas internas para no crearlas en jornadas sin descansos ni notas.
+    return {
+        "day": entry.day.isoformat(),
+        "check_in": _iso(entry.check_in),
+        "break_periods": [[start.isoformat(), end.isoformat()] for start, end in entry.iter_breaks()],
+        "ongoing_break_start": _iso(entry.ongoing_break_start),
+        "check_out": _iso(entry.check_out),
+        "notes": list(entry.iter_notes()),
+    }
+
+
+def entry_from_dict(data: Dict[str, object]) -> TimeEntry:
+    return TimeEntry(
+        day=date.fromisoformat(data["day"]),
+        check_in=_from_iso(data.get("check_in")),
+        break_periods=[(datetime.fromisoformat(start), datetime.fromisoformat(end)) for start, end in data.get("break_periods", [])] or None,
+        ongoing_break_start=_from_iso(data.get("ongoing_break_start")),
+        check_out=_from_iso(data.get("check_out")),
+        notes=list(data.get("notes", [])) or None,
+    )
+
+
+def request_to_dict(request: Request) -> Dict[str, object]:
+    return {
+        "request_id": request.request_id,
+        "collaborator_id": request.collaborator_id,
+        "request_type": request.request_type.value,
+        "created_at": request.created_at.isoformat(),
+        "payload": dict(request.payload),
+        "status": request.status.value,
+        "reviewer": request.reviewer,
+        "comments": list(request.comments),
+    }
+
+
+def request_from_dict(data: Dict[str, object]) -> Request:
+    return Request(
+        collaborator_id=data["collaborator_id"],
+        request_type=RequestType(data["request_type"]),
+        created_at=datetime.fromisoformat(data["created_at"]),
+        payload=dict(data["payload"]),
+        request_id=data["request_id"],
+        status=RequestStatus(data["status"]),
+        reviewer=data.get("reviewer"),
+        comments=list(data.get("comments", [])),
+    )
+
+
+def event_to_dict(event: CalendarEvent) -> Dict[str, object]:
+    return {
+        "title": event.title,
+        "start": event.start.isoformat(),
+        "end": event.end.isoformat(),
+        "collaborator_id": event.collaborator_id,
+        "metadata": dict(event.metadata),
+    }
+
+
+def event_from_dict(data: Dict[str, object]) -> CalendarEvent:
+    return CalendarEvent(
+        title=data["title"],
+        start=datetime.fromisoformat(data["start"]),
+        end=datetime.fromisoformat(data["end"]),
+        collaborator_id=data.get("collaborator_id"),
+        metadata=dict(data.get("metadata") or {}),
+    )
+
+
+def holiday_to_dict(holiday: Holiday) -> Dict[str, object]:
+    return {
+        "name": holiday.name,
+        "day": holiday.day.isoformat(),
+        "paid": holiday.paid,
+        "compensable": holiday.compensable,
+        "collaborators": list(holiday.collaborators) if holiday.collaborators else None,
+    }
+
+
+def holiday_from_dict(data: Dict[str, object]) -> Holiday:
+    return Holiday(
+        name=data["name"],
+        day=date.fromisoformat(data["day"]),
+        paid=bool(data.get("paid", True)),
+        compensable=bool(data.get("compensable", False)),
+        collaborators=list(data["collaborators"]) if data.get("collaborators") else None,
+    )
+
+
+def notification_to_dict(notification: Notification) -> Dict[str, object]:
+    return {
+        "message": notification.message,
+        "category": notification.category.value,
+        "created_at": notification.created_at.isoformat(),
+        "collaborator_id": notification.collaborator_id,
+        "read": notification.read,
+    }
+
+
+def notification_from_dict(data: Dict[str, object]) -> Notification:
+    return Notification(
+        message=data["message"],
+        category=NotificationCategory(data["category"]),
+        created_at=datetime.fromisoformat(data["created_at"]),
+        collaborator_id=data.get("collaborator_id"),
+        read=bool(data.get("read", False)),
+    )
+
+
+def announcement_to_dict(announcement: Announcement) -> Dict[str, object]:
+    return {
+        "title": announcement.title,
+        "body": announcement.body,
+        "created_at": announcement.created_at.isoformat(),
+        "category": announcement.category.value,
+    }
+
+
+def announcement_from_dict(data: Dict[str, object]) -> Announcement:
+    return Announcement(
+        title=data["title"],
+        body=data["body"],
+        created_at=datetime.fromisoformat(data["created_at"]),
+        category=NotificationCategory(data.get("category", NotificationCategory.INFO.value)),
+    )
+
+
+def access_to_dict(access: AccessRequest) -> Dict[str, object]:
+    return {
+        "email": access.email,
+        "collaborator_id": access.collaborator_id,
+        "collaborator_name": access.collaborator_name,
+        "created_at": access.created_at.isoformat(),
+        "position": access.position,
+        "desired_role": access.desired_role.value,
+        "status": access.status.value,
+        "reviewer": access.reviewer,
+        "updated_at": _iso(access.updated_at),
+    }
+
+
+def access_from_dict(data: Dict[str, object]) -> AccessRequest:
+    return AccessRequest(
+        email=data["email"],
+        collaborator_id=data["collaborator_id"],
+        collaborator_name=data["collaborator_name"],
+        created_at=datetime.fromisoformat(data["created_at"]),
+        position=data.get("position"),
+        desired_role=Role(data.get("desired_role", Role.COLLABORATOR.value)),
+        status=AccessStatus(data.get("status", AccessStatus.PENDING.value)),
+        reviewer=data.get("reviewer"),
+        updated_at=_from_iso(data.get("updated_at")),
+    )
@@ -0,0 +1,466 @@
+"""Persistencia en SQLite para compartir el estado entre procesos.
+
+Los portales siguen trabajando sobre los modelos en memoria; cada mutación se
+escribe además en la base (modo WAL) y cada proceso incorpora las escrituras
+de los demás con ``SQLiteStore.sync``. Todas las filas llevan un número de
+secuencia global, de modo que la sincronización solo lee lo que cambió desde
+la última vez.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Callable, ContextManager, Dict, Iterator, List, Optional, Protocol, Set, Tuple
+
+from .models import (
+    AccessRequest,
+    Announcement,
+    CalendarEvent,
+    Holiday,
+    Notification,
+    Request,
+    RequestStatus,
+    RequestType,
+    TimeEntry,
+)
+from .serialization import (
+    access_from_dict,
+    access_to_dict,
+    announcement_from_dict,
+    announcement_to_dict,
+    entry_from_dict,
+    entry_to_dict,
+    event_from_dict,
+    event_to_dict,
+    holiday_from_dict,
+    holiday_to_dict,
+    notification_from_dict,
+    notification_to_dict,
+    request_from_dict,
+    request_to_dict,
+)
+
+if TYPE_CHECKING:
+    from .admin import AdminPortal
+
+
+class Store(Protocol):
+    """Operaciones que los portales invocan después de cada mutación."""
+
+    def save_entry(self, collaborator_id: str, entry: TimeEntry) -> None: ...
+
+    def save_request(self, request: Request) -> None: ...
+
+    def save_balance(self, collaborator_id: str, balance: timedelta) -> None: ...
+
+    def save_event(self, event: CalendarEvent) -> None: ...
+
+    def save_holiday(self, holiday: Holiday) -> None: ...
+
+    def delete_holiday(self, name: str, day: date) -> None: ...
+
+    def save_notification(self, notification: Notification) -> None: ...
+
+    def save_notification_read(self, collaborator_id: str, read_until: datetime) -> None: ...
+
+    def save_announcement(self, announcement: Announcement) -> None: ...
+
+    def save_access_request(self, access: AccessRequest) -> None: ...
+
+
+class BatchStore(Store, Protocol):
+    """Store capaz de confirmar varias escrituras de una vez."""
+
+    def batch(self) -> ContextManager[None]: ...
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS balances (
+    collaborator_id TEXT PRIMARY KEY,
+    seconds REAL NOT NULL,
+    seq INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS time_entries (
+    collaborator_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    check_in TEXT,
+    break_periods TEXT NOT NULL,
+    ongoing_break_start TEXT,
+    check_out TEXT,
+    notes TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (collaborator_id, day)
+);
+CREATE INDEX IF NOT EXISTS time_entries_seq ON time_entries (seq);
+CREATE TABLE IF NOT EXISTS requests (
+    request_id TEXT PRIMARY KEY,
+    collaborator_id TEXT NOT NULL,
+    request_type TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reviewer TEXT,
+    comments TEXT NOT NULL,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS requests_status_type ON requests (status, request_type, created_at);
+CREATE INDEX IF NOT EXISTS requests_collaborator ON requests (collaborator_id, created_at);
+CREATE INDEX IF NOT EXISTS requests_seq ON requests (seq);
+CREATE TABLE IF NOT EXISTS calendar_events (
+    event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    collaborator_id TEXT,
+    metadata TEXT NOT NULL,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calendar_events_start ON calendar_events (start);
+CREATE INDEX IF NOT EXISTS calendar_events_collaborator ON calendar_events (collaborator_id, start);
+CREATE INDEX IF NOT EXISTS calendar_events_seq ON calendar_events (seq);
+CREATE TABLE IF NOT EXISTS holidays (
+    name TEXT NOT NULL,
+    day TEXT NOT NULL,
+    paid INTEGER NOT NULL,
+    compensable INTEGER NOT NULL,
+    collaborators TEXT,
+    removed INTEGER NOT NULL DEFAULT 0,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (name, day)
+);
+CREATE INDEX IF NOT EXISTS holidays_day ON holidays (day);
+CREATE INDEX IF NOT EXISTS holidays_seq ON holidays (seq);
+CREATE TABLE IF NOT EXISTS notifications (
+    notification_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    message TEXT NOT NULL,
+    category TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    collaborator_id TEXT,
+    read INTEGER NOT NULL,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notifications_seq ON notifications (seq);
+CREATE TABLE IF NOT EXISTS notification_reads (
+    collaborator_id TEXT PRIMARY KEY,
+    read_until TEXT NOT NULL,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notification_reads_seq ON notification_reads (seq);
+CREATE TABLE IF NOT EXISTS announcements (
+    announcement_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    category TEXT NOT NULL,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS announcements_seq ON announcements (seq);
+CREATE TABLE IF NOT EXISTS access_requests (
+    email TEXT PRIMARY KEY,
+    collaborator_id TEXT NOT NULL,
+    collaborator_name TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    position TEXT,
+    desired_role TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reviewer TEXT,
+    updated_at TEXT,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS access_requests_seq ON access_requests (seq);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('seq', 0);
+"""
+
+_JSON_COLUMNS = frozenset({"break_periods", "notes", "payload", "comments", "metadata", "collaborators"})
+
+
+def _to_row(data: Dict[str, object]) -> Dict[str, object]:
+    return {key: json.dumps(value) if key in _JSON_COLUMNS and value is not None else value for key, value in data.items()}
+
+
+def _from_row(row: sqlite3.Row) -> Dict[str, object]:
+    return {
+        key: json.loads(row[key]) if key in _JSON_COLUMNS and row[key] is not None else row[key]
+        for key in row.keys()
+    }
+
+
+def _insert_sql(table: str, columns: List[str], conflict: Tuple[str, ...] = ()) -> str:
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"
+    if conflict:
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c not in conflict)
+        sql += f" ON CONFLICT ({', '.join(conflict)}) DO UPDATE SET {updates}"
+    return sql
+
+
+class SQLiteStore:
+    """Almacén SQLite compartido por varios procesos (por ejemplo, workers de gunicorn).
+
+    La conexión se abre por proceso: si el objeto se hereda a través de un
+    ``fork`` se reabre al primer uso. Las escrituras propias se recuerdan por
+    su secuencia para no volver a aplicarlas al sincronizar.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0, synchronous: str = "NORMAL") -> None:
+        self.path = path
+        self.timeout = timeout
+        self.synchronous = synchronous
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._cursor = 0
+        self._own: Set[int] = set()
+        self._data_version: Optional[int] = None
+        self._batch: Optional[List[int]] = None
+        self._connection()
+
+    # --- Conexión --------------------------------------------------------
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            conn.executescript(SCHEMA)
+            self._conn, self._pid, self._data_version = conn, os.getpid(), None
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Agrupa las escrituras del bloque en una sola transacción (un solo commit).
+
+        Si el bloque falla se revierte completo. Los bloques anidados se
+        suman a la transacción exterior.
+        """
+
+        with self._lock:
+            if self._batch is not None:
+                yield
+                return
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            self._batch = []
+            try:
+                yield
+            except BaseException:
+                conn.execute("ROLLBACK")
+                self._batch = None
+                raise
+            conn.execute("COMMIT")
+            written, self._batch = self._batch, None
+            for seq in written:
+                if seq == self._cursor + 1:
+                    self._cursor = seq
+                else:
+                    self._own.add(seq)
+
+    @contextmanager
+    def _write(self) -> Iterator[Tuple[sqlite3.Connection, int]]:
+        """Escritura con el siguiente número de secuencia, dentro del lote vigente o en uno propio."""
+
+        with self.batch():
+            conn = self._connection()
+            seq = conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'seq' RETURNING value").fetchone()[0]
+            self._batch.append(seq)
+            yield conn, seq
+
+    def claim(self, key: str) -> bool:
+        """Marca una tarea única (p. ej. cargar datos demo); solo el primer proceso obtiene ``True``."""
+
+        with self._lock:
+            cursor = self._connection().execute("INSERT OR IGNORE INTO meta (key, value) VALUES (?, 1)", (f"claim:{key}",))
+            return cursor.rowcount == 1
+
+    def position(self) -> Tuple[int, ...]:
+        """Hasta dónde llega el estado de este proceso en la secuencia global.
+
+        Es el cursor de ``sync`` más las escrituras propias que aún no quedan
+        contiguas a él; dos procesos con la misma posición aplicaron las mismas
+        escrituras, así que sirve para validar cachés entre workers.
+        """
+
+        with self._lock:
+            return (self._cursor, *sorted(self._own))
+
+    # --- Escrituras ------------------------------------------------------
+    def save_entry(self, collaborator_id: str, entry: TimeEntry) -> None:
+        row = _to_row(entry_to_dict(entry))
+        row["collaborator_id"] = collaborator_id
+        with self._write() as (conn, seq):
+            row["seq"] = seq
+            conn.execute(_insert_sql("time_entries", list(row), ("collaborator_id", "day")), row)
+
+    def save_request(self, request: Request) -> None:
+        row = _to_row(request_to_dict(request))
+        with self._write() as (conn, seq):
+            row["seq"] = seq
+            conn.execute(_insert_sql("requests", list(row), ("request_id",)), row)
+
+    def save_balance(self, collaborator_id: str, balance: timedelta) -> None:
+        row = {"collaborator_id": collaborator_id, "seconds": balance.total_seconds()}
+        with self._write() as (conn, seq):
+            row["seq"] = seq
+            conn.execute(_insert_sql("balances", list(row), ("collaborator_id",)), row)
+
+    def save_event(self, event: CalendarEvent) -> None:
+        self._append("calendar_events", _to_row(event_to_dict(event)))
+
+    def save_holiday(self, holiday: Holiday) -> None:
+        row = _to_row(holiday_to_dict(holiday))
+        row["removed"] = 0
+        with self._write() as (conn, seq):
+            row["seq"] = seq
+            conn.execute(_insert_sql("holidays", list(row), ("name", "day")), row)
+
+    def delete_holiday(self, name: str, day: date) -> None:
+        with self._write() as (conn, seq):
+            conn.execute(
+                "UPDATE holidays SET removed = 1, seq = ? WHERE name = ? AND day = ?", (seq, name, day.isoformat())
+            )
+
+    def save_notification(self, notification: Notification) -> None:
+        self._append("notifications", _to_row(notification_to_dict(notification)))
+
+    def save_notification_read(self, collaborator_id: str, read_until: datetime) -> None:
+        row = {"collaborator_id": collaborator_id, "read_until": read_until.isoformat()}
+        with self._write() as (conn, seq):
+            row["seq"] = seq
+            conn.execute(_insert_sql("notification_reads", list(row), ("collaborator_id",)), row)
+
+    def save_announcement(self, announcement: Announcement) -> None:
+        self._append("announcements", _to_row(announcement_to_dict(announcement)))
+
+    def save_access_request(self, access: AccessRequest) -> None:
+        row = access_to_dict(access)
+        with self._write() as (conn, seq):
+            row["seq"] = seq
+            conn.execute(_insert_sql("access_requests", list(row), ("email",)), row)
+
+    def _append(self, table: str, row: Dict[str, object]) -> None:
+        with self._write() as (conn, seq):
+            row["seq"] = seq
+            conn.execute(_insert_sql(table, list(row)), row)
+
+    # --- Consultas -------------------------------------------------------
+    def load_entries(self, collaborator_id: str, start: date, end: date) -> List[TimeEntry]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT * FROM time_entries WHERE collaborator_id = ? AND day BETWEEN ? AND ? ORDER BY day",
+                (collaborator_id, start.isoformat(), end.isoformat()),
+            ).fetchall()
+        return [entry_from_dict(_from_row(row)) for row in rows]
+
+    def load_requests(
+        self, status: Optional[RequestStatus] = None, request_type: Optional[RequestType] = None
+    ) -> List[Request]:
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status.value)
+        if request_type is not None:
+            clauses.append("request_type = ?")
+            params.append(request_type.value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._connection().execute(f"SELECT * FROM requests {where} ORDER BY created_at", params).fetchall()
+        return [request_from_dict(_from_row(row)) for row in rows]
+
+    # --- Sincronización --------------------------------------------------
+    def sync(self, admin: AdminPortal) -> int:
+        """Aplica sobre ``admin`` las escrituras de otros procesos; devuelve cuántas.
+
+        ``PRAGMA data_version`` solo cambia cuando otra conexión confirma una
+        transacción, así que la llamada sin cambios cuesta una consulta.
+        """
+
+        with self._lock:
+            conn = self._connection()
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return 0
+            changes: List[Tuple[int, Callable[[AdminPortal, Dict[str, object]], None], Dict[str, object]]] = []
+            last = self._cursor
+            conn.execute("BEGIN")
+            try:
+                for table, apply in APPLIERS.items():
+                    for row in conn.execute(f"SELECT * FROM {table} WHERE seq > ?", (self._cursor,)):
+                        seq = row["seq"]
+                        last = max(last, seq)
+                        if seq not in self._own:
+                            changes.append((seq, apply, _from_row(row)))
+            finally:
+                conn.execute("COMMIT")
+            self._data_version = version
+            self._cursor = last
+            self._own = {seq for seq in self._own if seq > last}
+            changes.sort(key=lambda change: change[0])
+            for _, apply, data in changes:
+                apply(admin, data)
+        return len(changes)
+
+
+# Aplican un registro plano (fila de la base o línea de la bitácora) sobre el portal.
+def _apply_balance(admin: AdminPortal, data: Dict[str, object]) -> None:
+    admin.restore_balance(data["collaborator_id"], timedelta(seconds=data["seconds"]))
+
+
+def _apply_entry(admin: AdminPortal, data: Dict[str, object]) -> None:
+    admin.restore_entry(data["collaborator_id"], entry_from_dict(data))
+
+
+def _apply_request(admin: AdminPortal, data: Dict[str, object]) -> None:
+    admin.restore_request(request_from_dict(data))
+
+
+def _apply_event(admin: AdminPortal, data: Dict[str, object]) -> None:
+    admin.restore_event(event_from_dict(data))
+
+
+def _apply_holiday(admin: AdminPortal, data: Dict[str, object]) -> None:
+    if data["removed"]:
+        admin.restore_holiday_removal(data["name"], date.fromisoformat(data["day"]))
+    else:
+        admin.restore_holiday(holiday_from_dict(data))
+
+
+def _apply_notification(admin: AdminPortal, data: Dict[str, object]) -> None:
+    admin.restore_notification(notification_from_dict(data))
+
+
+def _apply_notification_read(admin: AdminPortal, data: Dict[str, object]) -> None:
+    admin.restore_notification_read(data["collaborator_id"], datetime.fromisoformat(data["read_until"]))
+
+
+def _apply_announcement(admin: AdminPortal, data: Dict[str, object]) -> None:
+    admin.restore_announcement(announcement_from_dict(data))
+
+
+def _apply_access_request(admin: AdminPortal, data: Dict[str, object]) -> None:
+    admin.restore_access_request(access_from_dict(data))
+
+
+APPLIERS: Dict[str, Callable[[AdminPortal, Dict[str, object]], None]] = {
+    "balances": _apply_balance,
+    "time_entries": _apply_entry,
+    "requests": _apply_request,
+    "calendar_events": _apply_event,
+    "holidays": _apply_holiday,
+    "notifications": _apply_notification,
+    "notification_reads": _apply_notification_read,
+    "announcements": _apply_announcement,
+    "access_requests": _apply_access_request,
+}
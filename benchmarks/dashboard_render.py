@@ -0,0 +1,74 @@
+"""Mide el render de ``/admin`` con un equipo grande, con y sin caché de fragmentos.
+
+Agrega colaboradores sintéticos a la app demo, inicia sesión como admin y
+pide la página varias veces vaciando la caché antes de cada pedido (frío) y
+dejándola llena (caliente). Al final muestra los contadores de la caché.
+
+Uso: python benchmarks/dashboard_render.py --collaborators 500 --weeks 8
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import warnings
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_kimce import Collaborator, CollaboratorPortal, TimeEntry  # noqa: E402
+
+
+def _populate(webapp, collaborators: int, weeks: int) -> None:
+    monday = date.today() - timedelta(days=date.today().weekday())
+    days = [monday - timedelta(days=offset) for offset in range(1, weeks * 7) if (monday - timedelta(days=offset)).weekday() < 5]
+    for index in range(collaborators):
+        collaborator = Collaborator(f"B{index:04d}", f"Colaborador {index}", timedelta(hours=8), f"b{index}@kimce.studio")
+        entries = []
+        for day in days:
+            start = datetime.combine(day, datetime.min.time()).replace(hour=9, minute=index % 15)
+            entries.append(TimeEntry(day=day, check_in=start, check_out=start + timedelta(hours=8, minutes=30)))
+        collaborator.history.add_entries(entries)
+        webapp.admin_portal.add_collaborator(collaborator)
+        webapp.collaborator_portals[collaborator.collaborator_id] = CollaboratorPortal(collaborator, bus=webapp.event_bus)
+        webapp.collaborators_by_email[collaborator.email] = collaborator
+
+
+def _render(client, webapp, rounds: int, cold: bool) -> float:
+    elapsed = 0.0
+    for _ in range(rounds):
+        if cold:
+            webapp.fragment_cache.clear()
+        began = time.perf_counter()
+        response = client.get("/admin")
+        elapsed += time.perf_counter() - began
+        assert response.status_code == 200, response.status_code
+    return elapsed / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collaborators", type=int, default=500)
+    parser.add_argument("--weeks", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    import webapp
+
+    _populate(webapp, args.collaborators, args.weeks)
+    client = webapp.app.test_client()
+    client.post("/login", data={"email": "ana@kimce.studio"})
+    client.get("/admin")
+
+    cold = _render(client, webapp, args.rounds, cold=True)
+    warm = _render(client, webapp, args.rounds, cold=False)
+    print(f"equipo de {len(webapp.collaborator_portals)} colaboradores")
+    print(f"  sin caché: {cold * 1000:,.1f} ms por página")
+    print(f"  con caché: {warm * 1000:,.1f} ms por página ({cold / warm:,.1f}x)")
+    print(f"  {webapp.fragment_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Mide la recuperación desde la bitácora: reaplicación completa vs. snapshot + cola.
+
+Uso: python benchmarks/journal_replay.py --collaborators 50 --days 250
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_kimce import AdminPortal, Collaborator, CollaboratorPortal  # noqa: E402
+from app_kimce.journal import Journal  # noqa: E402
+
+
+def _team(size: int):
+    return [Collaborator(f"C{i:04d}", f"Colaborador {i}", timedelta(hours=8), f"c{i}@kimce.studio") for i in range(size)]
+
+
+def _record(directory: str, collaborators: int, days: int) -> int:
+    team = _team(collaborators)
+    journal = Journal(directory, snapshot_every=10**12)
+    admin = AdminPortal(team, store=journal)
+    journal.recover(admin)
+    portals = [CollaboratorPortal(collaborator, store=journal) for collaborator in team]
+    start = datetime(2024, 1, 1, 9)
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        for portal in portals:
+            portal.mark_check_in(day)
+            portal.mark_break_start(day + timedelta(hours=4))
+            portal.mark_break_end(day + timedelta(hours=5))
+            portal.mark_check_out(day + timedelta(hours=9))
+    journal.close()
+    return collaborators * days * 4
+
+
+def _recover(directory: str, collaborators: int) -> tuple[int, float]:
+    journal = Journal(directory, snapshot_every=10**12)
+    admin = AdminPortal(_team(collaborators), store=journal)
+    began = time.perf_counter()
+    applied = journal.recover(admin)
+    elapsed = time.perf_counter() - began
+    journal.snapshot(admin)
+    journal.close()
+    return applied, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collaborators", type=int, default=50)
+    parser.add_argument("--days", type=int, default=250)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        written = _record(directory, args.collaborators, args.days)
+        print(f"marcaciones escritas: {written}")
+        applied, elapsed = _recover(directory, args.collaborators)
+        print(f"bitácora completa: {applied} registros en {elapsed:.2f}s ({applied / elapsed:,.0f} eventos/s)")
+        applied, elapsed = _recover(directory, args.collaborators)
+        print(f"desde snapshot:    {applied} registros en {elapsed:.2f}s ({applied / elapsed:,.0f} eventos/s)")
+
+
+if __name__ == "__main__":
+    main()
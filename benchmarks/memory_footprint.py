@@ -0,0 +1,116 @@
+"""Mide la memoria del historial: dataclasses con ``__dict__`` vs. modelos con ``__slots__``.
+
+Cada variante corre en su propio proceso para que el RSS no se contamine.
+
+Uso: python benchmarks/memory_footprint.py --collaborators 500 --years 5
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import subprocess
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_kimce import Collaborator, TimeEntry  # noqa: E402
+
+
+@dataclass
+class LegacyTimeEntry:
+    """Copia de la jornada anterior: ``__dict__`` y dos listas por día."""
+
+    day: date
+    check_in: Optional[datetime] = None
+    break_periods: List[tuple[datetime, datetime]] = field(default_factory=list)
+    ongoing_break_start: Optional[datetime] = None
+    check_out: Optional[datetime] = None
+    notes: List[str] = field(default_factory=list)
+
+    def worked_timedelta(self) -> timedelta:
+        if not self.check_in or not self.check_out:
+            return timedelta(0)
+        total = self.check_out - self.check_in
+        for start, end in self.break_periods:
+            total -= end - start
+        return total
+
+
+LAYOUTS = {"dataclass": LegacyTimeEntry, "slots": TimeEntry}
+
+
+def _workdays(years: int) -> List[date]:
+    first = date(2020, 1, 1)
+    days = (date(first.year + years, 1, 1) - first).days
+    return [first + timedelta(days=offset) for offset in range(days) if (first + timedelta(days=offset)).weekday() < 5]
+
+
+def _entries(entry_class, workdays: List[date]) -> list:
+    entries = []
+    for position, day in enumerate(workdays):
+        start = datetime.combine(day, datetime.min.time()).replace(hour=9)
+        entry = entry_class(day=day, check_in=start, check_out=start + timedelta(hours=9))
+        if position % 10 < 7:  # la mayoría registra el almuerzo
+            entry.break_periods.append((start + timedelta(hours=4), start + timedelta(hours=5)))
+        if position % 20 == 0:
+            entry.notes.append("Reunión con cliente")
+        entries.append(entry)
+    return entries
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _measure(layout: str, collaborators: int, years: int) -> None:
+    entry_class = LAYOUTS[layout]
+    workdays = _workdays(years)
+
+    tracemalloc.start()
+    sample = _entries(entry_class, workdays)
+    per_entry = tracemalloc.get_traced_memory()[0] / len(sample)
+    tracemalloc.stop()
+    del sample
+
+    gc.collect()
+    baseline = _rss_bytes()
+    team = [Collaborator(f"C{i:04d}", f"Colaborador {i}", timedelta(hours=8), f"c{i}@kimce.studio") for i in range(collaborators)]
+    for collaborator in team:
+        collaborator.history.add_entries(_entries(entry_class, workdays))
+    gc.collect()
+    total = collaborators * len(workdays)
+    print(
+        f"{layout:>9}: {total:,} jornadas, {per_entry:,.0f} bytes/jornada, "
+        f"RSS del equipo {(_rss_bytes() - baseline) / 2**20:,.0f} MiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collaborators", type=int, default=500)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--layout", choices=sorted(LAYOUTS))
+    args = parser.parse_args()
+    if args.layout:
+        _measure(args.layout, args.collaborators, args.years)
+        return
+    for layout in ("dataclass", "slots"):
+        subprocess.run(
+            [sys.executable, __file__, "--layout", layout, "--collaborators", str(args.collaborators), "--years", str(args.years)],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Mide la importación en streaming de marcaciones (filas por segundo y memoria).
+
+Uso: python benchmarks/punch_import.py --collaborators 200 --days 250 --format csv
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Iterator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_kimce import AdminPortal, Collaborator  # noqa: E402
+from app_kimce.importer import PunchImporter  # noqa: E402
+
+PUNCHES = (("entrada", 0), ("descanso_inicio", 4 * 60), ("descanso_fin", 5 * 60), ("salida", 9 * 60))
+
+
+def _rows(collaborators: int, days: int) -> Iterator[tuple]:
+    """Filas en el orden en que las exporta un reloj: por día y hora, intercalando colaboradores."""
+
+    start = datetime(2024, 1, 1, 9)
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        for action, minutes in PUNCHES:
+            for index in range(collaborators):
+                yield f"C{index:04d}", (day + timedelta(minutes=minutes + index % 7)).isoformat(), action
+
+
+def _csv_lines(collaborators: int, days: int) -> Iterator[str]:
+    yield "colaborador,fecha_hora,accion,nota\n"
+    for collaborator_id, ts, action in _rows(collaborators, days):
+        yield f"{collaborator_id},{ts},{action},\n"
+
+
+def _ndjson_lines(collaborators: int, days: int) -> Iterator[str]:
+    for collaborator_id, ts, action in _rows(collaborators, days):
+        yield json.dumps({"colaborador": collaborator_id, "fecha_hora": ts, "accion": action}) + "\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collaborators", type=int, default=200)
+    parser.add_argument("--days", type=int, default=250)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    args = parser.parse_args()
+
+    team = [Collaborator(f"C{i:04d}", f"Colaborador {i}", timedelta(hours=8), f"c{i}@kimce.studio") for i in range(args.collaborators)]
+    importer = PunchImporter(AdminPortal(team))
+    lines = _csv_lines if args.format == "csv" else _ndjson_lines
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"marcaciones.{args.format}")
+        with open(path, "w", encoding="utf-8", newline="") as handle:
+            handle.writelines(lines(args.collaborators, args.days))
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        began = time.perf_counter()
+        with open(path, encoding="utf-8", newline="") as handle:
+            report = getattr(importer, f"import_{args.format}")(handle)
+        elapsed = time.perf_counter() - began
+        after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{report.rows} filas en {elapsed:.2f}s ({report.rows / elapsed:,.0f} filas/s)")
+    print(f"jornadas: {report.entries}, errores: {len(report.errors)}, memoria máx. +{(after - before) / 1024:.1f} MiB (incluye las jornadas cargadas al historial)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Simula la hora punta de entradas: escrituras directas vs. confirmación en grupo.
+
+Uso: python benchmarks/punch_rush.py --threads 32 --punches 20
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_kimce import Collaborator, CollaboratorPortal  # noqa: E402
+from app_kimce.batching import GroupCommitStore  # noqa: E402
+from app_kimce.storage import SQLiteStore  # noqa: E402
+
+
+def _rush(store, threads: int, punches: int) -> float:
+    portals = [
+        CollaboratorPortal(Collaborator(f"C{i:04d}", f"Colaborador {i}", timedelta(hours=8), f"c{i}@kimce.studio"), store=store)
+        for i in range(threads)
+    ]
+    start = datetime(2024, 1, 1, 9)
+    barrier = threading.Barrier(threads)
+
+    def worker(portal: CollaboratorPortal) -> None:
+        barrier.wait()
+        for offset in range(punches):
+            day = start + timedelta(days=offset)
+            portal.mark_check_in(day)
+
+    workers = [threading.Thread(target=worker, args=(portal,)) for portal in portals]
+    began = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - began
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--punches", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    total = args.threads * args.punches
+
+    with tempfile.TemporaryDirectory() as directory:
+        direct = SQLiteStore(os.path.join(directory, "directo.db"), synchronous="FULL")
+        elapsed = _rush(direct, args.threads, args.punches)
+        print(f"directo:  {total} marcaciones en {elapsed:.2f}s ({total / elapsed:,.0f}/s)")
+
+        backend = SQLiteStore(os.path.join(directory, "grupo.db"), synchronous="FULL")
+        grouped = GroupCommitStore(backend, max_batch=args.batch, max_delay=args.delay_ms / 1000)
+        elapsed = _rush(grouped, args.threads, args.punches)
+        grouped.close()
+        print(
+            f"en grupo: {total} marcaciones en {elapsed:.2f}s ({total / elapsed:,.0f}/s), "
+            f"{grouped.batches} lotes de {grouped.writes / max(grouped.batches, 1):.1f} en promedio"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""Bandeja de solicitudes del ``AdminPortal``."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from app_kimce import AdminPortal, Collaborator, CollaboratorPortal, RequestType
+
+
+def test_added_collaborator_feeds_the_inbox_alongside_other_listeners():
+    admin = AdminPortal([Collaborator("C1", "Ana", timedelta(hours=8), "ana@kimce.studio")])
+    newcomer = Collaborator("C2", "Luis", timedelta(hours=8), "luis@kimce.studio")
+    portal = CollaboratorPortal(newcomer)
+    earlier = portal.create_request(RequestType.OVERTIME, {"horas": "1"})
+    seen = []
+    newcomer.history.request_listeners.append(seen.append)
+
+    admin.add_collaborator(newcomer)
+    later = portal.create_request(RequestType.OVERTIME, {"horas": "2"})
+
+    assert admin.pending_requests() == [earlier, later]
+    assert seen == [later]
+    admin.add_collaborator(newcomer)
+    assert newcomer.history.request_listeners.count(admin._track_request) == 1
@@ -0,0 +1,65 @@
+"""Confirmación en grupo sobre SQLite."""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from app_kimce import Collaborator, CollaboratorPortal, TimeEntry
+from app_kimce.batching import GroupCommitStore
+from app_kimce.storage import SQLiteStore
+
+
+def test_lone_write_does_not_wait_for_the_delay(tmp_path):
+    store = GroupCommitStore(SQLiteStore(str(tmp_path / "kimce.db")), max_delay=0.5)
+    portal = CollaboratorPortal(Collaborator("C1", "Ana", timedelta(hours=8), "ana@kimce.studio"), store=store)
+    began = time.monotonic()
+    portal.mark_check_in(datetime(2024, 3, 4, 9))
+    assert time.monotonic() - began < 0.25
+    store.close()
+
+
+def test_concurrent_writes_share_batches(tmp_path):
+    backend = SQLiteStore(str(tmp_path / "kimce.db"))
+    store = GroupCommitStore(backend, max_delay=0.01)
+    portals = [
+        CollaboratorPortal(Collaborator(f"C{i}", f"Colaborador {i}", timedelta(hours=8), f"c{i}@kimce.studio"), store=store)
+        for i in range(16)
+    ]
+    barrier = threading.Barrier(len(portals))
+
+    def punch(portal):
+        barrier.wait()
+        for offset in range(5):
+            portal.mark_check_in(datetime(2024, 3, 4, 9) + timedelta(days=offset))
+
+    threads = [threading.Thread(target=punch, args=(portal,)) for portal in portals]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.close()
+    assert store.writes == 80
+    assert store.batches < store.writes
+
+
+def test_entry_is_persisted_as_it_was_when_queued(tmp_path):
+    backend = SQLiteStore(str(tmp_path / "kimce.db"))
+    store = GroupCommitStore(backend)
+    entry = TimeEntry(day=date(2024, 3, 4), check_in=datetime(2024, 3, 4, 9))
+    gate = threading.Event()
+    original_batch = backend.batch
+
+    def held_batch():
+        gate.wait()
+        return original_batch()
+
+    backend.batch = held_batch
+    writer = threading.Thread(target=store.save_entry, args=("C1", entry))
+    writer.start()
+    time.sleep(0.05)
+    entry.check_out = datetime(2024, 3, 4, 17)
+    gate.set()
+    writer.join()
+    store.close()
+    assert backend.load_entries("C1", date(2024, 3, 4), date(2024, 3, 4))[0].check_out is None
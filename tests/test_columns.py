@@ -0,0 +1,50 @@
+"""Bloques columnares: la actualización por mes coincide con una reconstrucción completa."""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+from app_kimce import Collaborator, TimeEntry
+from app_kimce.columns import EntryColumns, TeamColumns
+
+COLUMNS = ("day", "check_in", "check_out", "breaks", "worked", "check_in_hour")
+
+
+def _entry(day: date, minute: int = 0) -> TimeEntry:
+    start = datetime.combine(day, datetime.min.time()).replace(hour=9, minute=minute)
+    entry = TimeEntry(day=day, check_in=start, check_out=start + timedelta(hours=8))
+    entry.break_periods.append((start + timedelta(hours=3), start + timedelta(hours=4)))
+    return entry
+
+
+def test_block_refresh_only_touches_changed_months():
+    collaborator = Collaborator("C1", "Ana", timedelta(hours=8), "ana@kimce.studio")
+    collaborator.history.add_entries(_entry(date(2024, 1, 1) + timedelta(days=offset)) for offset in range(0, 120, 2))
+    team = TeamColumns([collaborator])
+    block = team.block(collaborator)
+    block.worked_prefix()
+
+    collaborator.history.add_entry(_entry(date(2024, 2, 10), minute=20))
+    collaborator.history.add_entry(_entry(date(2024, 6, 3)))
+    collaborator.history.add_entries([_entry(date(2024, 1, 3), minute=5), _entry(date(2024, 3, 31))])
+
+    assert team.block(collaborator) is block
+    rebuilt = EntryColumns(collaborator.history)
+    for name in COLUMNS:
+        assert list(getattr(block, name)) == list(getattr(rebuilt, name)), name
+    assert block.worked_seconds(date(2024, 1, 1), date(2024, 6, 30)) == rebuilt.worked_seconds(
+        date(2024, 1, 1), date(2024, 6, 30)
+    )
+
+
+def test_iter_breaks_does_not_allocate():
+    entry = TimeEntry(day=date(2024, 1, 1))
+    assert list(entry.iter_breaks()) == [] and list(entry.iter_notes()) == []
+    assert entry._break_periods is None and entry._notes is None
+
+
+def test_average_check_in_hour_ignores_days_without_check_in():
+    collaborator = Collaborator("C1", "Ana", timedelta(hours=8), "ana@kimce.studio")
+    collaborator.history.add_entries([_entry(date(2024, 1, 1)), TimeEntry(day=date(2024, 1, 2)), _entry(date(2024, 1, 3))])
+    collaborator.history.entry_for(date(2024, 1, 3)).check_in = datetime(2024, 1, 3, 11)
+    collaborator.history.refresh_entry(collaborator.history.entry_for(date(2024, 1, 3)))
+    assert TeamColumns([collaborator]).block(collaborator).average_check_in_hour() == 10.0
@@ -0,0 +1,24 @@
+"""Importación de marcaciones con filas inválidas."""
+from __future__ import annotations
+
+import json
+from datetime import date, timedelta
+
+from app_kimce import AdminPortal, Collaborator
+from app_kimce.importer import PunchImporter
+
+
+def test_non_text_ndjson_values_are_reported_per_row():
+    admin = AdminPortal([Collaborator("C1", "Ana", timedelta(hours=8), "ana@kimce.studio")])
+    rows = [
+        {"colaborador": "C1", "accion": ["entrada"], "fecha_hora": "2024-03-04T09:00"},
+        {"colaborador": "C1", "accion": "entrada", "fecha_hora": 123},
+        {"colaborador": {"id": "C1"}, "accion": "entrada", "fecha_hora": "2024-03-04T09:00"},
+        {"colaborador": "C1", "accion": "entrada", "fecha_hora": "2024-03-04T09:00"},
+        {"colaborador": "C1", "accion": "salida", "fecha_hora": "2024-03-04T17:00", "nota": 5},
+    ]
+    report = PunchImporter(admin).import_ndjson(json.dumps(row) for row in rows)
+
+    assert report.rows == 5 and report.punches == 1
+    assert [error.line for error in report.errors] == [1, 2, 3, 5]
+    assert admin.collaborators["C1"].history.entry_for(date(2024, 3, 4)).check_in is not None
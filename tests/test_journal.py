@@ -0,0 +1,78 @@
+"""Bitácora con snapshots: recuperación y sincronización a disco."""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+
+from app_kimce import AdminPortal, CalendarEvent, Collaborator
+from app_kimce.models import NotificationCategory
+from app_kimce.journal import Journal
+
+
+def _admin(store=None):
+    return AdminPortal([Collaborator("C1", "Ana", timedelta(hours=8), "ana@kimce.studio")], store=store)
+
+
+def _event(hour):
+    return CalendarEvent(title=f"Rodaje {hour}", start=datetime(2024, 3, 4, hour), end=datetime(2024, 3, 4, hour + 1), collaborator_id="C1")
+
+
+def test_snapshot_waits_for_open_batch(tmp_path):
+    journal = Journal(str(tmp_path), snapshot_every=2)
+    admin = _admin(journal)
+    journal.recover(admin)
+    admin._add_calendar_events([_event(9), _event(10), _event(11)])
+    journal.close()
+
+    recovered = _admin()
+    Journal(str(tmp_path)).recover(recovered)
+    assert len(recovered.calendar_events) == len(admin.calendar_events) == 3
+
+
+def test_lone_write_is_synced_without_later_writes(tmp_path):
+    journal = Journal(str(tmp_path), group_size=64, group_interval=0.02)
+    admin = _admin(journal)
+    journal.recover(admin)
+    admin.adjust_hours("C1", 1)
+    assert journal._unsynced == 1
+    time.sleep(0.2)
+    assert journal._unsynced == 0
+    journal.close()
+
+
+def test_position_only_moves_forward_across_restarts(tmp_path):
+    journal = Journal(str(tmp_path))
+    admin = _admin(journal)
+    journal.recover(admin)
+    admin._add_calendar_events([_event(9)])
+    written = journal.position()
+    journal.close()
+
+    reopened = Journal(str(tmp_path))
+    reopened.recover(_admin(reopened))
+    assert reopened.position() == written
+    reopened.snapshot(reopened._admin)
+    assert reopened.position() > written
+    reopened.close()
+
+
+def test_notification_reads_survive_restart_and_snapshot(tmp_path):
+    journal = Journal(str(tmp_path))
+    admin = _admin(journal)
+    journal.recover(admin)
+    admin.push_notification("Turno actualizado", NotificationCategory.INFO, collaborator_id="C1")
+    admin.mark_notifications_read("C1")
+    journal.close()
+
+    replayed = _admin()
+    Journal(str(tmp_path)).recover(replayed)
+    assert replayed.unread_notifications("C1") == 0
+
+    reopened = Journal(str(tmp_path))
+    admin = _admin(reopened)
+    reopened.recover(admin)
+    reopened.snapshot(admin)
+    reopened.close()
+    restored = _admin()
+    Journal(str(tmp_path)).recover(restored)
+    assert restored.unread_notifications("C1") == 0
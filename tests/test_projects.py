@@ -0,0 +1,23 @@
+"""Libro de horas por proyecto."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from app_kimce import AdminPortal, Collaborator, CollaboratorPortal, RequestStatus, RequestType
+
+
+def test_zero_hour_activity_stays_listed_until_retracted():
+    collaborator = Collaborator("C1", "Ana", timedelta(hours=8), "ana@kimce.studio")
+    admin = AdminPortal([collaborator])
+    portal = CollaboratorPortal(collaborator)
+    payload = {"inicio": "2024-03-04T09:00", "fin": "2024-03-04T10:00", "actividad": "Feria"}
+    request = portal.create_request(RequestType.SPECIAL_ACTIVITY, payload)
+    admin.review_request(request, "approve", "RRHH")
+
+    assert admin.project_hours.hours_by_project() == {"sin_proyecto": 0.0}
+    assert admin.project_hours.hours_by_project((2024, 3), (2024, 3)) == {"sin_proyecto": 0.0}
+
+    request.status = RequestStatus.REJECTED
+    admin.project_hours.record(request)
+    assert admin.project_hours.hours_by_project() == {}
+    assert admin.project_hours.collaborator_hours("C1") == {}
@@ -0,0 +1,123 @@
+"""Sincronización entre dos procesos que comparten la misma base SQLite."""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app_kimce import AdminPortal, Collaborator, CollaboratorPortal, RequestStatus, RequestType, Role
+from app_kimce.models import AccessRequest, AccessStatus, NotificationCategory
+from app_kimce.storage import SQLiteStore
+
+
+def _team():
+    return [
+        Collaborator("C1", "Ana", timedelta(hours=8), "ana@kimce.studio"),
+        Collaborator("C2", "Luis", timedelta(hours=8), "luis@kimce.studio"),
+    ]
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Dos "workers": cada uno con su conexión, sus modelos y su ``AdminPortal``."""
+
+    path = str(tmp_path / "kimce.db")
+    first, second = SQLiteStore(path), SQLiteStore(path)
+    team_a, team_b = _team(), _team()
+    yield (first, team_a, AdminPortal(team_a, store=first)), (second, team_b, AdminPortal(team_b, store=second))
+    first.close()
+    second.close()
+
+
+def test_sync_applies_other_connection_writes(workers):
+    (store_a, team_a, admin_a), (store_b, team_b, admin_b) = workers
+    portal = CollaboratorPortal(team_a[0], store=store_a)
+    portal.mark_check_in(datetime(2024, 3, 4, 9))
+    portal.mark_check_out(datetime(2024, 3, 4, 17, 30))
+    request = portal.create_request(RequestType.OVERTIME, {"horas": "2"})
+    admin_a.review_request(admin_a.find_request(request.request_id), "approve", "RRHH")
+
+    assert store_b.sync(admin_b) > 0
+    assert team_b[0].history.worked_hours_between(date(2024, 3, 1), date(2024, 3, 31)) == timedelta(hours=8, minutes=30)
+    assert team_b[0].history.hours_balance == timedelta(hours=2)
+    assert admin_b.find_request(request.request_id).status == RequestStatus.APPROVED
+    assert admin_b.pending_requests() == []
+    assert admin_b.rollup_differences() == {}
+    # Las escrituras propias no se vuelven a aplicar, y sin cambios no hay nada que leer.
+    assert store_a.sync(admin_a) == 0
+    assert store_b.sync(admin_b) == 0
+
+
+def test_batch_is_atomic_across_connections(workers):
+    (store_a, team_a, admin_a), (store_b, _, admin_b) = workers
+    with pytest.raises(RuntimeError):
+        with store_a.batch():
+            admin_a.adjust_hours("C1", 3)
+            raise RuntimeError("falla a mitad del lote")
+    assert store_b.sync(admin_b) == 0
+    with store_a.batch():
+        admin_a.adjust_hours("C1", 1)
+        admin_a.adjust_hours("C2", 2)
+    assert store_b.sync(admin_b) == 2
+    assert admin_b.collaborators["C2"].history.hours_balance == timedelta(hours=2)
+
+
+def test_claim_is_granted_once(workers):
+    (store_a, _, _), (store_b, _, _) = workers
+    assert store_a.claim("demo") is True
+    assert store_b.claim("demo") is False
+
+
+def test_access_review_reaches_other_workers(workers):
+    (store_a, _, admin_a), (store_b, team_b, admin_b) = workers
+    access = AccessRequest("luis@kimce.studio", "C2", "Luis", datetime(2024, 3, 1, 9))
+    admin_a.request_access(access)
+    admin_a.review_access("luis@kimce.studio", "approve", "Admin", position="Diseñador", role=Role.ADMIN)
+
+    store_b.sync(admin_b)
+    synced = admin_b.access_requests["luis@kimce.studio"]
+    assert synced.status == AccessStatus.APPROVED
+    assert team_b[1].role == Role.ADMIN and team_b[1].position == "Diseñador"
+
+
+def test_position_matches_once_workers_are_synced(workers):
+    (store_a, _, admin_a), (store_b, _, admin_b) = workers
+    admin_a.adjust_hours("C1", 1)
+    assert store_a.position() != store_b.position()
+    store_b.sync(admin_b)
+    assert store_a.position() == store_b.position()
+    admin_b.adjust_hours("C2", 1)
+    store_a.sync(admin_a)
+    assert store_a.position() == store_b.position()
+
+
+def test_batch_review_rejects_invalid_payload_without_side_effects(workers):
+    (store_a, team_a, admin_a), (store_b, team_b, admin_b) = workers
+    portal = CollaboratorPortal(team_a[0], store=store_a)
+    good = portal.create_request(RequestType.OVERTIME, {"horas": "2"})
+    bad = portal.create_request(RequestType.OVERTIME, {"horas": "2"})
+    bad.payload["horas"] = "abc"
+
+    results = admin_a.review_requests([(good.request_id, "approve", None), (bad.request_id, "approve", None)], "RRHH")
+
+    assert results[0].ok and results[0].status == RequestStatus.APPROVED
+    assert not results[1].ok and results[1].status is None
+    assert bad.status == RequestStatus.PENDING and admin_a.pending_requests() == [bad]
+    assert team_a[0].history.hours_balance == timedelta(hours=2)
+    store_b.sync(admin_b)
+    assert admin_b.find_request(good.request_id).status == RequestStatus.APPROVED
+    assert team_b[0].history.hours_balance == timedelta(hours=2)
+
+
+def test_read_notifications_stay_read_on_other_workers(workers):
+    (store_a, _, admin_a), (store_b, _, admin_b) = workers
+    admin_a.push_notification("Turno actualizado", NotificationCategory.INFO, collaborator_id="C1")
+    admin_a.push_notification("Oficina cerrada el viernes", NotificationCategory.INFO)
+    store_b.sync(admin_b)
+    assert admin_b.unread_notifications("C1") == 2
+
+    admin_b.mark_notifications_read("C1")
+    admin_a.push_notification("Nuevo aviso", NotificationCategory.INFO, collaborator_id="C1")
+    store_a.sync(admin_a)
+    assert admin_a.unread_notifications("C1") == 1
+    assert admin_a.unread_notifications("C2") == 1
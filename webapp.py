@@ -2,20 +2,45 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import io
+import os
 import socket
-from dataclasses import dataclass
 import calendar as pycal
 from datetime import date, datetime, timedelta
-from enum import Enum
-from typing import Dict, List, Optional
-
-from flask import Flask, flash, redirect, render_template, request, session, url_for
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from flask import (
+    Flask,
+    Response,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    session,
+    stream_with_context,
+    url_for,
+)
+from markupsafe import Markup
 
 from app_kimce.admin import AdminPortal
+from app_kimce.analytics import AnalyticsPanel
+from app_kimce.batching import GroupCommitStore
+from app_kimce.calendar import CalendarBoard
+from app_kimce.events import EventBus, sse_stream
+from app_kimce.exporter import iter_history, stream_csv, stream_ndjson
+from app_kimce.fragments import FragmentCache
+from app_kimce.importer import PunchImporter
+from app_kimce.journal import Journal
 from app_kimce.models import (
+    AccessRequest,
+    AccessStatus,
     Collaborator,
     Document,
     Evaluation,
+    InvalidPayloadError,
     KPIRecord,
     Notification,
     NotificationCategory,
@@ -25,44 +50,13 @@ from app_kimce.models import (
     WorkModality,
 )
 from app_kimce.portal import CollaboratorPortal, FlowError
+from app_kimce.serialization import event_to_dict, request_to_dict
+from app_kimce.storage import SQLiteStore, Store
 
 app = Flask(__name__)
 app.secret_key = "kimce-demo-ui"
 
 
-class AccessStatus(str, Enum):
-    """Estados posibles para un acceso basado en correo."""
-
-    PENDING = "pendiente"
-    APPROVED = "aprobado"
-    DENIED = "denegado"
-
-
-@dataclass
-class AccessRequest:
-    """Solicitud de acceso registrada por correo."""
-
-    email: str
-    collaborator_id: str
-    collaborator_name: str
-    created_at: datetime
-    position: Optional[str] = None
-    desired_role: Role = Role.COLLABORATOR
-    status: AccessStatus = AccessStatus.PENDING
-    reviewer: Optional[str] = None
-    updated_at: Optional[datetime] = None
-
-    def approve(self, reviewer: str) -> None:
-        self.status = AccessStatus.APPROVED
-        self.reviewer = reviewer
-        self.updated_at = datetime.now()
-
-    def deny(self, reviewer: str) -> None:
-        self.status = AccessStatus.DENIED
-        self.reviewer = reviewer
-        self.updated_at = datetime.now()
-
-
 def _bootstrap_collaborators() -> List[Collaborator]:
     """Genera colaboradores demo para la interfaz."""
 
@@ -132,18 +126,39 @@ def _bootstrap_collaborators() -> List[Collaborator]:
 
 
 collaborators = _bootstrap_collaborators()
+# Con KIMCE_DB el estado se guarda en SQLite y se comparte entre workers de gunicorn;
+# con KIMCE_JOURNAL se guarda en una bitácora con snapshots (un solo proceso).
+store: Optional[Store] = None
+if os.environ.get("KIMCE_DB"):
+    store = SQLiteStore(os.environ["KIMCE_DB"], synchronous="FULL")
+elif os.environ.get("KIMCE_JOURNAL"):
+    store = Journal(os.environ["KIMCE_JOURNAL"])
+# Las marcaciones de los colaboradores se confirman en lotes (KIMCE_BATCH_SIZE escrituras
+# o KIMCE_BATCH_DELAY_MS milisegundos); cada petición responde cuando su lote está en disco.
+punch_store: Optional[Store] = None
+if store is not None:
+    punch_store = GroupCommitStore(
+        store,
+        max_batch=int(os.environ.get("KIMCE_BATCH_SIZE", "64")),
+        max_delay=float(os.environ.get("KIMCE_BATCH_DELAY_MS", "5")) / 1000,
+    )
+# Cambios en vivo para el dashboard admin (``/eventos``).
+event_bus = EventBus()
+# Tarjetas de colaborador ya calculadas/renderizadas, por versión de sus datos.
+fragment_cache = FragmentCache(int(os.environ.get("KIMCE_FRAGMENT_CACHE", "4096")))
 collaborator_portals: Dict[str, CollaboratorPortal] = {
-    c.collaborator_id: CollaboratorPortal(c) for c in collaborators
+    c.collaborator_id: CollaboratorPortal(c, store=punch_store, bus=event_bus) for c in collaborators
 }
 collaborators_by_email: Dict[str, Collaborator] = {
     c.email.lower(): c for c in collaborators
 }
-access_requests: Dict[str, AccessRequest] = {}
+admin_portal = AdminPortal(collaborators, store=store, bus=event_bus)
+# Accesos demo; con KIMCE_DB/KIMCE_JOURNAL los cambios guardados se aplican encima al sincronizar.
 for index, collaborator in enumerate(collaborators):
     status = AccessStatus.APPROVED if index == 0 else AccessStatus.PENDING
     reviewer = "Auto demo" if status == AccessStatus.APPROVED else None
     updated_at = datetime.now() if status == AccessStatus.APPROVED else None
-    access_requests[collaborator.email.lower()] = AccessRequest(
+    admin_portal.access_requests[collaborator.email.lower()] = AccessRequest(
         email=collaborator.email.lower(),
         collaborator_id=collaborator.collaborator_id,
         collaborator_name=collaborator.full_name,
@@ -154,16 +169,22 @@ for index, collaborator in enumerate(collaborators):
         reviewer=reviewer,
         updated_at=updated_at,
     )
-admin_portal = AdminPortal(collaborators)
-admin_portal.create_announcement(
-    "Nueva activación cliente B", "Coordina tu disponibilidad esta semana.", NotificationCategory.INFO
-)
-admin_portal.create_announcement(
-    "Reglamento actualizado", "Descarga la versión vigente desde tu perfil.", NotificationCategory.WARNING
-)
-admin_portal.push_notification(
-    "Tienes vacaciones aprobadas la próxima semana.", NotificationCategory.SUCCESS, collaborator_id="COL-002"
-)
+access_requests = admin_portal.access_requests
+analytics_panel = AnalyticsPanel(collaborators, project_hours=admin_portal.project_hours)
+if isinstance(store, SQLiteStore):
+    store.sync(admin_portal)
+elif isinstance(store, Journal):
+    store.recover(admin_portal)
+if store is None or store.claim("demo"):
+    admin_portal.create_announcement(
+        "Nueva activación cliente B", "Coordina tu disponibilidad esta semana.", NotificationCategory.INFO
+    )
+    admin_portal.create_announcement(
+        "Reglamento actualizado", "Descarga la versión vigente desde tu perfil.", NotificationCategory.WARNING
+    )
+    admin_portal.push_notification(
+        "Tienes vacaciones aprobadas la próxima semana.", NotificationCategory.SUCCESS, collaborator_id="COL-002"
+    )
 
 
 def _hours_to_hhmm(value) -> str:
@@ -186,6 +207,18 @@ def _current_week_start() -> date:
     return today - timedelta(days=today.weekday())
 
 
+def _personal_day_totals(collaborator_id: str, start: date, end: date) -> Dict[date, Dict[str, timedelta]]:
+    """Horas trabajadas/esperadas por día de un colaborador (fila de la matriz del equipo)."""
+
+    matrix = analytics_panel.hours_matrix(start, end, collaborator_ids=[collaborator_id])
+    worked = matrix.row(collaborator_id, "worked")
+    expected = matrix.row(collaborator_id, "expected")
+    return {
+        matrix.day(column): {"worked": timedelta(seconds=worked[column]), "expected": timedelta(seconds=expected[column])}
+        for column in range(matrix.days)
+    }
+
+
 def _require_session(collaborator_id: str) -> bool:
     """Valida que el colaborador en sesión sea el dueño del portal."""
 
@@ -196,6 +229,18 @@ def _require_session(collaborator_id: str) -> bool:
     return True
 
 
+@app.before_request
+def sync_store() -> None:
+    """Incorpora lo que otros workers hayan escrito desde la última petición."""
+
+    if isinstance(store, SQLiteStore):
+        store.sync(admin_portal)
+
+
+# Avisos que muestra el centro de notificaciones de la cabecera.
+NOTIFICATION_FEED_SIZE = 8
+
+
 @app.context_processor
 def inject_session_data():
     collaborator = None
@@ -203,11 +248,14 @@ def inject_session_data():
     if collaborator_id and collaborator_id in collaborator_portals:
         collaborator = collaborator_portals[collaborator_id].collaborator
     notifications: List[Notification] = []
+    unread = 0
     if collaborator:
-        notifications = admin_portal.list_notifications(collaborator.collaborator_id)
+        notifications, _ = admin_portal.notification_page(collaborator.collaborator_id, limit=NOTIFICATION_FEED_SIZE)
+        unread = admin_portal.unread_notifications(collaborator.collaborator_id)
     return {
         "active_collaborator": collaborator,
         "notification_feed": notifications,
+        "notification_unread": unread,
         "Role": Role,
     }
 
@@ -217,6 +265,35 @@ def format_hhmm(value):
     return _hours_to_hhmm(value)
 
 
+def _collaborator_card(portal: CollaboratorPortal, week_start: date) -> Dict[str, object]:
+    """Resumen semanal, saldo e indicador de un colaborador, desde la caché de fragmentos."""
+
+    collaborator = portal.collaborator
+    return fragment_cache.fetch(
+        ("tarjeta", collaborator.collaborator_id, week_start),
+        collaborator.version,
+        lambda: {
+            "collaborator": collaborator,
+            "summary": portal.week_summary(week_start),
+            "balance": portal.balance_overview(),
+            "indicator": portal.weekly_indicator(week_start),
+        },
+    )
+
+
+def _team_row(portal: CollaboratorPortal, week_start: date) -> Dict[str, object]:
+    """Tarjeta del listado de equipo con su fila ya renderizada en ``html``."""
+
+    card = _collaborator_card(portal, week_start)
+    collaborator = portal.collaborator
+    html = fragment_cache.fetch(
+        ("fila-equipo", collaborator.collaborator_id, week_start),
+        collaborator.version,
+        lambda: Markup(render_template("_team_card.html", card=card)),
+    )
+    return {**card, "html": html}
+
+
 @app.route("/")
 def home() -> str:
     logged_id = session.get("collaborator_id")
@@ -231,21 +308,10 @@ def home() -> str:
     collaborator_cards = []
     active_today = []
     for portal in collaborator_portals.values():
-        summary = portal.week_summary(week_start)
-        entry_today = next(
-            (e for e in portal.collaborator.history.time_entries if e.day == date.today()),
-            None,
-        )
+        entry_today = portal.collaborator.history.entry_for(date.today())
         if entry_today and entry_today.check_in and not entry_today.check_out:
             active_today.append(portal.collaborator)
-        collaborator_cards.append(
-            {
-                "collaborator": portal.collaborator,
-                "summary": summary,
-                "balance": portal.balance_overview(),
-                "indicator": portal.weekly_indicator(week_start),
-            }
-        )
+        collaborator_cards.append(_collaborator_card(portal, week_start))
     admin_summary = admin_portal.hours_balance_summary()
     summary_totals = {"horas_trabajadas": 0.0, "horas_esperadas": 0.0, "horas_extra": 0.0}
     for card in collaborator_cards:
@@ -256,9 +322,8 @@ def home() -> str:
     holidays = admin_portal.list_holidays()
     today = date.today()
     calendar = admin_portal.build_calendar(today.month, today.year)
-    events_by_day: Dict[date, List] = {}
-    for event in calendar:
-        events_by_day.setdefault(event.start.date(), []).append(event)
+    month_grid = pycal.Calendar().monthdatescalendar(today.year, today.month)
+    events_by_day = CalendarBoard.spread_by_day(calendar, month_grid[0][0], month_grid[-1][-1])
     access_list = list(access_requests.values())
     access_counts = {
         "total": len(access_list),
@@ -271,25 +336,18 @@ def home() -> str:
     if total_requests:
         completed = len([r for r in admin_portal.requests if r.status == RequestStatus.APPROVED])
         requests_completion = int((completed / total_requests) * 100)
-    worked_today = timedelta()
-    expected_today = timedelta()
-    for portal in collaborator_portals.values():
-        entry = next((e for e in portal.collaborator.history.time_entries if e.day == today), None)
-        if entry:
-            worked_today += entry.worked_timedelta()
-        expected_today += portal.collaborator.expected_hours_for_day(today)
-    month_grid = pycal.Calendar().monthdatescalendar(today.year, today.month)
-    day_totals: Dict[date, Dict[str, timedelta]] = {}
-    for week in month_grid:
-        for day in week:
-            worked = timedelta()
-            expected = timedelta()
-            for portal in collaborator_portals.values():
-                entry = next((e for e in portal.collaborator.history.time_entries if e.day == day), None)
-                if entry:
-                    worked += entry.worked_timedelta()
-                expected += portal.collaborator.expected_hours_for_day(day)
-            day_totals[day] = {"worked": worked, "expected": expected}
+    matrix = analytics_panel.hours_matrix(month_grid[0][0], month_grid[-1][-1])
+    worked_by_day = matrix.column_totals("worked")
+    expected_by_day = matrix.column_totals("expected")
+    day_totals: Dict[date, Dict[str, timedelta]] = {
+        matrix.day(column): {
+            "worked": timedelta(seconds=worked_by_day[column]),
+            "expected": timedelta(seconds=expected_by_day[column]),
+        }
+        for column in range(matrix.days)
+    }
+    worked_today = day_totals[today]["worked"]
+    expected_today = day_totals[today]["expected"]
     return render_template(
         "home.html",
         collaborator_cards=collaborator_cards,
@@ -341,7 +399,7 @@ def login():  # type: ignore[override]
                 desired_role=collaborator.role,
                 created_at=datetime.now(),
             )
-            access_requests[email] = access_request
+            admin_portal.request_access(access_request)
             flash("Tu solicitud de acceso fue enviada al panel admin.", "info")
             if next_id:
                 return redirect(url_for("login", next=next_id))
@@ -379,7 +437,7 @@ def collaborator_view(collaborator_id: str) -> str:
     collaborator = portal.collaborator
     entries = sorted(collaborator.history.time_entries, key=lambda e: e.day, reverse=True)
     today = date.today()
-    today_entry = next((e for e in collaborator.history.time_entries if e.day == today), None)
+    today_entry = collaborator.history.entry_for(today)
     return render_template(
         "collaborator.html",
         collaborator=collaborator,
@@ -392,7 +450,7 @@ def collaborator_view(collaborator_id: str) -> str:
         action_state=portal.action_availability(today),
         today_entry=today_entry,
         today=today,
-        notifications=admin_portal.list_notifications(collaborator_id),
+        notifications=admin_portal.notification_page(collaborator_id)[0],
     )
 
 
@@ -408,20 +466,19 @@ def collaborator_profile(collaborator_id: str) -> str:
         for req in collaborator.history.requests
         if req.status == RequestStatus.APPROVED
     ]
-    upcoming = [
-        req
-        for req in approved
-        if req.payload.get("inicio") and datetime.fromisoformat(req.payload.get("inicio")).date() >= date.today()
-    ]
+    upcoming = [req for req in approved if req.details.inicio and req.details.inicio.date() >= date.today()]
+    before = request.args.get("antes", type=int)
+    notifications, older = admin_portal.notification_page(collaborator_id, before=before, limit=20)
     return render_template(
         "profile.html",
         collaborator=collaborator,
         summary=portal.week_summary(week_start),
         balance=portal.balance_overview(),
         approved_requests=approved,
-        upcoming_requests=sorted(upcoming, key=lambda r: r.payload.get("inicio")),
+        upcoming_requests=sorted(upcoming, key=lambda r: r.details.inicio),
         RequestType=RequestType,
-        notifications=admin_portal.list_notifications(collaborator_id),
+        notifications=notifications,
+        notifications_older=older,
     )
 
 
@@ -435,9 +492,8 @@ def collaborator_dashboard() -> str:
     portal = collaborator_portals[collaborator_id]
     collaborator = portal.collaborator
     week_start = _current_week_start()
-    summary = portal.week_summary(week_start)
-    balance = portal.balance_overview()
-    indicator = portal.weekly_indicator(week_start)
+    card = _collaborator_card(portal, week_start)
+    summary, balance, indicator = card["summary"], card["balance"], card["indicator"]
     pending_requests = [
         req for req in portal.request_history() if req.status == RequestStatus.PENDING
     ]
@@ -445,21 +501,13 @@ def collaborator_dashboard() -> str:
     month_events = admin_portal.calendar_for_collaborator(
         collaborator_id, today.month, today.year
     )
-    events_by_day: Dict[date, List] = {}
-    for event in month_events:
-        events_by_day.setdefault(event.start.date(), []).append(event)
+    month_grid = pycal.Calendar().monthdatescalendar(today.year, today.month)
+    events_by_day = CalendarBoard.spread_by_day(month_events, month_grid[0][0], month_grid[-1][-1])
     upcoming_events = [
         ev for ev in month_events if ev.start.date() >= today
     ]
-    entry_today = next((e for e in collaborator.history.time_entries if e.day == today), None)
-    month_grid = pycal.Calendar().monthdatescalendar(today.year, today.month)
-    day_totals: Dict[date, Dict[str, timedelta]] = {}
-    for week in month_grid:
-        for day in week:
-            entry = next((e for e in collaborator.history.time_entries if e.day == day), None)
-            worked = entry.worked_timedelta() if entry else timedelta()
-            expected = collaborator.expected_hours_for_day(day)
-            day_totals[day] = {"worked": worked, "expected": expected}
+    entry_today = collaborator.history.entry_for(today)
+    day_totals = _personal_day_totals(collaborator_id, month_grid[0][0], month_grid[-1][-1])
 
     return render_template(
         "dashboard_collaborator.html",
@@ -469,7 +517,7 @@ def collaborator_dashboard() -> str:
         indicator=indicator,
         pending_requests=pending_requests,
         upcoming_events=sorted(upcoming_events, key=lambda e: e.start),
-        notifications=admin_portal.list_notifications(collaborator_id),
+        notifications=admin_portal.notification_page(collaborator_id, limit=4)[0],
         today=today,
         events_by_day=events_by_day,
         month_grid=month_grid,
@@ -505,6 +553,17 @@ def collaborator_mark(collaborator_id: str):  # type: ignore[override]
     return redirect(url_for("collaborator_view", collaborator_id=collaborator_id))
 
 
+@app.post("/colaborador/<collaborator_id>/notificaciones/leidas")
+def collaborator_notifications_read(collaborator_id: str):  # type: ignore[override]
+    if not _require_session(collaborator_id):
+        return redirect(url_for("login", next=collaborator_id))
+    admin_portal.mark_notifications_read(collaborator_id)
+    referrer = request.referrer
+    if referrer and referrer.startswith(request.host_url):
+        return redirect(referrer)
+    return redirect(url_for("collaborator_view", collaborator_id=collaborator_id))
+
+
 @app.post("/colaborador/<collaborator_id>/solicitud")
 def collaborator_request(collaborator_id: str):  # type: ignore[override]
     if not _require_session(collaborator_id):
@@ -527,8 +586,12 @@ def collaborator_request(collaborator_id: str):  # type: ignore[override]
         payload["actividad"] = activity
     if notes:
         payload["notas"] = notes
-    portal.create_request(request_type, payload)
-    flash("Solicitud enviada", "success")
+    try:
+        portal.create_request(request_type, payload)
+    except InvalidPayloadError as exc:
+        flash(str(exc), "error")
+    else:
+        flash("Solicitud enviada", "success")
     return redirect(url_for("collaborator_view", collaborator_id=collaborator_id))
 
 
@@ -543,23 +606,12 @@ def collaborator_calendar(collaborator_id: str) -> str:
     year = int(request.args.get("year", today.year))
     events = admin_portal.calendar_for_collaborator(collaborator_id, month, year)
     days_in_month = pycal.monthrange(year, month)[1]
-    day_cards = {}
-    for day in range(1, days_in_month + 1):
-        current = date(year, month, day)
-        entry = next((e for e in collaborator.history.time_entries if e.day == current), None)
-        worked = entry.worked_timedelta() if entry else timedelta(0)
-        expected = collaborator.expected_hours_for_day(current)
-        day_events = [
-            ev
-            for ev in events
-            if ev.start.date() <= current <= ev.end.date()
-        ]
-        day_cards[current] = {
-            "day": current,
-            "worked": worked,
-            "expected": expected,
-            "events": day_events,
-        }
+    events_by_day = CalendarBoard.spread_by_day(events, date(year, month, 1), date(year, month, days_in_month))
+    day_totals = _personal_day_totals(collaborator_id, date(year, month, 1), date(year, month, days_in_month))
+    day_cards = {
+        current: {"day": current, "events": day_events, **day_totals[current]}
+        for current, day_events in events_by_day.items()
+    }
     month_matrix = pycal.Calendar(firstweekday=0).monthdatescalendar(year, month)
     prev_month = month - 1 or 12
     prev_year = year - 1 if month == 1 else year
@@ -579,7 +631,7 @@ def collaborator_calendar(collaborator_id: str) -> str:
         month_name=pycal.month_name[month],
         collaborators=list(collaborator_portals.values()),
         date=date,
-        notifications=admin_portal.list_notifications(collaborator_id),
+        notifications=admin_portal.notification_page(collaborator_id)[0],
     )
 
 
@@ -601,26 +653,44 @@ def collaborator_calendar_event(collaborator_id: str):  # type: ignore[override]
     except ValueError:
         flash("Formato de fecha u hora inválido", "error")
         return redirect(url_for("collaborator_calendar", collaborator_id=collaborator_id, month=month, year=year))
-    if kind == "actividad":
-        payload = {"inicio": start_dt.isoformat(), "fin": end_dt.isoformat(), "actividad": title}
-        portal.create_request(RequestType.SPECIAL_ACTIVITY, payload)
-        flash("Actividad enviada al panel", "success")
-    elif kind == "extra":
-        delta = end_dt - start_dt
-        hours = max(delta.total_seconds() / 3600, 0.0)
-        payload = {
-            "inicio": start_dt.isoformat(),
-            "fin": end_dt.isoformat(),
-            "horas": f"{hours:.2f}",
-            "actividad": title,
-        }
-        portal.create_request(RequestType.OVERTIME, payload)
-        flash("Horas extra solicitadas", "success")
-    else:
-        flash("Selecciona actividad o horas extra", "error")
+    try:
+        if kind == "actividad":
+            payload = {"inicio": start_dt.isoformat(), "fin": end_dt.isoformat(), "actividad": title}
+            portal.create_request(RequestType.SPECIAL_ACTIVITY, payload)
+            flash("Actividad enviada al panel", "success")
+        elif kind == "extra":
+            delta = end_dt - start_dt
+            hours = max(delta.total_seconds() / 3600, 0.0)
+            payload = {
+                "inicio": start_dt.isoformat(),
+                "fin": end_dt.isoformat(),
+                "horas": f"{hours:.2f}",
+                "actividad": title,
+            }
+            portal.create_request(RequestType.OVERTIME, payload)
+            flash("Horas extra solicitadas", "success")
+        else:
+            flash("Selecciona actividad o horas extra", "error")
+    except InvalidPayloadError as exc:
+        flash(str(exc), "error")
     return redirect(url_for("collaborator_calendar", collaborator_id=collaborator_id, month=month, year=year))
 
 
+@app.route("/eventos")
+def live_events() -> Response:
+    """Server-Sent Events con marcaciones, solicitudes, revisiones y avisos (solo para el admin)."""
+
+    denied = _api_denied()
+    if denied is not None:
+        return denied
+    subscription = event_bus.subscribe(request.headers.get("Last-Event-ID", type=int))
+    return Response(
+        sse_stream(subscription),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/admin")
 def admin_view() -> str:
     pending = admin_portal.pending_requests()
@@ -628,16 +698,7 @@ def admin_view() -> str:
     calendar = admin_portal.build_calendar(today.month, today.year)
     access_list = sorted(access_requests.values(), key=lambda req: req.created_at, reverse=True)
     week_start = _current_week_start()
-    team_cards = []
-    for portal in collaborator_portals.values():
-        team_cards.append(
-            {
-                "collaborator": portal.collaborator,
-                "summary": portal.week_summary(week_start),
-                "balance": portal.balance_overview(),
-                "indicator": portal.weekly_indicator(week_start),
-            }
-        )
+    team_cards = [_team_row(portal, week_start) for portal in collaborator_portals.values()]
     summary_totals = {
         "horas_trabajadas": 0.0,
         "horas_esperadas": 0.0,
@@ -667,11 +728,55 @@ def admin_view() -> str:
     )
 
 
+@app.post("/admin/solicitudes/lote")
+def admin_bulk_review():  # type: ignore[override]
+    """Revisión masiva: formulario de la bandeja o JSON ``{"decisiones": [{"id", "accion", "comentario"}]}``."""
+
+    if request.is_json:
+        denied = _api_denied()
+        if denied is not None:
+            return denied
+        body = request.get_json(silent=True) or {}
+        decisions = body.get("decisiones") if isinstance(body, dict) else None
+        if not isinstance(decisions, list) or not all(isinstance(item, dict) for item in decisions):
+            return jsonify({"error": "Se espera una lista 'decisiones'"}), 400
+        results = admin_portal.review_requests(
+            [(str(item.get("id", "")), str(item.get("accion", "")), item.get("comentario") or None) for item in decisions],
+            "Admin Demo",
+        )
+        return jsonify(
+            {
+                "aplicadas": sum(1 for result in results if result.ok),
+                "resultados": [
+                    {
+                        "id": result.request_id,
+                        "accion": result.action,
+                        "estado": result.status.value if result.status else None,
+                        "error": result.error,
+                    }
+                    for result in results
+                ],
+            }
+        )
+    request_ids = request.form.getlist("request_ids")
+    if not request_ids:
+        flash("Selecciona al menos una solicitud", "info")
+        return redirect(url_for("admin_view"))
+    action = request.form.get("action") or ""
+    comment = request.form.get("comment") or None
+    results = admin_portal.review_requests([(request_id, action, comment) for request_id in request_ids], "Admin Demo")
+    applied = sum(1 for result in results if result.ok)
+    if applied:
+        flash(f"{applied} solicitudes actualizadas", "success")
+    for error in sorted({result.error for result in results if result.error}):
+        flash(error, "error")
+    return redirect(url_for("admin_view"))
+
+
 @app.post("/admin/solicitudes/<request_id>")
 def admin_request_action(request_id: str):  # type: ignore[override]
-    admin_portal.ingest_requests()
-    target = next((req for req in admin_portal.requests if req.request_id == request_id), None)
-    if not target:
+    target = admin_portal.find_request(request_id)
+    if not target or target.status != RequestStatus.PENDING:
         flash("Solicitud no encontrada", "error")
         return redirect(url_for("admin_view"))
     action = request.form.get("action")
@@ -723,33 +828,198 @@ def admin_assign_vacation():  # type: ignore[override]
     return redirect(url_for("admin_view"))
 
 
+@app.post("/admin/marcaciones/importar")
+def admin_import_punches():  # type: ignore[override]
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        flash("Selecciona un archivo CSV o NDJSON exportado por el reloj", "error")
+        return redirect(url_for("admin_view"))
+    lines = io.TextIOWrapper(upload.stream, encoding="utf-8", newline="")
+    importer = PunchImporter(admin_portal)
+    if upload.filename.lower().endswith((".ndjson", ".jsonl")):
+        report = importer.import_ndjson(lines)
+    else:
+        report = importer.import_csv(lines)
+    flash(f"{report.punches} marcaciones importadas en {report.entries} jornadas", "success")
+    for error in report.errors[:5]:
+        flash(f"Línea {error.line}: {error.message}", "error")
+    if len(report.errors) > 5:
+        flash(f"Otras {len(report.errors) - 5} filas fueron rechazadas", "error")
+    return redirect(url_for("admin_view"))
+
+
+@app.get("/admin/exportar")
+def admin_export_history():  # type: ignore[override]
+    """Descarga del historial del equipo; se transmite mientras se genera."""
+
+    today = date.today()
+    try:
+        start = date.fromisoformat(request.args.get("desde") or date(today.year, 1, 1).isoformat())
+        end = date.fromisoformat(request.args.get("hasta") or today.isoformat())
+    except ValueError:
+        flash("Formato de fecha inválido", "error")
+        return redirect(url_for("admin_view"))
+    collaborator_ids = request.args.getlist("colaborador")
+    unknown = [cid for cid in collaborator_ids if cid not in admin_portal.collaborators]
+    if unknown:
+        flash(f"Colaborador desconocido: {', '.join(unknown)}", "error")
+        return redirect(url_for("admin_view"))
+    rows = iter_history(admin_portal, start, end, collaborator_ids or None)
+    extension = "ndjson" if request.args.get("formato") == "ndjson" else "csv"
+    body = stream_ndjson(rows) if extension == "ndjson" else stream_csv(rows)
+    return Response(
+        stream_with_context(body),
+        mimetype="application/x-ndjson" if extension == "ndjson" else "text/csv",
+        headers={"Content-Disposition": f"attachment; filename=historial_{start}_{end}.{extension}"},
+    )
+
+
 @app.post("/admin/accesos/<path:email>")
 def admin_access_decision(email: str):  # type: ignore[override]
     access_request = access_requests.get(email.lower())
     if not access_request:
         flash("Solicitud de acceso no encontrada", "error")
         return redirect(url_for("admin_view"))
-    action = request.form.get("action")
-    reviewer = "Admin Demo"
+    action = request.form.get("action") or ""
     position = request.form.get("position") or None
     role_value = request.form.get("role") or Role.COLLABORATOR.value
-    collaborator = collaborators_by_email.get(email.lower())
-    if collaborator:
-        collaborator.position = position or collaborator.position
-        collaborator.role = Role(role_value)
-    access_request.position = position or access_request.position
-    access_request.desired_role = Role(role_value)
-    if action == "approve":
-        access_request.approve(reviewer)
-        flash("Acceso aprobado", "success")
-    elif action == "deny":
-        access_request.deny(reviewer)
-        flash("Acceso denegado", "info")
+    try:
+        access_request = admin_portal.review_access(access_request.email, action, "Admin Demo", position, Role(role_value))
+    except ValueError as exc:
+        flash(str(exc), "error")
     else:
-        flash("Acción inválida", "error")
+        if access_request.status == AccessStatus.APPROVED:
+            flash("Acceso aprobado", "success")
+        else:
+            flash("Acceso denegado", "info")
     return redirect(url_for("admin_view"))
 
 
+# --- API JSON de solo lectura ----------------------------------------------
+# Cada respuesta lleva un ETag armado con la identidad del recurso y el estado
+# de los datos. Con almacén, el estado es su posición de escritura (la
+# secuencia global de SQLite o el punto de la bitácora): es la misma en todos
+# los workers sincronizados y sobrevive a los reinicios, así que un ETag
+# emitido por un worker vale en otro. Sin almacén los datos viven solo en el
+# proceso y se usan sus contadores de versión (``Collaborator.version``,
+# ``AdminPortal.version``) junto con el pid y el arranque. Si el navegador
+# envía el ETag en If-None-Match se responde 304 sin calcular nada.
+_BOOT = datetime.utcnow().isoformat()
+
+
+def _team_version() -> tuple:
+    return admin_portal.version, tuple(c.version for c in admin_portal.collaborators.values())
+
+
+def _conditional_json(parts: tuple, versions: tuple, build: Callable[[], object]) -> Response:
+    state = store.position() if store is not None else (os.getpid(), _BOOT, *versions)
+    etag = hashlib.blake2b(repr((state, *parts)).encode(), digest_size=12).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _api_denied(collaborator_id: Optional[str] = None) -> Optional[Response]:
+    """Respuesta de error si la sesión no puede leer los datos pedidos (el admin puede leer todo)."""
+
+    logged = collaborator_portals.get(session.get("collaborator_id"))
+    if logged is None:
+        return Response(status=401)
+    if collaborator_id is not None and collaborator_id not in collaborator_portals:
+        response = jsonify({"error": f"Colaborador desconocido: {collaborator_id}"})
+        response.status_code = 404
+        return response
+    if logged.collaborator.role != Role.ADMIN and logged.collaborator.collaborator_id != collaborator_id:
+        return Response(status=403)
+    return None
+
+
+@app.get("/api/colaborador/<collaborator_id>/semana")
+def api_week_summary(collaborator_id: str) -> Response:
+    denied = _api_denied(collaborator_id)
+    if denied is not None:
+        return denied
+    try:
+        week_start = date.fromisoformat(request.args.get("inicio") or _current_week_start().isoformat())
+    except ValueError:
+        return jsonify({"error": "Formato de fecha inválido"}), 400
+    portal = collaborator_portals[collaborator_id]
+    parts = ("semana", collaborator_id, week_start)
+    return _conditional_json(
+        parts,
+        (portal.collaborator.version,),
+        lambda: {
+            "colaborador": collaborator_id,
+            "inicio": week_start.isoformat(),
+            "resumen": portal.week_summary(week_start),
+            "indicador": portal.weekly_indicator(week_start),
+        },
+    )
+
+
+@app.get("/api/colaborador/<collaborator_id>/saldo")
+def api_balance(collaborator_id: str) -> Response:
+    denied = _api_denied(collaborator_id)
+    if denied is not None:
+        return denied
+    portal = collaborator_portals[collaborator_id]
+    parts = ("saldo", collaborator_id)
+    return _conditional_json(
+        parts, (portal.collaborator.version,), lambda: {"colaborador": collaborator_id, **portal.balance_overview()}
+    )
+
+
+@app.get("/api/calendario")
+def api_calendar() -> Response:
+    """Calendario del mes: del equipo o, con ``colaborador``, el de esa persona con los feriados."""
+
+    collaborator_id = request.args.get("colaborador") or None
+    denied = _api_denied(collaborator_id)
+    if denied is not None:
+        return denied
+    today = date.today()
+    month = request.args.get("mes", today.month, type=int)
+    year = request.args.get("anio", today.year, type=int)
+    if not 1 <= month <= 12:
+        return jsonify({"error": "Mes inválido"}), 400
+    if collaborator_id:
+        collaborator = admin_portal.collaborators[collaborator_id]
+        parts = ("calendario", year, month, collaborator_id)
+        versions = (admin_portal.version, collaborator.version)
+        build = partial(admin_portal.calendar_for_collaborator, collaborator_id, month, year)
+    else:
+        parts = ("calendario", year, month)
+        versions = _team_version()
+        build = partial(admin_portal.build_calendar, month, year)
+    return _conditional_json(
+        parts, versions, lambda: {"mes": month, "anio": year, "eventos": [event_to_dict(event) for event in build()]}
+    )
+
+
+@app.get("/api/admin/solicitudes")
+def api_pending_requests() -> Response:
+    denied = _api_denied()
+    if denied is not None:
+        return denied
+    return _conditional_json(
+        ("bandeja",),
+        _team_version(),
+        lambda: {"pendientes": [request_to_dict(req) for req in admin_portal.pending_requests()]},
+    )
+
+
+@app.get("/api/admin/cache")
+def api_fragment_cache() -> Response:
+    denied = _api_denied()
+    if denied is not None:
+        return denied
+    return jsonify(fragment_cache.stats())
+
+
 def _build_argument_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="UI demo para App Kimce")
     parser.add_argument("--host", default="127.0.0.1", help="Host a exponer (usar 0.0.0.0 para compartir en la red)")